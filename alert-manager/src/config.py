@@ -26,6 +26,15 @@ class Settings(BaseSettings):
     CORRELATION_INTERVAL_SECONDS: int = 60
     MIN_SEVERITY_TO_ALERT: int = 3 # 1=High, 2=Medium, 3=Low in Suricata
     
+    # Response compression (bodies smaller than this are sent as-is)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
+    # Tracing: "none", "file" (JSON lines at TRACE_FILE_PATH) or "otlp"
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "/tmp/thunderx-traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACE_SAMPLE_RATIO: float = 1.0
+    
     class Config:
         env_file = ".env"
 
@@ -11,6 +11,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select
 
 from .config import settings
+from .metrics import instrument_engine, track_dependency
 from .models import Case, Alert, Base
 
 logger = structlog.get_logger()
@@ -29,6 +30,7 @@ class CorrelationEngine:
         # Database connection
         db_url = f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
         self.engine = create_async_engine(db_url, echo=settings.DEBUG)
+        instrument_engine(self.engine.sync_engine)
         self.AsyncSessionLocal = sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
@@ -66,10 +68,11 @@ class CorrelationEngine:
         }
         
         try:
-            response = await self.os_client.search(
-                index="suricata-*",
-                body=query
-            )
+            async with track_dependency("opensearch", "search"):
+                response = await self.os_client.search(
+                    index="suricata-*",
+                    body=query
+                )
             return response['hits']['hits']
         except Exception as e:
             logger.error("OpenSearch query failed", error=str(e))
@@ -4,10 +4,12 @@ Database connection utility
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import instrument_engine
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}/{settings.POSTGRES_DB}"
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
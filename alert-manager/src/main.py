@@ -2,23 +2,30 @@
 Alert Manager Main Service
 """
 import asyncio
+import base64
+import json
 import structlog
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, Body
+from fastapi import FastAPI, Depends, HTTPException, Body, Query
 from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from .config import settings
+from .metrics import setup_metrics, track_loop
+from .responses import CompressionMiddleware, ORJSONResponse
+from .tracing import TracingMiddleware, setup_tracing, shutdown_tracing
 from .correlation import CorrelationEngine
 from .database import engine, get_db, SessionLocal
 from .models import Base, Case, CaseComment, CaseArtifact, Alert
 
 logger = structlog.get_logger()
 
+setup_tracing("alert-manager")
+
 correlation_engine = None
 
 # Pydantic Models
@@ -47,11 +54,15 @@ async def correlation_loop():
     """Background loop for correlation"""
     while True:
         if correlation_engine:
-            await correlation_engine.run_correlation_cycle()
+            async with track_loop("correlation"):
+                await correlation_engine.run_correlation_cycle()
         await asyncio.sleep(settings.CORRELATION_INTERVAL_SECONDS)
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes introduced later explicitly
+    for index in Alert.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -68,14 +79,24 @@ async def lifespan(app: FastAPI):
     
     yield
     logger.info("Shutting down ThunderX Alert Manager")
+    shutdown_tracing()
 
 app = FastAPI(
     title="ThunderX Alert Manager",
     description="Alert correlation and case management",
     version=settings.VERSION,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# W3C trace context in, spans out
+app.add_middleware(TracingMiddleware, root_app=app)
+
+# Prometheus metrics on /metrics (added last so request timings include every middleware)
+setup_metrics(app)
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
@@ -83,9 +104,20 @@ async def health_check():
 # --- Case Management API ---
 
 @app.get("/cases", response_model=List[CaseResponse])
-def list_cases(status: str = "open", db: Session = Depends(get_db)):
-    cases = db.query(Case).filter(Case.status == status).order_by(Case.created_at.desc()).all()
-    return cases
+def list_cases(
+    status: str = "open",
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Case).filter(Case.status == status)
+    if before_id is None and limit is None:
+        return query.order_by(Case.created_at.desc()).all()
+    
+    # Keyset page: ids grow with creation time, so seek below the last id seen
+    if before_id is not None:
+        query = query.filter(Case.id < before_id)
+    return query.order_by(Case.id.desc()).limit(limit or 50).all()
 
 @app.post("/cases", response_model=CaseResponse)
 def create_case(case: CaseCreate, db: Session = Depends(get_db)):
@@ -140,6 +172,83 @@ def close_case(case_id: int, db: Session = Depends(get_db)):
     db.commit()
     return {"status": "case closed"}
 
+# --- Alerts API ---
+
+ALERT_FIELDS = {
+    "id", "alert_id", "case_id", "signature", "severity", "category",
+    "source_ip", "dest_ip", "dest_port", "protocol", "timestamp", "status", "raw_data"
+}
+DEFAULT_ALERT_FIELDS = sorted(ALERT_FIELDS - {"raw_data"})
+
+def encode_cursor(timestamp: datetime, alert_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), alert_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, alert_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(alert_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/alerts")
+def list_alerts(
+    severity: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    case_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List alerts newest first with keyset pagination
+
+    Pass `next_cursor` from a response as `cursor` to get the following
+    page; the query seeks on (timestamp, id) so deep pages cost the same as
+    the first. `fields` is a comma-separated projection (raw_data is only
+    returned when requested). Alerts without a timestamp cannot be placed
+    in that order and are left out.
+    """
+    selected = [f.strip() for f in fields.split(",")] if fields else DEFAULT_ALERT_FIELDS
+    unknown = set(selected) - ALERT_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # id and timestamp are always needed to build the cursor
+    columns = sorted(set(selected) | {"id", "timestamp"})
+
+    stmt = select(*(getattr(Alert, c) for c in columns)).where(Alert.timestamp.isnot(None))
+    if severity:
+        stmt = stmt.where(Alert.severity.in_(severity))
+    if status:
+        stmt = stmt.where(Alert.status.in_(status))
+    if case_id is not None:
+        stmt = stmt.where(Alert.case_id == case_id)
+    if since:
+        stmt = stmt.where(Alert.timestamp >= since)
+    if until:
+        stmt = stmt.where(Alert.timestamp < until)
+    if cursor:
+        stmt = stmt.where(tuple_(Alert.timestamp, Alert.id) < tuple_(*decode_cursor(cursor)))
+
+    rows = db.execute(
+        stmt.order_by(Alert.timestamp.desc(), Alert.id.desc()).limit(limit + 1)
+    ).mappings().all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last["timestamp"], last["id"])
+
+    return {
+        "alerts": [{f: row[f] for f in selected} for row in page],
+        "next_cursor": next_cursor,
+        "limit": limit
+    }
+
 def main():
     logger.info("Starting Alert Manager", port=settings.PORT)
     uvicorn.run(
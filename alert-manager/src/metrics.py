@@ -0,0 +1,162 @@
+"""
+Prometheus instrumentation shared by the ThunderX FastAPI services
+Per-route request latency, in-flight and error counts, dependency call
+timings (OpenSearch, Postgres, upstream HTTP) and background-loop cycle
+durations, exposed on /metrics
+"""
+
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Buckets cover fast cache hits through slow LLM-backed requests
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method", "route"],
+)
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_call_duration_seconds",
+    "Latency of calls to OpenSearch, Postgres and upstream services",
+    ["dependency", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_call_errors_total",
+    "Failed calls to OpenSearch, Postgres and upstream services",
+    ["dependency", "operation"],
+)
+LOOP_DURATION = Histogram(
+    "background_loop_cycle_seconds",
+    "Duration of one background loop cycle",
+    ["loop"],
+    buckets=LATENCY_BUCKETS + (120.0, 300.0, 600.0),
+)
+LOOP_ERRORS = Counter(
+    "background_loop_errors_total",
+    "Background loop cycles that raised",
+    ["loop"],
+)
+
+
+@asynccontextmanager
+async def track_dependency(dependency: str, operation: str):
+    """Time an async dependency call, counting it as an error if it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        DEPENDENCY_LATENCY.labels(dependency, operation).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    """
+    Time every statement run through a SQLAlchemy engine as a postgres call
+
+    Pass `async_engine.sync_engine` for async engines. The operation label
+    is the statement verb (select, insert, ...) to keep cardinality low.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "unknown"
+        DEPENDENCY_LATENCY.labels("postgres", operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        stack = context.connection.info.get("query_started") if context.connection else None
+        if stack:
+            stack.pop()
+        DEPENDENCY_ERRORS.labels("postgres", "error").inc()
+
+
+@asynccontextmanager
+async def track_loop(loop: str):
+    """Time one background loop cycle"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LOOP_ERRORS.labels(loop).inc()
+        raise
+    finally:
+        LOOP_DURATION.labels(loop).observe(time.perf_counter() - started)
+
+
+def route_template(app: ASGIApp, scope: Scope) -> str:
+    """Route path template (e.g. /cases/{case_id}) so labels stay low-cardinality"""
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight and status counts per route"""
+
+    def __init__(self, app: ASGIApp, root_app: ASGIApp):
+        self.app = app
+        self.root_app = root_app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.root_app, scope)
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Covers the full body, so streamed responses are timed to completion
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS_TOTAL.labels(method, route, str(status)).inc()
+            in_flight.dec()
+
+
+def setup_metrics(app: FastAPI):
+    """Install the middleware and the /metrics endpoint on an app"""
+    app.add_middleware(MetricsMiddleware, root_app=app)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
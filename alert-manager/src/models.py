@@ -3,7 +3,7 @@ Database models for Alert Management
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -60,13 +60,17 @@ class Alert(Base):
     Correlated Alert
     """
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Keyset pagination walks (timestamp, id) newest first
+        Index("ix_alerts_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    case_id = Column(Integer, ForeignKey("cases.id"), nullable=True)
+    case_id = Column(Integer, ForeignKey("cases.id"), nullable=True, index=True)
     
     alert_id = Column(String, unique=True, index=True) # From OpenSearch _id
     signature = Column(String)
-    severity = Column(String)
+    severity = Column(String, index=True)
     category = Column(String)
     
     source_ip = Column(String)
@@ -76,6 +80,6 @@ class Alert(Base):
     
     timestamp = Column(DateTime)
     raw_data = Column(JSON) # Store full source
-    status = Column(String, default="new")
+    status = Column(String, default="new", index=True)
     
     case = relationship("Case", back_populates="alerts")
@@ -0,0 +1,139 @@
+"""
+Response layer shared by the ThunderX FastAPI services
+orjson serialization by default, and gzip/zstd compression negotiated
+from Accept-Encoding for bodies above a size threshold
+"""
+
+import zlib
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (also handles numpy arrays and non-str keys)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick zstd or gzip from an Accept-Encoding header, or None"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        name, _, value = params.partition("=")
+        try:
+            q = float(value) if name.strip() == "q" else 1.0
+        except ValueError:
+            q = 0.0
+        if q > 0:
+            accepted.add(token.strip())
+    if zstandard is not None and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, zstd_level: int):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        else:
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        if final:
+            return out + self._obj.flush()
+        # Flush each chunk so streamed responses reach the client promptly
+        if self.encoding == "zstd":
+            return out + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return out + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses the client can decode
+
+    Small single-chunk bodies, already-encoded responses and event streams
+    pass through untouched; streamed bodies are compressed chunk by chunk.
+    Any other response varies on Accept-Encoding, and a compressed one has
+    its ETag made weak since the bytes no longer match the original.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                compressible = not (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if compressible:
+                    # Caches must not hand this representation to clients with other encodings
+                    headers.add_vary_header("Accept-Encoding")
+                passthrough = not compressible or encoding is None
+                if not passthrough:
+                    compressor = _Compressor(encoding, self.gzip_level, self.zstd_level)
+                    headers["Content-Encoding"] = encoding
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = "W/" + etag
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                await send(start)
+                start = None
+
+            if passthrough:
+                await send(message)
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
@@ -2,7 +2,7 @@
 Configuration for API Gateway
 """
 
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -36,18 +36,74 @@ class Settings(BaseSettings):
     # Alert Manager
     ALERT_MANAGER_URL: str = "http://alert-manager:6000"
     
+    # Threat Intel
+    THREAT_INTEL_URL: str = "http://threat-intel:7000"
+    
+    # Status probes
+    STATUS_PROBE_TIMEOUT_SECONDS: float = 2.0
+    STATUS_CACHE_TTL_SECONDS: float = 5.0
+    
+    # Upstream HTTP client (shared across requests)
+    UPSTREAM_HTTP2: bool = True
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_TIMEOUT_SECONDS: float = 30.0
+    EXPORT_TIMEOUT_SECONDS: float = 120.0
+    
+    # Response cache for idempotent reads
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"  # memory | redis
+    REDIS_URL: str = "redis://redis:6379/0"
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+    RESPONSE_CACHE_TTLS: Dict[str, int] = {
+        "query_examples": 300,
+        "query": 30,
+        "alerts": 10,
+    }
+    
     # JWT Authentication
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_SIZE: int = 1000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
     
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
     
-    # Rate Limiting
+    # Rate Limiting (token bucket per user, or per client address when anonymous)
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BURST_MULTIPLIER: float = 1.0
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | redis
+    RATE_LIMIT_DEFAULT_COST: float = 1.0
+    # Tokens drawn per request, matched by longest path prefix
+    RATE_LIMIT_ROUTE_COSTS: Dict[str, float] = {
+        "/health": 0,
+        "/metrics": 0,
+        "/query/examples": 1,
+        "/query/export": 30,
+        "/query": 10,
+        "/auth/login": 5,
+    }
+    # Per-minute overrides keyed by username
+    RATE_LIMIT_USER_QUOTAS: Dict[str, int] = {}
+    # Peers (addresses or CIDR networks) whose X-Real-IP / X-Forwarded-For
+    # headers identify anonymous clients; anyone else is keyed on its own address
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    
+    # Response compression (bodies smaller than this are sent as-is)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
+    # Tracing: "none", "file" (JSON lines at TRACE_FILE_PATH) or "otlp"
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "/tmp/thunderx-traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACE_SAMPLE_RATIO: float = 1.0
     
     class Config:
         env_file = ".env"
@@ -3,16 +3,22 @@ ThunderX API Gateway
 Main application entry point
 """
 
+from contextlib import asynccontextmanager
+
 import structlog
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
 from .config import settings
 from .routes import health, auth, query, alerts, threat_intel, system
+from .rate_limit import RateLimiter
+from .response_cache import ResponseCache
+from .metrics import setup_metrics
+from .responses import CompressionMiddleware, ORJSONResponse
+from .tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from .status import StatusAggregator
+from .upstream import create_upstream_client
 
 # Configure logging
 structlog.configure(
@@ -25,8 +31,25 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+setup_tracing("api-gateway")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan handler"""
+    # Pooled keep-alive client shared by all proxy routes
+    app.state.http_client = create_upstream_client()
+    app.state.response_cache = ResponseCache()
+    app.state.rate_limiter = RateLimiter()
+    app.state.status_aggregator = StatusAggregator(app.state.http_client)
+    
+    yield
+    
+    await app.state.rate_limiter.close()
+    await app.state.response_cache.close()
+    await app.state.http_client.aclose()
+    shutdown_tracing()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -34,12 +57,19 @@ app = FastAPI(
     description="REST API for ThunderX NDR Platform",
     version=settings.VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    if settings.RATE_LIMIT_ENABLED:
+        rejected = await request.app.state.rate_limiter.check(request)
+        if rejected is not None:
+            return rejected
+    return await call_next(request)
 
 # CORS
 app.add_middleware(
@@ -50,6 +80,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression (wraps rate limiting and CORS so their responses are covered too;
+# tracing and metrics are added after it and sit outside)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# W3C trace context in, spans out
+app.add_middleware(TracingMiddleware, root_app=app)
+
+# Prometheus metrics on /metrics (added last so request timings include every middleware)
+setup_metrics(app)
+
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
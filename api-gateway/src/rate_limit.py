@@ -0,0 +1,219 @@
+"""
+Token-bucket rate limiting
+
+Buckets are keyed on the authenticated user (falling back to the client
+address) and each route draws a configurable number of tokens, so an
+expensive natural-language query costs more than a health check. Bucket
+state lives in a pluggable backend; the Redis backend shares it across
+gateway workers.
+"""
+
+import ipaddress
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+import structlog
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .routes.auth import verify_token
+
+logger = structlog.get_logger()
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@dataclass
+class BucketResult:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class MemoryBucketBackend:
+    """Per-process buckets; only correct with a single worker"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, key: str, capacity: float, rate: float, cost: float) -> BucketResult:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            self._buckets.pop(next(iter(self._buckets)))
+        self._buckets[key] = (tokens, now)
+        return BucketResult(allowed, tokens, 0.0 if allowed else (cost - tokens) / rate)
+
+    async def close(self):
+        self._buckets.clear()
+
+
+# Refill and take atomically, using the Redis server clock so every worker
+# agrees on elapsed time
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketBackend:
+    """Buckets shared by all workers (requires the `redis` package)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(_TAKE_SCRIPT)
+        self.prefix = "thunderx:gw:ratelimit:"
+
+    async def take(self, key: str, capacity: float, rate: float, cost: float) -> BucketResult:
+        allowed, tokens = await self.script(keys=[self.prefix + key], args=[capacity, rate, cost])
+        tokens = float(tokens)
+        allowed = bool(int(allowed))
+        return BucketResult(allowed, tokens, 0.0 if allowed else (cost - tokens) / rate)
+
+    async def close(self):
+        await self.client.close()
+
+
+def create_bucket_backend():
+    """Backend selected by RATE_LIMIT_BACKEND, falling back to memory"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisBucketBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, using per-process rate limiting")
+    return MemoryBucketBackend()
+
+
+def route_cost(path: str) -> float:
+    """Token cost of a path: longest matching prefix in RATE_LIMIT_ROUTE_COSTS"""
+    best, cost = -1, settings.RATE_LIMIT_DEFAULT_COST
+    for prefix, prefix_cost in settings.RATE_LIMIT_ROUTE_COSTS.items():
+        if path.startswith(prefix) and len(prefix) > best:
+            best, cost = len(prefix), prefix_cost
+    return cost
+
+
+@lru_cache(maxsize=4)
+def _networks(proxies: Tuple[str, ...]) -> List[IPNetwork]:
+    return [ipaddress.ip_network(proxy, strict=False) for proxy in proxies]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _networks(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES)))
+
+
+def client_address(request: Request) -> str:
+    """
+    Address anonymous requests are keyed on
+
+    Behind nginx every request shares the proxy's address, so the client is
+    taken from X-Real-IP (nginx overwrites any client-supplied value), or
+    else the nearest untrusted hop in X-Forwarded-For. Those headers are
+    only honoured from RATE_LIMIT_TRUSTED_PROXIES; on direct access anyone
+    could set them.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+    real_ip = request.headers.get("x-real-ip", "").strip()
+    if real_ip:
+        return real_ip
+    # Each proxy appends the address it saw, so read from the right
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return peer
+
+
+def client_identity(request: Request) -> Tuple[str, Optional[str]]:
+    """Bucket key for a request, plus the username when authenticated"""
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        payload = verify_token(auth[7:])
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}", payload["sub"]
+
+    return f"ip:{client_address(request)}", None
+
+
+class RateLimiter:
+    """Token-bucket limiter with per-user quotas"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_bucket_backend()
+        self._warn_unaffordable_costs()
+
+    @staticmethod
+    def _warn_unaffordable_costs():
+        """Costs above a bucket's capacity are clamped in check(); say so at startup"""
+        quotas = {None: settings.RATE_LIMIT_PER_MINUTE, **settings.RATE_LIMIT_USER_QUOTAS}
+        costs = {**settings.RATE_LIMIT_ROUTE_COSTS, "(default)": settings.RATE_LIMIT_DEFAULT_COST}
+        for username, per_minute in quotas.items():
+            capacity = per_minute * settings.RATE_LIMIT_BURST_MULTIPLIER
+            for prefix, cost in costs.items():
+                if cost > capacity:
+                    logger.warning(
+                        "Route cost exceeds bucket capacity, clamping to a full bucket",
+                        route=prefix, cost=cost, capacity=capacity, username=username
+                    )
+
+    async def check(self, request: Request) -> Optional[JSONResponse]:
+        """Return a 429 response if the request is over quota, else None"""
+        cost = route_cost(request.url.path)
+        if cost <= 0:
+            return None
+
+        key, username = client_identity(request)
+        per_minute = settings.RATE_LIMIT_USER_QUOTAS.get(username, settings.RATE_LIMIT_PER_MINUTE)
+        capacity = per_minute * settings.RATE_LIMIT_BURST_MULTIPLIER
+        rate = per_minute / 60.0
+        # A cost the bucket can never hold would reject the route forever
+        if capacity > 0:
+            cost = min(cost, capacity)
+
+        result = await self.backend.take(key, capacity, rate, cost)
+        if result.allowed:
+            return None
+
+        logger.info("Rate limit exceeded", key=key, path=request.url.path, cost=cost)
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"Rate limit exceeded: {per_minute} per minute"},
+            headers={
+                "Retry-After": str(max(1, int(result.retry_after + 0.999))),
+                "X-RateLimit-Limit": str(per_minute),
+                "X-RateLimit-Remaining": str(int(result.remaining)),
+            },
+        )
+
+    async def close(self):
+        await self.backend.close()
@@ -0,0 +1,186 @@
+"""
+Response cache for idempotent gateway reads
+
+Entries are keyed on method, upstream URL and request body. Concurrent
+misses for the same key share one upstream call, and every cached
+response carries an ETag so clients can revalidate with If-None-Match.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import structlog
+from fastapi import Request
+from fastapi.responses import Response
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class CachedResponse:
+    """Fully buffered upstream response"""
+    status_code: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: str = ""
+
+    def __post_init__(self):
+        if not self.etag:
+            self.etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+
+    def to_bytes(self) -> bytes:
+        meta = {"status_code": self.status_code, "headers": self.headers, "etag": self.etag}
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CachedResponse":
+        meta, body = raw.split(b"\n", 1)
+        return cls(body=body, **json.loads(meta))
+
+
+class MemoryBackend:
+    """LRU cache bounded by total body bytes, with per-entry TTL"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: CachedResponse, ttl: float):
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (value, time.monotonic() + ttl)
+        self.current_bytes += len(value.body)
+        while self.current_bytes > self.max_bytes and self._data:
+            self._remove(next(iter(self._data)))
+
+    def _remove(self, key: str):
+        value, _ = self._data.pop(key)
+        self.current_bytes -= len(value.body)
+
+    async def close(self):
+        self._data.clear()
+        self.current_bytes = 0
+
+
+class RedisBackend:
+    """Shared backend for multi-worker deployments (requires the `redis` package)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.prefix = "thunderx:gw:cache:"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        raw = await self.client.get(self.prefix + key)
+        return CachedResponse.from_bytes(raw) if raw else None
+
+    async def set(self, key: str, value: CachedResponse, ttl: float):
+        await self.client.set(self.prefix + key, value.to_bytes(), px=int(ttl * 1000))
+
+    async def close(self):
+        await self.client.close()
+
+
+def create_backend():
+    """Backend selected by RESPONSE_CACHE_BACKEND, falling back to memory"""
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        try:
+            return RedisBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, using in-memory response cache")
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_BYTES)
+
+
+class ResponseCache:
+    """Cache front with request coalescing"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(method: str, url: str, body: Optional[Any] = None) -> str:
+        raw = json.dumps([method, url, body], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Union[CachedResponse, Response]]]
+    ) -> Union[CachedResponse, Response]:
+        """
+        Return a cached entry or call `fetch` once for all concurrent callers
+
+        `fetch` returns a CachedResponse when the body was small enough to
+        buffer, or a (streaming) Response otherwise; only the former is
+        stored or shared. Waiters whose leader produced nothing shareable
+        fetch for themselves.
+        """
+        cached = await self.backend.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            shared = await asyncio.shield(inflight)
+            if shared is not None:
+                return shared
+            return await fetch()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        shared = None
+        try:
+            result = await fetch()
+            if isinstance(result, CachedResponse) and result.status_code == 200:
+                await self.backend.set(key, result, ttl)
+                shared = result
+            return result
+        finally:
+            future.set_result(shared)
+            self._inflight.pop(key, None)
+
+    async def close(self):
+        await self.backend.close()
+
+
+def route_ttl(route: str) -> int:
+    """Per-route TTL in seconds; 0 disables caching for the route"""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return 0
+    return settings.RESPONSE_CACHE_TTLS.get(route, 0)
+
+
+def cached_response(request: Request, entry: CachedResponse, ttl: int) -> Response:
+    """Turn a cache entry into a response, answering 304 on a matching ETag"""
+    headers = {
+        **{k: v for k, v in entry.headers.items() if k.lower() not in ("etag", "cache-control")},
+        "ETag": entry.etag,
+        "Cache-Control": f"private, max-age={ttl}",
+    }
+    # Weak comparison: compression turns the ETag into W/"..." on the way out
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, status_code=entry.status_code, headers=headers)
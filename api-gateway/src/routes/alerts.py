@@ -1,16 +1,66 @@
-"""Placeholder routes"""
+"""Alert routes - proxies alert and case listings from the alert manager"""
 
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from ..config import settings
+from ..upstream import cached_proxy
 from .auth import get_current_user, User
 
 # Alerts router
 alerts_router = APIRouter()
 
 @alerts_router.get("/")
-async def get_alerts(current_user: User = Depends(get_current_user)):
-    """Get alerts"""
-    # TODO: Implement alert retrieval
-    return {"alerts": [], "total": 0}
+async def get_alerts(
+    request: Request,
+    severity: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    case_id: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get alerts, newest first
+
+    Filters are applied by the alert manager. Pass `next_cursor` from the
+    previous page as `cursor` to continue; `fields` selects a comma-separated
+    subset of alert fields.
+    """
+    params = {
+        "severity": severity, "status": status, "case_id": case_id,
+        "since": since, "until": until, "cursor": cursor,
+        "limit": limit, "fields": fields
+    }
+    return await cached_proxy(
+        request, "alerts", "GET", f"{settings.ALERT_MANAGER_URL}/alerts",
+        params={k: v for k, v in params.items() if v is not None},
+        timeout=10.0,
+        service_name="Alert manager"
+    )
+
+
+@alerts_router.get("/cases")
+async def get_cases(
+    request: Request,
+    status: str = "open",
+    before_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """Get cases by status, newest first; pass the last case id as `before_id` to page"""
+    params = {"status": status, "limit": limit}
+    if before_id is not None:
+        params["before_id"] = before_id
+    return await cached_proxy(
+        request, "alerts", "GET", f"{settings.ALERT_MANAGER_URL}/cases",
+        params=params,
+        timeout=10.0,
+        service_name="Alert manager"
+    )
 
 
 # Threat intel router
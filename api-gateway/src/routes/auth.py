@@ -2,8 +2,10 @@
 Authentication routes
 """
 
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
@@ -11,6 +13,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
+from ..cache import TTLCache
 from ..config import settings
 
 router = APIRouter()
@@ -21,6 +24,12 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Verified token claims keyed by token hash, each entry expiring with the token
+_token_cache = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE)
+
+# User records keyed by username
+_user_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+
 
 class Token(BaseModel):
     """Token response"""
@@ -52,6 +61,53 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the verified claims of a token, or None if it is invalid
+
+    Successful verifications are cached until the token's `exp`, so repeat
+    requests with the same token skip signature verification.
+    """
+    key = _token_key(token)
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        _token_cache.set(key, payload, ttl=remaining)
+    return payload
+
+
+def _load_user(username: str) -> User:
+    """Load a user record"""
+    # TODO: Fetch user from database
+    return User(username=username)
+
+
+def get_user(username: str) -> User:
+    """Get a user record, cached for AUTH_USER_CACHE_TTL_SECONDS"""
+    user = _user_cache.get(username)
+    if user is None:
+        user = _load_user(username)
+        _user_cache.set(username, user)
+    return user
+
+
+def invalidate_user(username: str):
+    """Drop a cached user record, e.g. after it is disabled or changed"""
+    _user_cache.pop(username)
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -60,16 +116,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
+    payload = verify_token(token)
+    if payload is None:
+        raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
     
-    # TODO: Fetch user from database
-    user = User(username=username)
+    user = get_user(username)
     
     if user.disabled:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -109,6 +163,11 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
     """Logout (client should discard token)"""
+    _token_cache.pop(_token_key(token))
+    invalidate_user(current_user.username)
     return {"message": "Successfully logged out"}
@@ -2,7 +2,8 @@
 Health check endpoint
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -26,9 +27,12 @@ async def health_check():
 
 
 @router.get("/ready")
-async def readiness_check():
-    """Readiness check for Kubernetes"""
-    # TODO: Check database, OpenSearch, etc.
+async def readiness_check(request: Request):
+    """Readiness check for Kubernetes (backend probes cached for a few seconds)"""
+    status = await request.app.state.status_aggregator.get_status()
+    down = [name for name, result in status["components"].items() if result["status"] != "up"]
+    if down:
+        return JSONResponse(status_code=503, content={"status": "not_ready", "down": down})
     return {"status": "ready"}
 
 
@@ -2,13 +2,13 @@
 Query proxy routes - forwards to MCP AI service
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel
-import httpx
 
 from ..config import settings
+from ..upstream import cached_proxy, proxy_stream
 from .auth import get_current_user, User
 
 router = APIRouter()
@@ -21,39 +21,84 @@ class QueryRequest(BaseModel):
     size: Optional[int] = 100
 
 
+class ExportRequest(BaseModel):
+    """Export request"""
+    query: Optional[str] = None
+    dsl: Optional[Dict[str, Any]] = None
+    index_pattern: Optional[str] = "*"
+    format: Literal["ndjson", "csv"] = "ndjson"
+    fields: Optional[List[str]] = None
+    max_rows: Optional[int] = None
+
+
 @router.post("/")
 async def execute_query(
-    request: QueryRequest,
+    request_body: QueryRequest,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
     Execute natural language query
     
-    Proxies to MCP AI service for translation and execution
+    Proxies to MCP AI service for translation and execution. Identical
+    queries within the route TTL share one upstream call.
+    """
+    return await cached_proxy(
+        request, "query", "POST", f"{settings.MCP_AI_SERVICE_URL}/query/",
+        json=request_body.dict(),
+        timeout=30.0,
+        service_name="MCP AI service"
+    )
+
+
+@router.post("/stream")
+async def stream_query(
+    request_body: QueryRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execute natural language query, streaming results as server-sent events
+
+    The event stream is relayed chunk by chunk, so the translated DSL
+    reaches the client before the search has finished.
     """
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.MCP_AI_SERVICE_URL}/query/",
-                json=request.dict(),
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"MCP AI service error: {str(e)}")
+    return await proxy_stream(
+        request.app.state.http_client, "POST", f"{settings.MCP_AI_SERVICE_URL}/query/stream",
+        json=request_body.dict(),
+        timeout=settings.EXPORT_TIMEOUT_SECONDS,
+        service_name="MCP AI service"
+    )
 
 
 @router.get("/examples")
-async def get_query_examples(current_user: User = Depends(get_current_user)):
+async def get_query_examples(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
     """Get example queries"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.MCP_AI_SERVICE_URL}/query/examples",
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"MCP AI service error: {str(e)}")
+    return await cached_proxy(
+        request, "query_examples", "GET", f"{settings.MCP_AI_SERVICE_URL}/query/examples",
+        timeout=10.0,
+        service_name="MCP AI service"
+    )
+
+
+@router.post("/export")
+async def export_query(
+    request_body: ExportRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export all results of a query as NDJSON or CSV
+
+    The MCP AI service pages through OpenSearch and the body is streamed
+    straight through with chunked transfer, never buffered here.
+    """
+    return await proxy_stream(
+        request.app.state.http_client, "POST", f"{settings.MCP_AI_SERVICE_URL}/query/export",
+        json=request_body.dict(),
+        timeout=settings.EXPORT_TIMEOUT_SECONDS,
+        service_name="MCP AI service"
+    )
@@ -1,20 +1,24 @@
 """System routes"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from .auth import get_current_user, User
 
 router = APIRouter()
 
 @router.get("/status")
-async def get_system_status(current_user: User = Depends(get_current_user)):
+async def get_system_status(request: Request, current_user: User = Depends(get_current_user)):
     """Get system status"""
-    # TODO: Implement real status checks
+    status = await request.app.state.status_aggregator.get_status()
+    components = {name: result["status"] for name, result in status["components"].items()}
     return {
+        "healthy": status["healthy"],
+        "checked_at": status["checked_at"],
         "components": {
-            "opensearch": "unknown",
+            **components,
+            # Sensors run on the host network and are not probed directly
             "zeek": "unknown",
             "suricata": "unknown",
-            "arkime": "unknown",
-            "mcp_ai": "unknown"
-        }
+            "arkime": "unknown"
+        },
+        "details": status["components"]
     }
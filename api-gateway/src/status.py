@@ -0,0 +1,119 @@
+"""
+Backend status aggregation
+Probes every dependency concurrently with a per-probe timeout and caches
+the combined result briefly, so frequent readiness checks and dashboard
+polling cost at most one probe round per TTL
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncpg
+import httpx
+import structlog
+
+from .config import settings
+from .metrics import track_dependency
+
+logger = structlog.get_logger()
+
+Probe = Callable[[], Awaitable[Optional[str]]]
+
+
+def _opensearch_url() -> str:
+    scheme = "https" if settings.OPENSEARCH_USE_SSL else "http"
+    host = settings.OPENSEARCH_HOST
+    # Compose passes "host:port" in OPENSEARCH_HOST
+    if ":" not in host:
+        host = f"{host}:{settings.OPENSEARCH_PORT}"
+    return f"{scheme}://{host}"
+
+
+class StatusAggregator:
+    """Runs dependency probes and caches the aggregate for STATUS_CACHE_TTL_SECONDS"""
+
+    def __init__(self, http_client: httpx.AsyncClient):
+        self.http_client = http_client
+        self.probes: Dict[str, Probe] = {
+            "opensearch": self._probe_opensearch,
+            "postgres": self._probe_postgres,
+            "alert_manager": self._http_probe(f"{settings.ALERT_MANAGER_URL}/health"),
+            "threat_intel": self._http_probe(f"{settings.THREAT_INTEL_URL}/health"),
+            "mcp_ai": self._http_probe(f"{settings.MCP_AI_SERVICE_URL}/health/"),
+        }
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Cached aggregate; concurrent callers on expiry share one probe round"""
+        if self._fresh():
+            return self._cached
+        async with self._lock:
+            if not self._fresh():
+                self._cached = await self._collect()
+                self._cached_at = time.monotonic()
+        return self._cached
+
+    def _fresh(self) -> bool:
+        return self._cached is not None and time.monotonic() - self._cached_at < settings.STATUS_CACHE_TTL_SECONDS
+
+    async def _collect(self) -> Dict[str, Any]:
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._run(self.probes[name]) for name in names))
+        components = dict(zip(names, results))
+        healthy = all(c["status"] == "up" for c in components.values())
+        return {"healthy": healthy, "checked_at": time.time(), "components": components}
+
+    async def _run(self, probe: Probe) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            error = await asyncio.wait_for(probe(), timeout=settings.STATUS_PROBE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        result = {
+            "status": "down" if error else "up",
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    def _http_probe(self, url: str) -> Probe:
+        async def probe() -> Optional[str]:
+            response = await self.http_client.get(url, timeout=settings.STATUS_PROBE_TIMEOUT_SECONDS)
+            return None if response.status_code < 400 else f"HTTP {response.status_code}"
+        return probe
+
+    async def _probe_opensearch(self) -> Optional[str]:
+        # The shared upstream client verifies certificates, so use a short-lived one here
+        async with httpx.AsyncClient(
+            verify=settings.OPENSEARCH_VERIFY_CERTS,
+            auth=(settings.OPENSEARCH_USER, settings.OPENSEARCH_PASSWORD),
+            timeout=settings.STATUS_PROBE_TIMEOUT_SECONDS,
+        ) as client:
+            async with track_dependency("opensearch", "cluster_health"):
+                response = await client.get(f"{_opensearch_url()}/_cluster/health")
+        if response.status_code >= 400:
+            return f"HTTP {response.status_code}"
+        cluster_status = response.json().get("status")
+        return None if cluster_status in ("green", "yellow") else f"cluster {cluster_status}"
+
+    async def _probe_postgres(self) -> Optional[str]:
+        async with track_dependency("postgres", "ping"):
+            conn = await asyncpg.connect(
+                host=settings.POSTGRES_HOST,
+                port=settings.POSTGRES_PORT,
+                user=settings.POSTGRES_USER,
+                password=settings.POSTGRES_PASSWORD,
+                database=settings.POSTGRES_DB,
+                timeout=settings.STATUS_PROBE_TIMEOUT_SECONDS,
+            )
+            try:
+                await conn.fetchval("SELECT 1")
+            finally:
+                await conn.close()
+        return None
@@ -0,0 +1,208 @@
+"""
+Upstream client for backend services
+One pooled httpx client per process, with streaming pass-through of responses
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import httpx
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from opentelemetry.trace import SpanKind
+from starlette.background import BackgroundTask
+
+from .config import settings
+from .metrics import track_dependency
+from .tracing import inject_headers, tracer
+from .response_cache import CachedResponse, cached_response, route_ttl
+
+# Response headers relayed from upstream; hop-by-hop and length headers are
+# left to the server since the body is re-chunked on the way out
+PASSTHROUGH_HEADERS = (
+    "content-type", "content-encoding", "content-disposition",
+    "etag", "last-modified", "cache-control", "x-accel-buffering",
+)
+
+
+def create_upstream_client() -> httpx.AsyncClient:
+    """Create the app-lifetime client (called from the lifespan handler)"""
+    return httpx.AsyncClient(
+        http2=settings.UPSTREAM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.UPSTREAM_TIMEOUT_SECONDS, connect=5.0),
+        # Internal hops stay uncompressed; the gateway negotiates with the client
+        headers={"Accept-Encoding": "identity"},
+    )
+
+
+def _error_detail(response: httpx.Response) -> Any:
+    """The `detail` of a FastAPI error body, else the body text"""
+    try:
+        body = response.json()
+    except ValueError:
+        return response.text or response.reason_phrase
+    if isinstance(body, dict) and "detail" in body:
+        return body["detail"]
+    return body
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    json: Optional[Any],
+    params: Optional[Dict[str, Any]],
+    timeout: Optional[float],
+    service_name: str,
+) -> httpx.Response:
+    """Send a streamed request; upstream 4xx are relayed, other failures become a 500"""
+    # Timed to response headers; the body is relayed afterwards
+    with tracer.start_as_current_span(
+        f"{method} {service_name}",
+        kind=SpanKind.CLIENT,
+        attributes={"http.method": method, "http.url": url},
+    ) as span:
+        upstream_request = client.build_request(
+            method, url, json=json, params=params, headers=inject_headers(),
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        async with track_dependency("upstream", service_name):
+            try:
+                response = await client.send(upstream_request, stream=True)
+            except httpx.HTTPError as e:
+                raise HTTPException(status_code=500, detail=f"{service_name} error: {str(e)}")
+
+            span.set_attribute("http.status_code", response.status_code)
+            if response.is_error:
+                await response.aread()
+                await response.aclose()
+                if response.is_server_error:
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError as e:
+                        raise HTTPException(status_code=500, detail=f"{service_name} error: {str(e)}")
+
+    if response.is_client_error:
+        # The caller's request was rejected, not a dependency failure: relay status and detail
+        raise HTTPException(status_code=response.status_code, detail=_error_detail(response))
+    return response
+
+
+def _passthrough_headers(response: httpx.Response) -> Dict[str, str]:
+    return {k: v for k, v in response.headers.items() if k.lower() in PASSTHROUGH_HEADERS}
+
+
+async def proxy_stream(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    json: Optional[Any] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    service_name: str = "Upstream",
+) -> StreamingResponse:
+    """
+    Forward a request and stream the upstream body back unchanged
+
+    The body is relayed as raw bytes, so JSON is never decoded and
+    re-encoded in the gateway. Upstream 4xx keep their status and detail;
+    transport errors and 5xx are surfaced as 500s.
+    """
+    response = await _send(client, method, url, json, params, timeout, service_name)
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=_passthrough_headers(response),
+        background=BackgroundTask(response.aclose),
+    )
+
+
+async def fetch_buffered(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    json: Optional[Any] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    service_name: str = "Upstream",
+    max_bytes: Optional[int] = None,
+) -> Union[CachedResponse, StreamingResponse]:
+    """
+    Buffer an upstream response for caching, up to `max_bytes`
+
+    Bodies that outgrow the limit are not cached: the bytes read so far and
+    the rest of the stream are relayed to the caller instead.
+    """
+    max_bytes = max_bytes or settings.RESPONSE_CACHE_MAX_ENTRY_BYTES
+    response = await _send(client, method, url, json, params, timeout, service_name)
+    chunks: List[bytes] = []
+    size = 0
+    raw = response.aiter_raw()
+
+    async for chunk in raw:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            async def relay() -> AsyncIterator[bytes]:
+                for buffered in chunks:
+                    yield buffered
+                async for rest in raw:
+                    yield rest
+
+            return StreamingResponse(
+                relay(),
+                status_code=response.status_code,
+                headers=_passthrough_headers(response),
+                background=BackgroundTask(response.aclose),
+            )
+
+    await response.aclose()
+    return CachedResponse(
+        status_code=response.status_code,
+        body=b"".join(chunks),
+        headers=_passthrough_headers(response),
+    )
+
+
+async def cached_proxy(
+    request: Request,
+    route: str,
+    method: str,
+    url: str,
+    *,
+    json: Optional[Any] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    service_name: str = "Upstream",
+) -> Response:
+    """
+    Proxy an idempotent read through the response cache
+
+    Falls back to plain streaming when caching is disabled for `route`.
+    """
+    client = request.app.state.http_client
+    ttl = route_ttl(route)
+    if not ttl:
+        return await proxy_stream(
+            client, method, url, json=json, params=params,
+            timeout=timeout, service_name=service_name
+        )
+
+    cache = request.app.state.response_cache
+    key = cache.make_key(method, str(httpx.URL(url, params=params)), json)
+    result = await cache.get_or_fetch(
+        key, ttl,
+        lambda: fetch_buffered(
+            client, method, url, json=json, params=params,
+            timeout=timeout, service_name=service_name
+        )
+    )
+    if isinstance(result, CachedResponse):
+        return cached_response(request, result, ttl)
+    return result
@@ -0,0 +1,68 @@
+"""
+Rate limiter client keys and route costs
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from starlette.requests import Request
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from src.config import settings
+from src.rate_limit import MemoryBucketBackend, RateLimiter, client_identity
+
+NGINX = "172.20.0.250"
+
+
+def make_request(peer: str, path: str = "/alerts/", **headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": (peer, 40000),
+        "server": ("gateway", 8080),
+        "scheme": "http",
+    })
+
+
+@pytest.fixture(autouse=True)
+def trust_nginx(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", [NGINX, "10.1.0.0/16"])
+
+
+def test_forwarding_headers_are_ignored_on_direct_access():
+    request = make_request("203.0.113.9", x_real_ip="198.51.100.1", x_forwarded_for="198.51.100.2")
+    assert client_identity(request) == ("ip:203.0.113.9", None)
+
+
+def test_trusted_proxy_names_the_client():
+    assert client_identity(make_request(NGINX, x_real_ip="198.51.100.1"))[0] == "ip:198.51.100.1"
+    # The client's own (spoofable) entry is left of the hops the proxies appended
+    request = make_request(NGINX, x_forwarded_for="192.0.2.1, 198.51.100.1, 10.1.2.3")
+    assert client_identity(request)[0] == "ip:198.51.100.1"
+    assert client_identity(make_request(NGINX))[0] == f"ip:{NGINX}"
+
+
+def test_route_cost_above_capacity_is_clamped(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 6)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BURST_MULTIPLIER", 1.0)
+    limiter = RateLimiter(MemoryBucketBackend())
+
+    async def scenario():
+        first = await limiter.check(make_request("203.0.113.9", path="/query/export"))
+        second = await limiter.check(make_request("203.0.113.9", path="/query/export"))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    # The export costs 30 tokens; a full 6-token bucket pays for it
+    assert first is None
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) <= 60
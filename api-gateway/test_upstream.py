@@ -0,0 +1,80 @@
+"""
+Upstream error propagation through the proxy routes
+"""
+
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from src.response_cache import ResponseCache
+from src.routes import alerts, query
+from src.routes.auth import User, get_current_user
+
+
+def make_client(handler) -> TestClient:
+    """Gateway app with the proxy routes, talking to `handler` instead of upstream services"""
+    app = FastAPI()
+    app.include_router(query.router, prefix="/query")
+    app.include_router(alerts.router, prefix="/alerts")
+    app.dependency_overrides[get_current_user] = lambda: User(username="analyst")
+    app.state.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app.state.response_cache = ResponseCache()
+    return TestClient(app)
+
+
+def rejecting(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(400, json={"detail": "Query rejected: size must be at most 10000"})
+
+
+@pytest.mark.parametrize("path", ["/query/", "/query/export", "/query/stream"])
+def test_upstream_client_errors_keep_status_and_detail(path):
+    response = make_client(rejecting).post(path, json={"query": "show everything"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Query rejected: size must be at most 10000"}
+
+
+def test_upstream_validation_errors_are_relayed():
+    detail = [{"loc": ["body", "format"], "msg": "unexpected value", "type": "literal_error"}]
+    client = make_client(lambda request: httpx.Response(422, json={"detail": detail}))
+    response = client.post("/query/export", json={"query": "x"})
+    assert response.status_code == 422
+    assert response.json() == {"detail": detail}
+
+
+def test_upstream_server_errors_and_transport_errors_are_500s():
+    response = make_client(lambda request: httpx.Response(503, text="unavailable")).post(
+        "/query/", json={"query": "x"}
+    )
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("MCP AI service error:")
+
+    def unreachable(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    response = make_client(unreachable).post("/query/stream", json={"query": "x"})
+    assert response.status_code == 500
+    assert "connection refused" in response.json()["detail"]
+
+
+def test_alert_manager_rejections_are_relayed_and_not_cached():
+    calls = []
+
+    def alert_manager(request):
+        calls.append(request.url.params.get("cursor"))
+        return httpx.Response(400, json={"detail": "Invalid cursor"})
+
+    client = make_client(alert_manager)
+    for _ in range(2):
+        response = client.get("/alerts/", params={"cursor": "bogus"})
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor"}
+    assert calls == ["bogus", "bogus"]
@@ -20,6 +20,15 @@ class Settings(BaseSettings):
     RUN_INTERVAL_SECONDS: int = 60
     RULE_PATH: str = "rules"
     
+    # Prometheus metrics listener
+    METRICS_PORT: int = 9108
+    
+    # Tracing: "none", "file" (JSON lines at TRACE_FILE_PATH) or "otlp"
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "/tmp/thunderx-traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACE_SAMPLE_RATIO: float = 1.0
+    
     class Config:
         env_file = ".env"
 
@@ -3,13 +3,20 @@ Detection Engine Main Service
 Runs scheduled queries against OpenSearch to detect threats
 """
 import asyncio
+import time
 import structlog
 import httpx
 from datetime import datetime, timedelta
 from opensearchpy import AsyncOpenSearch
+from opentelemetry.trace import SpanKind
 
 from .config import settings
 from .rules_loader import RuleLoader
+from .metrics import (
+    ALERTS_TRIGGERED, LOOP_DURATION, RULE_DURATION, RULE_ERRORS,
+    start_metrics_server, track_dependency
+)
+from .tracing import inject_headers, setup_tracing, tracer
 
 # Configure logging
 structlog.configure(
@@ -40,11 +47,14 @@ class DetectionEngine:
     async def run(self):
         """Main loop"""
         logger.info("Starting Detection Engine")
+        start_metrics_server(settings.METRICS_PORT)
+        setup_tracing("detection-engine")
         await self.load_rules()
         
         while True:
-            start_time = datetime.utcnow()
+            started = time.perf_counter()
             await self.run_cycle()
+            LOOP_DURATION.labels("detection").observe(time.perf_counter() - started)
             
             # Simple sleep for interval
             await asyncio.sleep(settings.RUN_INTERVAL_SECONDS)
@@ -52,10 +62,17 @@ class DetectionEngine:
     async def run_cycle(self):
         """Execute one cycle of all rules"""
         for rule in self.rules:
+            started = time.perf_counter()
             try:
-                await self.execute_rule(rule)
+                with tracer.start_as_current_span(
+                    "DetectionEngine.execute_rule", attributes={"rule.name": rule['name']}
+                ):
+                    await self.execute_rule(rule)
             except Exception as e:
+                RULE_ERRORS.labels(rule['name']).inc()
                 logger.error("Error executing rule", rule=rule['name'], error=str(e))
+            finally:
+                RULE_DURATION.labels(rule['name']).observe(time.perf_counter() - started)
 
     async def execute_rule(self, rule):
         """Execute a single rule"""
@@ -80,10 +97,17 @@ class DetectionEngine:
         }
         
         # Search
-        response = await self.os_client.search(
-            index=rule['index'],
-            body=query
-        )
+        with tracer.start_as_current_span(
+            "opensearch.search",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "opensearch", "opensearch.index": rule['index']},
+        ):
+            async with track_dependency("opensearch", "search"):
+                response = await self.os_client.search(
+                    index=rule['index'],
+                    body=query,
+                    headers=inject_headers()
+                )
         
         # Evaluate Condition
         # Basic implementation: Check aggregation buckets
@@ -103,6 +127,7 @@ class DetectionEngine:
     async def trigger_alert(self, rule, entity, count):
         """Send alert to Alert Manager"""
         logger.warn("Rule Triggered", rule=rule['name'], entity=entity, count=count)
+        ALERTS_TRIGGERED.labels(rule['name']).inc()
         
         payload = {
             "title": f"Detection: {rule['name']} ({entity})",
@@ -112,7 +137,13 @@ class DetectionEngine:
         
         async with httpx.AsyncClient() as client:
             try:
-                await client.post(f"{settings.ALERT_MANAGER_URL}/cases", json=payload)
+                with tracer.start_as_current_span("POST alert-manager /cases", kind=SpanKind.CLIENT):
+                    async with track_dependency("alert_manager", "create_case"):
+                        await client.post(
+                            f"{settings.ALERT_MANAGER_URL}/cases",
+                            json=payload,
+                            headers=inject_headers()
+                        )
             except Exception as e:
                 logger.error("Failed to send alert", error=str(e))
 
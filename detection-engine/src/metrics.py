@@ -0,0 +1,64 @@
+"""
+Prometheus instrumentation for the Detection Engine
+The engine has no web server, so metrics are served by prometheus_client's
+own HTTP listener on METRICS_PORT
+"""
+
+import time
+from contextlib import asynccontextmanager
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_call_duration_seconds",
+    "Latency of calls to OpenSearch and the Alert Manager",
+    ["dependency", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_call_errors_total",
+    "Failed calls to OpenSearch and the Alert Manager",
+    ["dependency", "operation"],
+)
+LOOP_DURATION = Histogram(
+    "background_loop_cycle_seconds",
+    "Duration of one background loop cycle",
+    ["loop"],
+    buckets=LATENCY_BUCKETS + (120.0, 300.0, 600.0),
+)
+RULE_DURATION = Histogram(
+    "detection_rule_duration_seconds",
+    "Time to execute one detection rule",
+    ["rule"],
+    buckets=LATENCY_BUCKETS,
+)
+RULE_ERRORS = Counter(
+    "detection_rule_errors_total",
+    "Detection rule executions that failed",
+    ["rule"],
+)
+ALERTS_TRIGGERED = Counter(
+    "detection_alerts_triggered_total",
+    "Alerts raised by detection rules",
+    ["rule"],
+)
+
+
+@asynccontextmanager
+async def track_dependency(dependency: str, operation: str):
+    """Time an async dependency call, counting it as an error if it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        DEPENDENCY_LATENCY.labels(dependency, operation).observe(time.perf_counter() - started)
+
+
+def start_metrics_server(port: int):
+    """Serve /metrics in a background thread"""
+    start_http_server(port)
@@ -0,0 +1,54 @@
+"""
+Distributed tracing for the Detection Engine
+Each rule execution is a root span; its OpenSearch search and any alert
+posted to the Alert Manager carry the W3C traceparent, so an alert can be
+followed into alert-manager's spans
+"""
+
+from typing import Dict, Optional
+
+import structlog
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+tracer = trace.get_tracer("thunderx")
+
+
+def _create_exporter():
+    if settings.TRACE_EXPORTER == "file":
+        out = open(settings.TRACE_FILE_PATH, "a", buffering=1)
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    if settings.TRACE_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp-proto-http not installed, spans are not exported")
+            return None
+        return OTLPSpanExporter(endpoint=settings.TRACE_OTLP_ENDPOINT)
+    return None
+
+
+def setup_tracing(service_name: str):
+    """Install the tracer provider; context is propagated even when nothing is exported"""
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACE_SAMPLE_RATIO)),
+    )
+    exporter = _create_exporter()
+    if exporter is not None:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add traceparent (and tracestate) for the current span to outgoing headers"""
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
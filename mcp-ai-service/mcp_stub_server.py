@@ -0,0 +1,168 @@
+"""
+Minimal MCP server for the client tests
+Speaks newline-delimited JSON-RPC on stdin/stdout when run as a script,
+and streamable HTTP through serve_http() for in-process tests. Tools:
+echo (returns its arguments after an optional delay), fail (JSON-RPC
+error), exit (kills the process without replying) and add_tool
+(registers a tool and announces tools/list_changed).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+PROTOCOL_VERSION = "2025-03-26"
+# Small pages so tools/list pagination is exercised
+PAGE_SIZE = 2
+
+Message = Dict[str, Any]
+
+
+class StubMCP:
+    """Request handling shared by both transports"""
+
+    def __init__(self):
+        self.tools = [{"name": name, "inputSchema": {"type": "object"}} for name in ("echo", "fail", "exit", "add_tool")]
+        self.lock = threading.Lock()
+
+    def handle(self, message: Message, notify: Callable[[Message], None]) -> Optional[Message]:
+        """Reply to one request (None for notifications); server notifications go to `notify`"""
+        if "id" not in message:
+            return None
+        method, params = message.get("method"), message.get("params") or {}
+
+        def result(value: Any) -> Message:
+            return {"jsonrpc": "2.0", "id": message["id"], "result": value}
+
+        def error(code: int, text: str) -> Message:
+            return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": code, "message": text}}
+
+        if method == "initialize":
+            return result({
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": True}},
+                "serverInfo": {"name": "stub-mcp", "version": "0"},
+            })
+        if method == "tools/list":
+            start = int(params.get("cursor") or 0)
+            with self.lock:
+                tools = list(self.tools)
+            page: Message = {"tools": tools[start:start + PAGE_SIZE]}
+            if start + PAGE_SIZE < len(tools):
+                page["nextCursor"] = str(start + PAGE_SIZE)
+            return result(page)
+        if method == "tools/call":
+            name, arguments = params.get("name"), params.get("arguments") or {}
+            if name == "echo":
+                time.sleep(arguments.get("delay", 0))
+                return result({"content": [{"type": "text", "text": json.dumps(arguments)}], "pid": os.getpid()})
+            if name == "fail":
+                return error(-32602, "fail always fails")
+            if name == "exit":
+                os._exit(0)
+            if name == "add_tool":
+                with self.lock:
+                    self.tools.append({"name": arguments["name"], "inputSchema": {"type": "object"}})
+                notify({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+                return result({"content": []})
+        return error(-32601, f"Method not found: {method}")
+
+
+def serve_stdio():
+    """Handle each request on its own thread so responses can come back out of order"""
+    mcp = StubMCP()
+    write_lock = threading.Lock()
+
+    def write(message: Message):
+        with write_lock:
+            sys.stdout.write(json.dumps(message) + "\n")
+            sys.stdout.flush()
+
+    def run(message: Message):
+        reply = mcp.handle(message, write)
+        if reply is not None:
+            write(reply)
+
+    for line in sys.stdin:
+        threading.Thread(target=run, args=(json.loads(line),), daemon=True).start()
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Streamable HTTP endpoint with sessions that tests can expire"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _HTTPHandler)
+        self.mcp = StubMCP()
+        self.sessions = set()
+        self.posts = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/mcp"
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    server: StubHTTPServer
+
+    def do_POST(self):
+        self.server.posts += 1
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        messages: List[Message] = payload if isinstance(payload, list) else [payload]
+
+        session = self.headers.get("Mcp-Session-Id")
+        if any(m.get("method") == "initialize" for m in messages):
+            session = uuid.uuid4().hex
+            self.server.sessions.add(session)
+        elif session not in self.server.sessions:
+            self.send_error(404)
+            return
+
+        notifications: List[Message] = []
+        replies = [r for r in (self.server.mcp.handle(m, notifications.append) for m in messages) if r]
+        if not replies:
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        response = replies if isinstance(payload, list) else replies[0]
+        if notifications:
+            # Notifications ride on an SSE stream ahead of the response
+            body = "".join(f"event: message\ndata: {json.dumps(m)}\n\n" for m in [*notifications, response]).encode()
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps(response).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Mcp-Session-Id", session)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_DELETE(self):
+        self.server.sessions.discard(self.headers.get("Mcp-Session-Id"))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_http() -> StubHTTPServer:
+    """Start an HTTP stub on a free port in a background thread"""
+    server = StubHTTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    serve_stdio()
@@ -0,0 +1,59 @@
+"""
+Field mappings from scripts/setup-opensearch-templates.sh, for tests
+Lets tests check that the fields queries aggregate on are mapped to a
+type OpenSearch can aggregate (keyword, ip, numeric, date).
+"""
+
+import fnmatch
+import json
+import os
+import re
+from typing import Any, Dict
+
+SETUP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "setup-opensearch-templates.sh")
+
+AGGREGATABLE_TYPES = {
+    "keyword", "ip", "date", "boolean",
+    "byte", "short", "integer", "long", "float", "half_float", "double", "scaled_float",
+}
+
+
+def _flatten(properties: Dict[str, Any], prefix: str, out: Dict[str, str]):
+    for name, spec in properties.items():
+        path = prefix + name
+        if "properties" in spec:
+            _flatten(spec["properties"], path + ".", out)
+        if "type" in spec:
+            out[path] = spec["type"]
+        for sub, sub_spec in spec.get("fields", {}).items():
+            out[f"{path}.{sub}"] = sub_spec["type"]
+
+
+def load_template_mappings() -> Dict[str, Dict[str, str]]:
+    """Index pattern -> {dotted field name: type}, multi-fields included"""
+    with open(SETUP_SCRIPT) as f:
+        script = f.read()
+    mappings: Dict[str, Dict[str, str]] = {}
+    for body in re.findall(r"-d '(\{.*?\})'", script, re.DOTALL):
+        template = json.loads(body)
+        if "template" not in template:
+            continue
+        fields: Dict[str, str] = {}
+        _flatten(template["template"].get("mappings", {}).get("properties", {}), "", fields)
+        for pattern in template["index_patterns"]:
+            mappings[pattern] = fields
+    return mappings
+
+
+def field_type(index: str, field: str) -> str:
+    """Mapped type of `field` in every template covering `index`; "unmapped" (dynamic text) if absent"""
+    mappings = load_template_mappings()
+    types = {
+        fields.get(field, "unmapped")
+        for part in index.split(",")
+        for pattern, fields in mappings.items()
+        if fnmatch.fnmatch(part.replace("*", "x"), pattern)
+    }
+    if not types:
+        return "unmapped"
+    return types.pop() if len(types) == 1 else "conflicting: " + ", ".join(sorted(types))
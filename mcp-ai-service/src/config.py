@@ -29,9 +29,32 @@ class Settings(BaseSettings):
     MCP_AI_TEMPERATURE: float = 0.3
     MCP_AI_MAX_TOKENS: int = 2000
     
+    # MCP server session: "http" (streamable HTTP) or "stdio" (spawn MCP_STDIO_COMMAND)
+    MCP_TRANSPORT: str = "http"
+    # Full endpoint URL; defaults to http://OPENSEARCH_HOST:OPENSEARCH_MCP_PORT + MCP_SERVER_PATH
+    MCP_SERVER_URL: str = ""
+    MCP_SERVER_PATH: str = "/mcp"
+    MCP_STDIO_COMMAND: List[str] = []
+    MCP_PROTOCOL_VERSION: str = "2025-03-26"
+    MCP_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    MCP_MAX_CONNECTIONS: int = 20
+    MCP_TOOLS_CACHE_TTL_SECONDS: float = 300.0
+    MCP_RECONNECT_ATTEMPTS: int = 5
+    MCP_RECONNECT_BASE_DELAY: float = 0.5
+    MCP_RECONNECT_MAX_DELAY: float = 30.0
+    
     # OpenAI (if using OpenAI models)
     OPENAI_API_KEY: str = ""
     
+    # LLM client: one pooled client per process, with bounded concurrency
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    
     # Anthropic (if using Claude)
     ANTHROPIC_API_KEY: str = ""
     
@@ -43,9 +66,75 @@ class Settings(BaseSettings):
     DEFAULT_QUERY_SIZE: int = 100
     QUERY_TIMEOUT_SECONDS: int = 30
     
+    # Guardrails applied to translated DSL before it is executed
+    QUERY_GUARD_ENABLED: bool = True
+    # Lower bound added to queries without an @timestamp range
+    QUERY_DEFAULT_TIME_RANGE: str = "now-24h"
+    QUERY_MAX_TIME_RANGE_DAYS: int = 30
+    QUERY_MAX_AGG_BUCKETS: int = 10000
+    
+    # Search result cache (OpenSearchClient.search), bounded by bytes
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL_SECONDS: float = 30.0
+    SEARCH_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Larger responses are returned but not cached
+    SEARCH_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+    # Date math unit relative range bounds are rounded to ("now-24h" -> "now-24h/m"); empty disables
+    SEARCH_CACHE_TIME_ROUNDING: str = "m"
+    
+    # Rule-based NL-to-DSL compiler, tried before the LLM
+    QUERY_COMPILER_ENABLED: bool = True
+    
+    # Translation cache (LLM results keyed on normalized query + model settings)
+    TRANSLATION_CACHE_ENABLED: bool = True
+    TRANSLATION_CACHE_SIZE: int = 1000
+    TRANSLATION_CACHE_TTL_SECONDS: int = 86400
+    # JSON file the cache is persisted to; empty keeps it in memory only
+    TRANSLATION_CACHE_PATH: str = ""
+    
+    # Server-sent event query streams: hits per page event
+    STREAM_PAGE_SIZE: int = 500
+    
+    # Export (point-in-time + search_after streaming)
+    EXPORT_PAGE_SIZE: int = 5000
+    EXPORT_PIT_KEEP_ALIVE: str = "2m"
+    EXPORT_MAX_ROWS: int = 10000000
+    
     # Threat hunting
     THREAT_HUNTING_ENABLED: bool = True
     CORRELATION_WINDOW_MINUTES: int = 60
+    ZEEK_INDEX_PATTERN: str = "zeek-*"
+    SURICATA_INDEX_PATTERN: str = "suricata-*"
+    COMPOSITE_PAGE_SIZE: int = 5000
+    INTERNAL_NETWORKS: List[str] = ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"]
+    
+    # Lateral movement graph analysis
+    LATERAL_SERVICES: List[str] = ["ssh", "rdp", "smb", "krb", "krb_tcp", "dce_rpc", "ntlm", "winrm"]
+    LATERAL_PORTS: List[int] = [22, 88, 135, 445, 3389, 5985, 5986]
+    LATERAL_MAX_HOPS: int = 3
+    LATERAL_MAX_EDGES: int = 50000
+    LATERAL_FRONTIER_BATCH: int = 1024
+    LATERAL_FANOUT_MIN: int = 10
+    LATERAL_FANOUT_FACTOR: float = 3.0
+    
+    # Beaconing analysis (time series scored per src/dst/port pair)
+    BEACON_BIN_SECONDS: int = 60
+    # Bins per series; wider windows get proportionally wider bins
+    BEACON_MAX_BINS: int = 2880
+    BEACON_MIN_CONNECTIONS: int = 20
+    BEACON_MAX_PAIRS: int = 2000
+    BEACON_PAIR_BATCH: int = 500
+    BEACON_MIN_SCORE: float = 0.7
+    BEACON_MAX_RESULTS: int = 100
+    
+    # Response compression (bodies smaller than this are sent as-is)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
+    # Tracing: "none", "file" (JSON lines at TRACE_FILE_PATH) or "otlp"
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "/tmp/thunderx-traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACE_SAMPLE_RATIO: float = 1.0
     
     class Config:
         env_file = ".env"
@@ -13,8 +13,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
+from .metrics import setup_metrics
+from .responses import CompressionMiddleware, ORJSONResponse
+from .tracing import TracingMiddleware, setup_tracing, shutdown_tracing
 from .routes import mcp, query, health, tools
 from .services.opensearch_client import OpenSearchClient
+from .services.query_translator import QueryTranslator
 from .services.mcp_client import MCPClient
 from .services.threat_hunting import ThreatHuntingService
 from .services.incident_response import IncidentResponseService
@@ -30,6 +34,8 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+setup_tracing("mcp-ai-service")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,6 +44,7 @@ async def lifespan(app: FastAPI):
     
     # Initialize clients
     app.state.opensearch_client = OpenSearchClient()
+    app.state.query_translator = QueryTranslator()
     app.state.mcp_client = MCPClient()
     
     # Initialize services
@@ -56,6 +63,8 @@ async def lifespan(app: FastAPI):
     # Cleanup
     logger.info("Shutting down ThunderX MCP AI Service")
     await app.state.mcp_client.disconnect()
+    await app.state.query_translator.close()
+    shutdown_tracing()
 
 
 # Create FastAPI app
@@ -63,6 +72,7 @@ app = FastAPI(
     title="ThunderX MCP AI Service",
     description="AI-powered network security analysis using MCP",
     version=settings.VERSION,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -75,6 +85,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# W3C trace context in, spans out
+app.add_middleware(TracingMiddleware, root_app=app)
+
+# Prometheus metrics on /metrics (added last so request timings include every middleware)
+setup_metrics(app)
+
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(query.router, prefix="/query", tags=["query"])
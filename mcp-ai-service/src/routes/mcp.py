@@ -2,6 +2,8 @@
 MCP-specific routes
 """
 
+from typing import Any, Dict, List
+
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 import structlog
@@ -17,6 +19,17 @@ class MCPStatusResponse(BaseModel):
     capabilities: dict
 
 
+class ToolCall(BaseModel):
+    """One MCP tool invocation"""
+    name: str
+    arguments: Dict[str, Any] = {}
+
+
+class ToolBatchRequest(BaseModel):
+    """Tool invocations sent to the server together"""
+    calls: List[ToolCall]
+
+
 @router.get("/status", response_model=MCPStatusResponse)
 async def get_mcp_status(request: Request):
     """Get MCP server connection status"""
@@ -45,3 +58,26 @@ async def reconnect_mcp(request: Request):
     except Exception as e:
         logger.error("Failed to reconnect to MCP", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tools")
+async def list_mcp_tools(request: Request, refresh: bool = False):
+    """List the tools the MCP server offers (cached)"""
+    try:
+        mcp_client = request.app.state.mcp_client
+        return {"tools": await mcp_client.list_tools(refresh=refresh)}
+    except Exception as e:
+        logger.error("Failed to list MCP tools", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/tools/call")
+async def call_mcp_tools(request: Request, body: ToolBatchRequest):
+    """Call one or more MCP tools in a single round trip"""
+    try:
+        mcp_client = request.app.state.mcp_client
+        results = await mcp_client.execute_tools([(call.name, call.arguments) for call in body.calls])
+        return {"results": results}
+    except Exception as e:
+        logger.error("Failed to call MCP tools", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
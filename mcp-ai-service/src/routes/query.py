@@ -2,12 +2,17 @@
 FastAPI routes for natural language query endpoint
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import structlog
 
+from ..config import settings
+from ..services.export import EXPORT_FORMATS, stream_export
+from ..services.query_guard import QueryRejected, guard_query
 from ..services.query_translator import QueryTranslator
+from ..services.streaming import SSE_HEADERS, SSE_MEDIA_TYPE, stream_query_events
 from ..services.opensearch_client import OpenSearchClient
 
 logger = structlog.get_logger()
@@ -29,6 +34,18 @@ class QueryResponse(BaseModel):
     total: int
     took_ms: int
     explanation: Optional[str] = None
+    aggregations: Optional[Dict[str, Any]] = None
+    guardrails: Optional[List[str]] = None
+
+
+class ExportRequest(BaseModel):
+    """Export request: a natural language query or a raw query clause"""
+    query: Optional[str] = None
+    dsl: Optional[Dict[str, Any]] = None
+    index_pattern: Optional[str] = "*"
+    format: Literal["ndjson", "csv"] = "ndjson"
+    fields: Optional[List[str]] = None
+    max_rows: Optional[int] = None
 
 
 @router.post("/", response_model=QueryResponse)
@@ -49,19 +66,29 @@ async def execute_natural_language_query(request_body: QueryRequest, request: Re
         opensearch_client: OpenSearchClient = request.app.state.opensearch_client
         
         # Translate natural language to OpenSearch DSL
-        translator = QueryTranslator()
+        translator: QueryTranslator = request.app.state.query_translator
         opensearch_query = await translator.translate(
             request_body.query,
             request_body.index_pattern
         )
         
-        # Override size if provided
-        if request_body.size:
+        # The explanation is for the caller; OpenSearch rejects unknown body keys
+        explanation = opensearch_query.pop("explanation", None)
+        
+        # Override size if provided (aggregation queries only need the buckets)
+        if request_body.size and "aggs" not in opensearch_query:
             opensearch_query["size"] = request_body.size
         
+        # Bound size, time range and index before anything reaches the cluster
+        index = request_body.index_pattern
+        guardrails = None
+        if settings.QUERY_GUARD_ENABLED:
+            guarded = guard_query(opensearch_query, index)
+            opensearch_query, index, guardrails = guarded.body, guarded.index, guarded.rewrites
+        
         # Execute query
         results = await opensearch_client.search(
-            index=request_body.index_pattern,
+            index=index,
             body=opensearch_query
         )
         
@@ -76,14 +103,111 @@ async def execute_natural_language_query(request_body: QueryRequest, request: Re
             results=[hit["_source"] for hit in hits],
             total=total,
             took_ms=took_ms,
-            explanation=opensearch_query.get("explanation")
+            explanation=explanation,
+            aggregations=results.get("aggregations"),
+            guardrails=guardrails or None
         )
         
+    except QueryRejected as e:
+        logger.warning("Query rejected by guardrails", query=request_body.query, reason=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Query execution failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/stream")
+async def stream_natural_language_query(request_body: QueryRequest, request: Request):
+    """
+    Execute a natural language query, streaming the results as server-sent events
+    
+    Events: `dsl` (translated query, sent as soon as translation is done),
+    then `page` (a list of documents, up to `size` in total) or
+    `aggregations`, then `done`, or `error` if the search fails midway.
+    """
+    logger.info("Received streaming query", query=request_body.query)
+    opensearch_client: OpenSearchClient = request.app.state.opensearch_client
+    translator: QueryTranslator = request.app.state.query_translator
+    
+    try:
+        opensearch_query = await translator.translate(request_body.query, request_body.index_pattern)
+        explanation = opensearch_query.pop("explanation", None)
+        if request_body.size and "aggs" not in opensearch_query:
+            opensearch_query["size"] = request_body.size
+        
+        index = request_body.index_pattern
+        guardrails = None
+        if settings.QUERY_GUARD_ENABLED:
+            guarded = guard_query(opensearch_query, index)
+            opensearch_query, index, guardrails = guarded.body, guarded.index, guarded.rewrites
+    except QueryRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Query translation failed", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    preamble = {
+        "query": request_body.query,
+        "index": index,
+        "opensearch_query": opensearch_query,
+        "explanation": explanation,
+        "guardrails": guardrails or None,
+    }
+    max_rows = min(opensearch_query.get("size") or settings.DEFAULT_QUERY_SIZE, settings.MAX_QUERY_RESULTS)
+    return StreamingResponse(
+        stream_query_events(opensearch_client, index, opensearch_query, preamble, max_rows),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS
+    )
+
+
+@router.post("/export")
+async def export_query_results(request_body: ExportRequest, request: Request):
+    """
+    Stream every matching document as NDJSON or CSV
+    
+    Results are paged with a point-in-time and search_after and written
+    out as they arrive, so memory use does not grow with the result size.
+    `dsl` is used as the query clause directly; otherwise `query` is
+    translated from natural language first.
+    """
+    if request_body.dsl is None and not request_body.query:
+        raise HTTPException(status_code=400, detail="Either query or dsl is required")
+    
+    opensearch_client: OpenSearchClient = request.app.state.opensearch_client
+    
+    if request_body.dsl is not None:
+        query_clause = request_body.dsl
+    else:
+        translator: QueryTranslator = request.app.state.query_translator
+        translated = await translator.translate(request_body.query, request_body.index_pattern)
+        query_clause = translated.get("query", {"match_all": {}})
+    
+    index = request_body.index_pattern
+    if settings.QUERY_GUARD_ENABLED:
+        try:
+            guarded = guard_query({"query": query_clause}, index)
+        except QueryRejected as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query_clause, index = guarded.body["query"], guarded.index
+    
+    max_rows = min(request_body.max_rows or settings.EXPORT_MAX_ROWS, settings.EXPORT_MAX_ROWS)
+    logger.info("Starting export", index=index, format=request_body.format)
+    
+    return StreamingResponse(
+        stream_export(
+            opensearch_client,
+            index,
+            query_clause,
+            fmt=request_body.format,
+            fields=request_body.fields,
+            max_rows=max_rows
+        ),
+        media_type=EXPORT_FORMATS[request_body.format],
+        headers={"Content-Disposition": f'attachment; filename="export.{request_body.format}"'}
+    )
+
+
 @router.get("/examples")
 async def get_example_queries():
     """Get example queries users can try"""
@@ -3,7 +3,7 @@ Tools API Router
 Exposes internal services as callable tools
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
@@ -16,6 +16,22 @@ router = APIRouter()
 class InvestigateIPRequest(BaseModel):
     ip_address: str
     time_range: Optional[str] = "now-24h"
+    include_hits: bool = False
+    hits_size: int = 20
+
+class LateralMovementRequest(BaseModel):
+    seed_ip: str
+    time_range: str = "now-24h"
+    baseline_range: str = "now-7d"
+    max_hops: Optional[int] = None
+    services: Optional[List[str]] = None
+
+class BeaconingRequest(BaseModel):
+    time_range: str = "now-24h"
+    external_only: bool = True
+    min_connections: Optional[int] = None
+    min_score: Optional[float] = None
+    max_results: Optional[int] = None
 
 class RemediationRequest(BaseModel):
     alert_id: str
@@ -39,11 +55,50 @@ async def investigate_ip(request: Request, body: InvestigateIPRequest):
     """
     try:
         service = request.app.state.threat_hunting_service
-        result = await service.investigate_ip(body.ip_address, body.time_range)
+        result = await service.investigate_ip(
+            body.ip_address,
+            body.time_range or "now-24h",
+            include_hits=body.include_hits,
+            hits_size=min(body.hits_size, 100)
+        )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/lateral_movement")
+async def lateral_movement(request: Request, body: LateralMovementRequest):
+    """
+    Tool: Lateral movement graph from a seed host
+    """
+    try:
+        service = request.app.state.threat_hunting_service
+        return await service.analyze_lateral_movement(
+            body.seed_ip,
+            time_range=body.time_range,
+            baseline_range=body.baseline_range,
+            max_hops=body.max_hops,
+            services=body.services
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/beaconing")
+async def beaconing(request: Request, body: BeaconingRequest):
+    """
+    Tool: Periodic (beaconing) connections across all host pairs
+    """
+    try:
+        service = request.app.state.threat_hunting_service
+        return await service.find_beacons(
+            time_range=body.time_range,
+            external_only=body.external_only,
+            min_connections=body.min_connections,
+            min_score=body.min_score,
+            max_results=body.max_results
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/generate_remediation")
 async def generate_remediation(request: Request, body: RemediationRequest):
     """
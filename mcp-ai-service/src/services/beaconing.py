@@ -0,0 +1,95 @@
+"""
+Beaconing analysis
+Scores connection time series for periodicity. Each (src, dst, port)
+pair is one row of a pairs x time-bins count matrix, and every statistic
+is computed for all rows at once with NumPy.
+"""
+
+import warnings
+from typing import Dict
+
+import numpy as np
+
+
+def score_series(counts: np.ndarray, bin_seconds: int) -> Dict[str, np.ndarray]:
+    """
+    Periodicity scores for each row of a (pairs, bins) connection count matrix
+
+    Intervals are the gaps between active bins. Regular beacons have a
+    low coefficient of variation (jitter), symmetric interval quartiles
+    (Bowley skew near 0) and a small median absolute deviation; the
+    interval score averages those three.
+
+    A pair active in (nearly) every bin has intervals of one bin whatever
+    its timing, so as the fill ratio goes from 0.5 to 0.9 the score shifts
+    to the per-bin counts instead: a beacon faster than the bin width puts
+    almost the same number of connections in every bin (Fano factor, the
+    variance/mean ratio, near 0) while random traffic is Poisson-like
+    (Fano near 1) or burstier. The dominant FFT frequency of the counts
+    gives an independent period estimate, with its power over the mean
+    non-DC power as a prominence (0 for a flat series, which has no peak).
+
+    Returns arrays (one value per row): score, jitter, period_seconds,
+    fft_period_seconds, fft_prominence, fill, active_bins.
+    """
+    rows, bins = counts.shape
+    active = counts > 0
+    active_bins = active.sum(axis=1)
+
+    # Active bin positions, NaN-padded and pushed to the end of each row
+    positions = np.where(active, np.arange(bins, dtype=np.float32), np.nan)
+    positions = np.sort(positions, axis=1)
+    intervals = np.diff(positions, axis=1)
+
+    # Rows with fewer than two active bins are all-NaN; numpy warns about each
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        mean = np.nanmean(intervals, axis=1)
+        std = np.nanstd(intervals, axis=1)
+        q1, median, q3 = np.nanpercentile(intervals, [25, 50, 75], axis=1)
+        mad = np.nanmedian(np.abs(intervals - median[:, None]), axis=1)
+
+        jitter = std / mean
+        spread = q3 - q1
+        skew = np.where(spread > 0, (q3 + q1 - 2 * median) / spread, 0.0)
+
+        cv_score = 1 - np.clip(jitter, 0, 1)
+        skew_score = 1 - np.clip(np.abs(skew), 0, 1)
+        mad_score = 1 - np.clip(mad / median, 0, 1)
+        score = (cv_score + skew_score + mad_score) / 3
+
+    # Saturated rows: score the regularity of the counts themselves
+    fill = active_bins / bins
+    count_mean = counts.mean(axis=1)
+    fano = np.divide(counts.var(axis=1), count_mean, out=np.ones(rows), where=count_mean > 0)
+    count_score = 1 - np.clip(fano, 0, 1)
+    saturation = np.clip((fill - 0.5) / 0.4, 0, 1)
+    score = (1 - saturation) * np.nan_to_num(score) + saturation * count_score
+
+    # Rows with fewer than three events have no meaningful interval statistics
+    score = np.where(active_bins >= 3, score, 0.0)
+
+    # Dominant non-DC frequency of the mean-removed counts
+    signal = counts.astype(np.float32)
+    signal -= signal.mean(axis=1, keepdims=True)
+    power = np.abs(np.fft.rfft(signal, axis=1)) ** 2
+    if power.shape[1] > 1:
+        peak = np.argmax(power[:, 1:], axis=1) + 1
+        noise = power[:, 1:].mean(axis=1)
+        peak_power = power[np.arange(rows), peak]
+        fft_prominence = np.divide(peak_power, noise, out=np.zeros(rows), where=noise > 1e-6)
+    else:
+        peak = np.ones(rows, dtype=int)
+        fft_prominence = np.zeros(rows)
+    fft_period_seconds = np.where(fft_prominence > 0, bins / peak * bin_seconds, 0.0)
+
+    return {
+        "score": score,
+        "jitter": np.nan_to_num(jitter, nan=0.0),
+        "period_seconds": np.nan_to_num(median, nan=0.0) * bin_seconds,
+        "fft_period_seconds": fft_period_seconds,
+        "fft_prominence": fft_prominence,
+        "fill": fill,
+        "active_bins": active_bins,
+    }
+
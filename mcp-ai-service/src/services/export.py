@@ -0,0 +1,90 @@
+"""
+Result export
+Serializes search hits to NDJSON or CSV as a byte stream
+"""
+
+import csv
+import io
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import structlog
+
+from .opensearch_client import OpenSearchClient
+
+logger = structlog.get_logger()
+
+# Hits are coalesced into chunks of about this size before being yielded
+CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def flatten(doc: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested objects into dotted keys for CSV columns"""
+    flat: Dict[str, Any] = {}
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+async def stream_export(
+    os_client: OpenSearchClient,
+    index: str,
+    query: Dict[str, Any],
+    fmt: str = "ndjson",
+    fields: Optional[List[str]] = None,
+    sort: Optional[List[Dict[str, Any]]] = None,
+    max_rows: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield the export body in chunks of roughly CHUNK_BYTES
+
+    CSV columns are `fields` when given, otherwise the flattened keys of the
+    first hit; later hits with extra keys are truncated to those columns.
+    """
+    writer = None
+    buffer = io.StringIO()
+    rows = 0
+
+    # aclosing() releases the PIT as soon as we stop, even on an early break
+    async with aclosing(os_client.iter_pit(index, query, sort=sort, source=fields)) as hits:
+        async for hit in hits:
+            source = hit.get("_source", {})
+
+            if fmt == "ndjson":
+                buffer.write(json.dumps(source, default=str))
+                buffer.write("\n")
+            else:
+                flat = flatten(source)
+                if writer is None:
+                    writer = csv.DictWriter(
+                        buffer, fieldnames=fields or list(flat), extrasaction="ignore"
+                    )
+                    writer.writeheader()
+                writer.writerow(flat)
+
+            if buffer.tell() >= CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+            rows += 1
+            if max_rows and rows >= max_rows:
+                logger.info("Export truncated at row limit", rows=rows)
+                break
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+    logger.info("Export complete", rows=rows, index=index, format=fmt)
@@ -0,0 +1,112 @@
+"""
+Host-to-host connection graph
+Compact adjacency built from aggregation buckets (one entry per distinct
+edge, not per connection) with the reachability and fan-out analyses used
+for lateral movement hunting
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+@dataclass
+class Edge:
+    """Aggregated connections from one host to another"""
+    count: int = 0
+    services: Set[str] = field(default_factory=set)
+    first_seen: Optional[str] = None
+    last_seen: Optional[str] = None
+    new: bool = False
+
+
+class HostGraph:
+    """Directed graph of host communication"""
+
+    def __init__(self, max_edges: int = 50000):
+        self.max_edges = max_edges
+        self.adjacency: Dict[str, Dict[str, Edge]] = {}
+        self.edge_count = 0
+        self.truncated = False
+
+    def add_edge(
+        self,
+        src: str,
+        dst: str,
+        service: Optional[str],
+        count: int,
+        first_seen: Optional[str],
+        last_seen: Optional[str]
+    ) -> bool:
+        """Merge an aggregation bucket into the graph; False once the edge cap is hit"""
+        edges = self.adjacency.setdefault(src, {})
+        edge = edges.get(dst)
+        if edge is None:
+            if self.edge_count >= self.max_edges:
+                self.truncated = True
+                return False
+            edge = edges[dst] = Edge()
+            self.edge_count += 1
+        edge.count += count
+        if service:
+            edge.services.add(service)
+        if first_seen and (edge.first_seen is None or first_seen < edge.first_seen):
+            edge.first_seen = first_seen
+        if last_seen and (edge.last_seen is None or last_seen > edge.last_seen):
+            edge.last_seen = last_seen
+        return True
+
+    def out_degree(self, host: str) -> int:
+        return len(self.adjacency.get(host, {}))
+
+    def reachable(self, seed: str, max_hops: int) -> Dict[str, Tuple[int, Optional[str]]]:
+        """Hosts reachable from `seed` within `max_hops`, as host -> (hop, previous host)"""
+        seen: Dict[str, Tuple[int, Optional[str]]] = {seed: (0, None)}
+        queue = deque([seed])
+        while queue:
+            host = queue.popleft()
+            hop = seen[host][0]
+            if hop >= max_hops:
+                continue
+            for peer in self.adjacency.get(host, {}):
+                if peer not in seen:
+                    seen[peer] = (hop + 1, host)
+                    queue.append(peer)
+        return seen
+
+    def fan_out_anomalies(self, minimum: int, factor: float) -> List[Dict[str, Any]]:
+        """
+        Sources contacting unusually many distinct hosts
+
+        A host is flagged when its out-degree reaches `minimum` and, when
+        there are enough peers to compare against, is at least `factor`
+        times the median out-degree of the other sources.
+        """
+        degrees = {host: len(peers) for host, peers in self.adjacency.items() if peers}
+        if not degrees:
+            return []
+        typical = median(degrees.values())
+        anomalies = []
+        for host, degree in degrees.items():
+            if degree < minimum:
+                continue
+            if len(degrees) >= 3 and degree < factor * typical:
+                continue
+            anomalies.append({"ip": host, "out_degree": degree, "median_out_degree": typical})
+        return sorted(anomalies, key=lambda a: a["out_degree"], reverse=True)
+
+    def edges(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "src": src,
+                "dst": dst,
+                "services": sorted(edge.services),
+                "count": edge.count,
+                "first_seen": edge.first_seen,
+                "last_seen": edge.last_seen,
+                "new": edge.new,
+            }
+            for src, peers in self.adjacency.items()
+            for dst, edge in peers.items()
+        ]
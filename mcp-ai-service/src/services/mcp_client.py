@@ -1,107 +1,556 @@
 """
 MCP Client for connecting to OpenSearch MCP Server
+JSON-RPC 2.0 over streamable HTTP or stdio with one persistent session:
+the initialize handshake runs once, concurrent calls are matched to their
+responses by request id, tool listings are cached until the server says
+they changed, and a lost session is re-established with backoff.
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import httpx
 import structlog
 
 from ..config import settings
+from ..metrics import track_dependency
+from ..tracing import inject_headers
 
 logger = structlog.get_logger()
 
+CLIENT_INFO = {"name": "thunderx-mcp-ai-service", "version": settings.VERSION}
+# Streamable HTTP revisions that accept JSON-RPC batches
+BATCHING_VERSIONS = {"2025-03-26"}
+# stdout line limit for stdio servers; tool results arrive as one line each
+STDIO_LINE_LIMIT = 32 * 1024 * 1024
+
+Message = Dict[str, Any]
+Payload = Union[Message, List[Message]]
+
+
+class MCPError(RuntimeError):
+    """JSON-RPC error returned by the MCP server"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"MCP error {code}: {message}")
+        self.code = code
+        self.data = data
+
+
+class SessionLost(ConnectionError):
+    """The session or transport was gone before the server accepted the request, so it is safe to retry"""
+
+
+class _HTTPTransport:
+    """Streamable HTTP: each message is a POST answered with JSON or an SSE stream"""
+
+    def __init__(self, url: str, on_message: Callable[[Message], None]):
+        self.url = url
+        self.on_message = on_message
+        self.session_id: Optional[str] = None
+        self.protocol_version: Optional[str] = None
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.MCP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MCP_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.MCP_REQUEST_TIMEOUT_SECONDS, connect=5.0),
+        )
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.protocol_version in BATCHING_VERSIONS
+
+    async def start(self):
+        pass
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        if self.protocol_version:
+            headers["MCP-Protocol-Version"] = self.protocol_version
+        return inject_headers(headers)
+
+    def _deliver(self, payload: Payload):
+        for message in payload if isinstance(payload, list) else [payload]:
+            self.on_message(message)
+
+    async def send(self, payload: Payload):
+        """POST a message (or batch); any responses are delivered before this returns"""
+        try:
+            async with self.client.stream(
+                "POST", self.url, content=json.dumps(payload), headers=self._headers()
+            ) as response:
+                if response.status_code == 404 and self.session_id:
+                    raise SessionLost("MCP session expired")
+                response.raise_for_status()
+                if "mcp-session-id" in response.headers:
+                    self.session_id = response.headers["mcp-session-id"]
+                if response.status_code == 202:
+                    return
+                if response.headers.get("content-type", "").startswith("text/event-stream"):
+                    await self._read_events(response)
+                else:
+                    body = await response.aread()
+                    if body:
+                        self._deliver(json.loads(body))
+        except httpx.ConnectError as e:
+            raise SessionLost(f"MCP server unreachable: {e}") from e
+
+    async def _read_events(self, response: httpx.Response):
+        data: List[str] = []
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+            elif not line and data:
+                self._deliver(json.loads("\n".join(data)))
+                data = []
+        if data:
+            self._deliver(json.loads("\n".join(data)))
+
+    async def close(self):
+        if self.session_id:
+            try:
+                await self.client.delete(self.url, headers=self._headers())
+            except httpx.HTTPError:
+                pass
+        await self.client.aclose()
+
+
+class _StdioTransport:
+    """Newline-delimited JSON-RPC over a child process's stdin/stdout"""
+
+    supports_batching = False
+
+    def __init__(self, command: List[str], on_message: Callable[[Message], None], on_close: Callable[[], None]):
+        self.command = command
+        self.on_message = on_message
+        self.on_close = on_close
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=STDIO_LINE_LIMIT,
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def send(self, payload: Payload):
+        if self.process is None or self.process.returncode is not None:
+            raise SessionLost("MCP server process is not running")
+        data = "".join(json.dumps(m) + "\n" for m in (payload if isinstance(payload, list) else [payload]))
+        async with self._write_lock:
+            try:
+                self.process.stdin.write(data.encode())
+                await self.process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise SessionLost(f"MCP server process closed stdin: {e}") from e
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug("Ignoring non-JSON line from MCP server", line=line[:200])
+                    continue
+                self.on_message(message)
+        finally:
+            self.on_close()
+
+    async def close(self):
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self._reader:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
 
 class MCPClient:
     """
     Client for connecting to OpenSearch's native MCP server
-    
-    Note: This is a placeholder implementation. The actual MCP client
-    will depend on OpenSearch 3.0's MCP server protocol specifications.
+
+    One session is shared by every caller. Calls made while disconnected
+    reconnect first (with exponential backoff), and a call that finds its
+    session expired is retried once on a fresh one.
     """
-    
+
     def __init__(self):
-        self.server_url = f"http://{settings.OPENSEARCH_HOST}:{settings.OPENSEARCH_MCP_PORT}"
+        self.server_url = settings.MCP_SERVER_URL or (
+            f"http://{settings.OPENSEARCH_HOST}:{settings.OPENSEARCH_MCP_PORT}{settings.MCP_SERVER_PATH}"
+        )
         self.connected = False
-        self.capabilities = {}
-        
+        self.capabilities: Dict[str, Any] = {}
+        self.server_info: Dict[str, Any] = {}
+        self.protocol_version: Optional[str] = None
+        self._transport: Optional[Union[_HTTPTransport, _StdioTransport]] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._progress: Dict[str, asyncio.Queue] = {}
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._tools_expires_at = 0.0
+        # Bumped on every invalidation so a listing that raced one is not cached
+        self._tools_generation = 0
+        self._connect_lock = asyncio.Lock()
+        # Replies to server requests, referenced until sent
+        self._replies: Set[asyncio.Task] = set()
+
     async def connect(self):
-        """Connect to OpenSearch MCP server"""
-        try:
-            logger.info("Connecting to OpenSearch MCP server", url=self.server_url)
-            
-            # TODO: Implement actual MCP connection protocol
-            # This will depend on OpenSearch 3.0's MCP implementation
-            # For now, we'll mark as connected if the host is reachable
-            
-            self.connected = True
-            self.capabilities = {
-                "search": True,
-                "aggregations": True,
-                "query_dsl": True,
-                "streaming": False  # May be supported by OpenSearch MCP
-            }
-            
-            logger.info("Connected to OpenSearch MCP server", capabilities=self.capabilities)
-            
-        except Exception as e:
-            logger.error("Failed to connect to MCP server", error=str(e))
-            self.connected = False
-            raise
-    
+        """Connect to OpenSearch MCP server (one attempt)"""
+        async with self._connect_lock:
+            try:
+                await self._open_session()
+            except Exception as e:
+                logger.error("Failed to connect to MCP server", error=str(e))
+                self.connected = False
+                raise
+
     async def disconnect(self):
         """Disconnect from MCP server"""
         logger.info("Disconnecting from OpenSearch MCP server")
-        self.connected = False
+        await self._close_transport(self._transport)
         self.capabilities = {}
-    
+
     def is_connected(self) -> bool:
         """Check if connected to MCP server"""
         return self.connected
-    
+
     def get_capabilities(self) -> Dict[str, Any]:
         """Get MCP server capabilities"""
         return self.capabilities
-    
+
     def get_server_url(self) -> str:
         """Get MCP server URL"""
+        if settings.MCP_TRANSPORT == "stdio":
+            return "stdio:" + " ".join(settings.MCP_STDIO_COMMAND)
         return self.server_url
-    
+
+    # --- Session ---
+
+    def _new_transport(self) -> Union[_HTTPTransport, _StdioTransport]:
+        if settings.MCP_TRANSPORT == "stdio":
+            if not settings.MCP_STDIO_COMMAND:
+                raise ValueError("MCP_STDIO_COMMAND is required for the stdio transport")
+            transport: Optional[_StdioTransport] = None
+
+            def on_close():
+                # Only the live transport's exit counts; closing an old one is expected
+                if transport is self._transport:
+                    self._connection_lost()
+
+            transport = _StdioTransport(settings.MCP_STDIO_COMMAND, self._dispatch, on_close)
+            return transport
+        return _HTTPTransport(self.server_url, self._dispatch)
+
+    async def _open_session(self):
+        """Start a transport and run the initialize handshake"""
+        await self._close_transport(self._transport)
+        logger.info("Connecting to OpenSearch MCP server", url=self.get_server_url())
+
+        transport = self._new_transport()
+        self._transport = transport
+        try:
+            await transport.start()
+            result = await self._call(transport, "initialize", {
+                "protocolVersion": settings.MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": CLIENT_INFO,
+            })
+            await transport.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except BaseException:
+            await self._close_transport(transport)
+            raise
+
+        self.protocol_version = result.get("protocolVersion")
+        if isinstance(transport, _HTTPTransport):
+            transport.protocol_version = self.protocol_version
+        self.capabilities = result.get("capabilities", {})
+        self.server_info = result.get("serverInfo", {})
+        self._invalidate_tools()
+        self.connected = True
+        logger.info(
+            "Connected to OpenSearch MCP server",
+            server=self.server_info.get("name"),
+            protocol_version=self.protocol_version,
+            capabilities=list(self.capabilities),
+        )
+
+    async def _ensure_connected(self):
+        """Reconnect with exponential backoff and jitter if there is no live session"""
+        if self.connected:
+            return
+        async with self._connect_lock:
+            # Another caller may have reconnected while we waited for the lock
+            if self.connected:
+                return
+            delay = settings.MCP_RECONNECT_BASE_DELAY
+            for attempt in range(1, settings.MCP_RECONNECT_ATTEMPTS + 1):
+                try:
+                    await self._open_session()
+                    return
+                except (OSError, httpx.HTTPError, MCPError, asyncio.TimeoutError) as e:
+                    if attempt == settings.MCP_RECONNECT_ATTEMPTS:
+                        raise ConnectionError(f"MCP server unavailable after {attempt} attempts: {e}") from e
+                    logger.warning("MCP connection failed, retrying", attempt=attempt, delay=delay, error=str(e))
+                    await asyncio.sleep(delay * (0.5 + random.random()))
+                    delay = min(delay * 2, settings.MCP_RECONNECT_MAX_DELAY)
+
+    async def _close_transport(self, transport: Optional[Union[_HTTPTransport, _StdioTransport]]):
+        if transport is None:
+            return
+        if transport is self._transport:
+            self._transport = None
+            self._connection_lost()
+        await transport.close()
+
+    def _connection_lost(self):
+        """Fail in-flight requests; the next call reconnects"""
+        self.connected = False
+        self._invalidate_tools()
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("MCP connection closed"))
+
+    # --- JSON-RPC ---
+
+    def _dispatch(self, message: Message):
+        """Route one incoming message: a response to its waiter, or a server notification/request"""
+        if "id" in message and ("result" in message or "error" in message):
+            future = self._pending.get(message["id"])
+            if future is None or future.done():
+                return
+            if "error" in message:
+                error = message["error"]
+                future.set_exception(MCPError(error.get("code", -32603), error.get("message", ""), error.get("data")))
+            else:
+                future.set_result(message["result"])
+            return
+
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" in message:
+            # Server-to-client request: answer pings, decline anything else
+            reply: Message = {"jsonrpc": "2.0", "id": message["id"]}
+            if method == "ping":
+                reply["result"] = {}
+            else:
+                reply["error"] = {"code": -32601, "message": f"Method not supported: {method}"}
+            if self._transport is not None:
+                task = asyncio.create_task(self._transport.send(reply))
+                self._replies.add(task)
+                task.add_done_callback(self._reply_sent)
+        elif method == "notifications/tools/list_changed":
+            self._invalidate_tools()
+        elif method == "notifications/progress":
+            queue = self._progress.get(str(params.get("progressToken")))
+            if queue is not None:
+                queue.put_nowait(params)
+        elif method == "notifications/message":
+            logger.info("MCP server log", level=params.get("level"), data=params.get("data"))
+
+    def _reply_sent(self, task: asyncio.Task):
+        self._replies.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Failed to reply to MCP server request", error=str(task.exception()))
+
+    def _message(self, method: str, params: Dict[str, Any]) -> Tuple[int, Message, asyncio.Future]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        return request_id, {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}, future
+
+    async def _await_response(self, transport, request_id: int, future: asyncio.Future) -> Any:
+        try:
+            return await asyncio.wait_for(future, settings.MCP_REQUEST_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Let the server stop working on it
+            try:
+                await transport.send({
+                    "jsonrpc": "2.0",
+                    "method": "notifications/cancelled",
+                    "params": {"requestId": request_id, "reason": "timeout"},
+                })
+            except Exception:
+                pass
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _call(self, transport, method: str, params: Dict[str, Any]) -> Any:
+        request_id, message, future = self._message(method, params)
+        async with track_dependency("mcp", method):
+            try:
+                await transport.send(message)
+            except BaseException:
+                self._pending.pop(request_id, None)
+                raise
+            return await self._await_response(transport, request_id, future)
+
+    async def _call_batch(self, transport, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Several requests at once: one POST when the server takes batches, else pipelined sends
+
+        A pipelined send can fail while others were already accepted; only
+        when every send failed is the error raised (so the whole batch may
+        be retried), otherwise it becomes that call's result.
+        """
+        prepared = [self._message(method, params) for method, params in calls]
+        messages = [message for _, message, _ in prepared]
+        async with track_dependency("mcp", "batch"):
+            try:
+                if transport.supports_batching:
+                    await transport.send(messages)
+                    sent: List[Any] = [None] * len(messages)
+                else:
+                    sent = await asyncio.gather(
+                        *(transport.send(message) for message in messages), return_exceptions=True
+                    )
+                    if all(isinstance(outcome, BaseException) for outcome in sent):
+                        raise sent[0]
+            except BaseException:
+                for request_id, _, _ in prepared:
+                    self._pending.pop(request_id, None)
+                raise
+            for (request_id, _, future), outcome in zip(prepared, sent):
+                if isinstance(outcome, BaseException):
+                    self._pending.pop(request_id, None)
+                    if not future.done():
+                        future.set_exception(outcome)
+            return await asyncio.gather(
+                *(self._await_response(transport, request_id, future) for request_id, _, future in prepared),
+                return_exceptions=True
+            )
+
+    async def _with_session(self, operation):
+        """Run `operation(transport)` on a live session, retrying once if the session was lost"""
+        await self._ensure_connected()
+        transport = self._transport
+        try:
+            return await operation(transport)
+        except SessionLost as e:
+            logger.warning("MCP session lost, reconnecting", error=str(e))
+            # Concurrent callers may have reconnected already; only reset the session we used
+            if transport is self._transport:
+                await self._close_transport(transport)
+            await self._ensure_connected()
+            return await operation(self._transport)
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Send one JSON-RPC request on the shared session and return its result"""
+        return await self._with_session(lambda transport: self._call(transport, method, params or {}))
+
+    # --- Tools ---
+
+    async def list_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Tools the server offers, following pagination
+
+        Cached for MCP_TOOLS_CACHE_TTL_SECONDS, and dropped early on
+        reconnect or when the server sends tools/list_changed.
+        """
+        if not refresh and self._tools is not None and time.monotonic() < self._tools_expires_at:
+            return self._tools
+        # Connect first: opening a session invalidates the cache itself
+        await self._ensure_connected()
+        generation = self._tools_generation
+        tools: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            result = await self.request("tools/list", {"cursor": cursor} if cursor else {})
+            tools.extend(result.get("tools", []))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                break
+        if generation == self._tools_generation:
+            self._tools = tools
+            self._tools_expires_at = time.monotonic() + settings.MCP_TOOLS_CACHE_TTL_SECONDS
+        return tools
+
+    def _invalidate_tools(self):
+        self._tools = None
+        self._tools_generation += 1
+
+    @staticmethod
+    def _tool_result(result: Any) -> Dict[str, Any]:
+        if isinstance(result, BaseException):
+            return {"status": "error", "error": str(result)}
+        return {"status": "error" if result.get("isError") else "success", "result": result}
+
     async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute an MCP tool on the server
-        
+
         Args:
             tool_name: Name of the MCP tool to execute
             parameters: Tool parameters
-            
+
         Returns:
-            Tool execution result
+            {"status": "success" | "error", "result": tools/call result}
         """
-        if not self.connected:
-            raise RuntimeError("Not connected to MCP server")
-        
-        logger.info("Executing MCP tool", tool=tool_name, params=parameters)
-        
-        # TODO: Implement actual MCP tool execution protocol
-        # This will use the MCP protocol to call tools on OpenSearch
-        
-        return {
-            "status": "success",
-            "result": {}
-        }
-    
-    async def stream_response(self, prompt: str):
+        logger.info("Executing MCP tool", tool=tool_name)
+        result = await self.request("tools/call", {"name": tool_name, "arguments": parameters})
+        return self._tool_result(result)
+
+    async def execute_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
         """
-        Stream a response from the MCP server
-        
-        Args:
-            prompt: Natural language prompt
-            
+        Execute several tools in one round trip, results in call order
+
+        A failing call is reported as {"status": "error", "error": ...}
+        without affecting the others.
+        """
+        logger.info("Executing MCP tool batch", tools=[name for name, _ in calls])
+        results = await self._with_session(lambda transport: self._call_batch(
+            transport, [("tools/call", {"name": name, "arguments": arguments}) for name, arguments in calls]
+        ))
+        return [self._tool_result(result) for result in results]
+
+    async def stream_tool(self, tool_name: str, parameters: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a tool, yielding its progress notifications as they arrive
+
         Yields:
-            Response chunks
+            {"progress": notification params} items, then one {"result": ...}
         """
-        if not self.connected:
-            raise RuntimeError("Not connected to MCP server")
-        
-        # TODO: Implement streaming protocol if supported by OpenSearch MCP
-        
-        yield {"content": "Streaming not yet implemented"}
+        token = f"progress-{next(self._ids)}"
+        queue: asyncio.Queue = asyncio.Queue()
+        self._progress[token] = queue
+        call = asyncio.create_task(self.request("tools/call", {
+            "name": tool_name,
+            "arguments": parameters,
+            "_meta": {"progressToken": token},
+        }))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, call}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield {"progress": getter.result()}
+                    continue
+                getter.cancel()
+                while not queue.empty():
+                    yield {"progress": queue.get_nowait()}
+                yield {"result": self._tool_result(call.result())}
+                break
+        finally:
+            self._progress.pop(token, None)
+            if not call.done():
+                call.cancel()
@@ -2,12 +2,17 @@
 OpenSearch client for ThunderX
 """
 
-from typing import Dict, Any, List, Optional
+from contextlib import aclosing
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 import structlog
 from opensearchpy import AsyncOpenSearch
 from opensearchpy.exceptions import OpenSearchException
+from opentelemetry.trace import SpanKind
 
 from ..config import settings
+from ..metrics import track_dependency
+from ..tracing import current_trace_id, inject_headers, tracer
+from .search_cache import SearchCache, round_date_math
 
 logger = structlog.get_logger()
 
@@ -26,6 +31,13 @@ class OpenSearchClient:
             verify_certs=settings.OPENSEARCH_VERIFY_CERTS,
             ssl_show_warn=False
         )
+        self.cache: Optional[SearchCache] = None
+        if settings.SEARCH_CACHE_ENABLED:
+            self.cache = SearchCache(
+                max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+                max_entry_bytes=settings.SEARCH_CACHE_MAX_ENTRY_BYTES,
+                ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+            )
         
     async def ping(self) -> bool:
         """Check if OpenSearch is reachable"""
@@ -35,34 +47,217 @@ class OpenSearchClient:
             logger.error("OpenSearch ping failed", error=str(e))
             return False
     
+    @staticmethod
+    def _trace_headers() -> Dict[str, str]:
+        """traceparent for the current span, plus X-Opaque-Id so slow logs and the tasks API show the trace"""
+        trace_id = current_trace_id()
+        return inject_headers({"X-Opaque-Id": trace_id} if trace_id else None)
+    
     async def search(
         self,
         index: str,
         body: Dict[str, Any],
+        use_cache: bool = True,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Execute a search query
         
+        With the search cache enabled, relative time bounds are rounded to
+        SEARCH_CACHE_TIME_ROUNDING and identical searches (same index, body
+        and parameters) within SEARCH_CACHE_TTL_SECONDS are served from
+        memory; concurrent identical searches share one request.
+        
         Args:
             index: Index pattern to search
             body: OpenSearch query DSL
+            use_cache: Set False to always query the cluster
             **kwargs: Additional search parameters
             
         Returns:
             Search results
         """
+        if self.cache is None or not use_cache:
+            return await self._search(index, body, **kwargs)
+        if settings.SEARCH_CACHE_TIME_ROUNDING:
+            body = round_date_math(body, settings.SEARCH_CACHE_TIME_ROUNDING)
+        key = SearchCache.make_key(index, body, kwargs)
+        return await self.cache.get_or_fetch(key, lambda: self._search(index, body, **kwargs))
+    
+    async def _search(self, index: str, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        with tracer.start_as_current_span(
+            "OpenSearchClient.search",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "opensearch", "db.operation": "search", "opensearch.index": index},
+        ) as span:
+            try:
+                async with track_dependency("opensearch", "search"):
+                    response = await self.client.search(
+                        index=index,
+                        body=body,
+                        request_timeout=settings.QUERY_TIMEOUT_SECONDS,
+                        headers=self._trace_headers(),
+                        **kwargs
+                    )
+                span.set_attribute("opensearch.took_ms", response.get("took", 0))
+                return response
+            except OpenSearchException as e:
+                logger.error("OpenSearch query failed", error=str(e), index=index)
+                raise
+    
+    async def msearch(self, searches: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run several searches in a single _msearch round trip
+        
+        Args:
+            searches: (index pattern, search body) pairs
+            
+        Returns:
+            One response per search, in order; a failed search comes back
+            as {"error": ...} instead of failing the whole batch
+        """
+        body: List[Dict[str, Any]] = []
+        for index, search_body in searches:
+            body.append({"index": index, "ignore_unavailable": True})
+            body.append(search_body)
+        
+        with tracer.start_as_current_span(
+            "OpenSearchClient.msearch",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "opensearch", "db.operation": "msearch", "opensearch.searches": len(searches)},
+        ):
+            try:
+                async with track_dependency("opensearch", "msearch"):
+                    response = await self.client.msearch(
+                        body=body,
+                        request_timeout=settings.QUERY_TIMEOUT_SECONDS,
+                        headers=self._trace_headers()
+                    )
+                return response.get("responses", [])
+            except OpenSearchException as e:
+                logger.error("OpenSearch msearch failed", error=str(e), searches=len(searches))
+                raise
+    
+    async def iter_composite(
+        self,
+        index: str,
+        query: Dict[str, Any],
+        sources: List[Dict[str, Any]],
+        aggs: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every bucket of a composite aggregation, page by page
+        
+        Args:
+            index: Index pattern
+            query: Query clause restricting the documents aggregated
+            sources: Composite value sources
+            aggs: Optional sub-aggregations computed per bucket
+            page_size: Buckets per request
+            
+        Yields:
+            Composite buckets ("key", "doc_count" and any sub-aggregations)
+        """
+        composite: Dict[str, Any] = {"size": page_size or settings.COMPOSITE_PAGE_SIZE, "sources": sources}
+        body: Dict[str, Any] = {"size": 0, "query": query, "aggs": {"buckets": {"composite": composite}}}
+        if aggs:
+            body["aggs"]["buckets"]["aggs"] = aggs
+        
+        while True:
+            async with track_dependency("opensearch", "composite"):
+                response = await self.client.search(
+                    index=index,
+                    body=body,
+                    request_timeout=settings.QUERY_TIMEOUT_SECONDS,
+                    headers=self._trace_headers()
+                )
+            result = response.get("aggregations", {}).get("buckets", {})
+            buckets = result.get("buckets", [])
+            for bucket in buckets:
+                yield bucket
+            after_key = result.get("after_key")
+            if not buckets or not after_key:
+                break
+            composite["after"] = after_key
+    
+    async def iter_pit(
+        self,
+        index: str,
+        query: Dict[str, Any],
+        sort: Optional[List[Dict[str, Any]]] = None,
+        page_size: Optional[int] = None,
+        source: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every hit matching a query with point-in-time + search_after
+        
+        Pages are fetched one at a time against a consistent snapshot, so
+        memory stays constant regardless of result size. The PIT is deleted
+        when iteration finishes or the consumer stops early.
+        
+        Args:
+            index: Index pattern
+            query: Query clause (the value of "query" in a search body)
+            sort: Sort clauses; a _shard_doc tiebreaker is appended
+            page_size: Hits per page
+            source: Optional _source field filter
+            
+        Yields:
+            Raw hits
+        """
+        async with aclosing(self.iter_pit_pages(index, query, sort, page_size, source)) as pages:
+            async for hits in pages:
+                for hit in hits:
+                    yield hit
+    
+    async def iter_pit_pages(
+        self,
+        index: str,
+        query: Dict[str, Any],
+        sort: Optional[List[Dict[str, Any]]] = None,
+        page_size: Optional[int] = None,
+        source: Optional[List[str]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Same as iter_pit, but yields each page of raw hits as it arrives
+        """
+        pit = await self.client.create_point_in_time(
+            index=index, keep_alive=settings.EXPORT_PIT_KEEP_ALIVE
+        )
+        pit_id = pit["pit_id"]
+        # unmapped_type keeps indices without @timestamp from failing the sort
+        default_sort = [{"@timestamp": {"order": "asc", "unmapped_type": "date"}}]
+        body: Dict[str, Any] = {
+            "query": query,
+            "size": page_size or settings.EXPORT_PAGE_SIZE,
+            "sort": (sort or default_sort) + [{"_shard_doc": "asc"}],
+            "track_total_hits": False,
+        }
+        if source is not None:
+            body["_source"] = source
+        
         try:
-            response = await self.client.search(
-                index=index,
-                body=body,
-                request_timeout=settings.QUERY_TIMEOUT_SECONDS,
-                **kwargs
-            )
-            return response
-        except OpenSearchException as e:
-            logger.error("OpenSearch query failed", error=str(e), index=index)
-            raise
+            while True:
+                body["pit"] = {"id": pit_id, "keep_alive": settings.EXPORT_PIT_KEEP_ALIVE}
+                async with track_dependency("opensearch", "pit_page"):
+                    response = await self.client.search(
+                        body=body,
+                        request_timeout=settings.QUERY_TIMEOUT_SECONDS,
+                        headers=self._trace_headers()
+                    )
+                hits = response.get("hits", {}).get("hits", [])
+                if not hits:
+                    break
+                yield hits
+                # The PIT id may change between pages
+                pit_id = response.get("pit_id", pit_id)
+                body["search_after"] = hits[-1]["sort"]
+        finally:
+            try:
+                await self.client.delete_point_in_time(body={"pit_id": [pit_id]})
+            except OpenSearchException as e:
+                logger.warning("Failed to delete PIT", error=str(e))
     
     async def count(self, index: str, body: Optional[Dict[str, Any]] = None) -> int:
         """
@@ -76,7 +271,8 @@ class OpenSearchClient:
             Document count
         """
         try:
-            response = await self.client.count(index=index, body=body)
+            async with track_dependency("opensearch", "count"):
+                response = await self.client.count(index=index, body=body, headers=self._trace_headers())
             return response.get('count', 0)
         except OpenSearchException as e:
             logger.error("OpenSearch count failed", error=str(e), index=index)
@@ -121,7 +317,8 @@ class OpenSearchClient:
             body["query"] = query
         
         try:
-            response = await self.client.search(index=index, body=body)
+            async with track_dependency("opensearch", "aggregate"):
+                response = await self.client.search(index=index, body=body, headers=self._trace_headers())
             return response.get("aggregations", {}).get(agg_name, {})
         except OpenSearchException as e:
             logger.error("Aggregation failed", error=str(e), index=index)
@@ -0,0 +1,289 @@
+"""
+Rule-based natural language to OpenSearch DSL compiler
+Recognizes IP literals and CIDRs, ports, protocols, services, alert
+severities, "top N X by Y" aggregations and relative time phrases, and
+compiles them into term/terms/range filters and terms aggregations over
+the field catalogue the LLM prompt describes. Questions with any word it
+cannot account for are left to the LLM.
+"""
+
+import ipaddress
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .translation_cache import match_time_phrase, normalize_query
+
+# Field catalogue (see QueryTranslator._build_system_prompt)
+ZEEK_FIELDS = {
+    "src": "id.orig_h",
+    "dst": "id.resp_h",
+    "dport": "id.resp_p",
+    "proto": "proto",
+    "service": "service",
+    "bytes": "orig_bytes",
+}
+SURICATA_FIELDS = {
+    "src": "src_ip",
+    "dst": "dest_ip",
+    "dport": "dest_port",
+    "proto": "proto",
+    "signature": "alert.signature",
+    "category": "alert.category",
+    "severity": "alert.severity",
+}
+
+# Aggregatable keyword subfields of fields mapped as text (setup-opensearch-templates.sh)
+KEYWORD_SUBFIELDS = {"alert.signature": "alert.signature.keyword"}
+
+PROTOCOLS = {"tcp", "udp", "icmp"}
+# Zeek service names; "tls" is logged as "ssl"
+SERVICES = {
+    "dns": "dns", "http": "http", "ssl": "ssl", "tls": "ssl", "ssh": "ssh",
+    "smb": "smb", "rdp": "rdp", "ftp": "ftp", "smtp": "smtp",
+    "kerberos": "krb", "ntp": "ntp", "dhcp": "dhcp",
+}
+# Suricata severity: 1 is highest
+SEVERITIES = {"critical": 1, "high": 1, "medium": 2, "low": 3}
+
+TIME_UNITS = {"minute": "m", "hour": "h", "day": "d", "week": "w"}
+
+# (pattern, field key, label) for "top N <entity>" questions
+TOP_ENTITIES: List[Tuple[str, str, str]] = [
+    (r"(?:source|src) (?:ip addresses|ips|ip|hosts|addresses)|sources|talkers|clients", "src", "source IP"),
+    (r"(?:destination|dest|dst) (?:ip addresses|ips|ip|hosts|addresses)|destinations|servers", "dst", "destination IP"),
+    (r"(?:destination |dest |dst )?ports", "dport", "destination port"),
+    (r"(?:alert )?signatures|alerts", "signature", "alert signature"),
+    (r"(?:alert )?categories", "category", "alert category"),
+    (r"protocols", "proto", "protocol"),
+    (r"services", "service", "service"),
+]
+
+# Words that carry no constraint; anything else sends the question to the LLM.
+# "or"/"either" are deliberately absent: a disjunction of recognized terms
+# would otherwise compile to a conjunction.
+FILLER = set("""
+a activity all an and any are by can connection connections count data display do event events
+find flow flows for from get give had has have host hosts i in is list log logs me network of on
+over please seen sessions show the there to traffic was were what which who with within
+""".split())
+
+_IP = r"(?:\d{1,3}\.){3}\d{1,3}(?:/\d{1,2})?"
+_PORTS = r"\d{1,5}(?:(?:\s*,\s*|\s+and\s+|\s+or\s+)\d{1,5})*"
+
+
+class _Parse:
+    """Accumulates filters and an optional aggregation while consuming the text"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.filters: List[Dict[str, Any]] = []
+        self.explain: List[str] = []
+        self.time_range: Dict[str, str] = {"gte": "now-24h", "lte": "now"}
+        self.time_label = "in the last 24 hours"
+        self.top: Optional[Tuple[int, str, str, bool]] = None  # size, field key, label, by bytes
+        self.alerts = False
+        self.unparsed = False
+
+    def consume(self, pattern: str) -> List[re.Match]:
+        """Find all matches of `pattern` and blank them out of the text"""
+        matches = list(re.finditer(pattern, self.text))
+        if matches:
+            self.text = re.sub(pattern, " ", self.text)
+        return matches
+
+    def understood(self) -> bool:
+        """True when every remaining word is filler"""
+        words = re.findall(r"[a-z0-9_.\-/]+", self.text)
+        return not self.unparsed and all(w in FILLER for w in words)
+
+
+def _valid_ip(value: str) -> bool:
+    try:
+        ipaddress.ip_network(value, strict=False)
+        return True
+    except ValueError:
+        return False
+
+
+def _either(fields: List[str], value: Any) -> Dict[str, Any]:
+    """term on one field, or a should over several"""
+    if len(fields) == 1:
+        return {"term": {fields[0]: value}}
+    return {"bool": {"should": [{"term": {f: value}} for f in fields], "minimum_should_match": 1}}
+
+
+def _schemas(index_pattern: str, alerts: bool) -> List[Dict[str, str]]:
+    """Field families a query should cover, most specific first"""
+    if index_pattern.startswith("suricata") or alerts:
+        return [SURICATA_FIELDS]
+    if index_pattern.startswith("zeek"):
+        return [ZEEK_FIELDS]
+    return [ZEEK_FIELDS, SURICATA_FIELDS]
+
+
+def _fields(schemas: List[Dict[str, str]], key: str) -> List[str]:
+    return [schema[key] for schema in schemas if key in schema]
+
+
+def _parse_time(p: _Parse):
+    for m in p.consume(r"\b(?:in the |during the |over the )?(?:last|past) (\d+) (minute|hour|day|week)s?\b"):
+        amount, unit = m.group(1), m.group(2)
+        p.time_range = {"gte": f"now-{amount}{TIME_UNITS[unit]}", "lte": "now"}
+        p.time_label = f"in the last {amount} {unit}s"
+    match = match_time_phrase(p.text)
+    if match:
+        phrase, time_range = match
+        p.consume(r"\b(?:in the |during the |over the |for the |since )?" + re.escape(phrase) + r"\b")
+        p.time_range = dict(time_range)
+        p.time_label = phrase if phrase == "today" else f"in the {phrase}"
+
+
+def _parse_top(p: _Parse):
+    size = None
+    m = p.consume(r"\btop (\d{1,4})\b")
+    if m:
+        size = int(m[0].group(1))
+    elif p.consume(r"\b(?:what are the |which are the )?(?:most (?:common|frequent|active)|top)\b"):
+        size = 10
+    if size is None:
+        return
+    for pattern, key, label in TOP_ENTITIES:
+        if p.consume(rf"\b(?:{pattern})\b"):
+            by_bytes = bool(p.consume(r"\bby (?:traffic volume|traffic|volume|bytes(?: sent)?|data)\b"))
+            p.consume(r"\bby (?:count|connections|events|frequency)\b")
+            p.top = (min(size, settings.MAX_QUERY_RESULTS), key, label, by_bytes)
+            if key in ("signature", "category"):
+                p.alerts = True
+            return
+    # "top"/"most common" with no recognizable entity: not ours to answer
+    p.unparsed = True
+
+
+def compile_query(natural_query: str, index_pattern: str = "*") -> Optional[Dict[str, Any]]:
+    """
+    Compile a question to DSL, or return None when it is not fully understood
+
+    The result has the same shape the LLM is asked for: query, size, sort
+    (or aggs) and a plain English explanation.
+    """
+    p = _Parse(" " + normalize_query(natural_query) + " ")
+
+    _parse_time(p)
+    _parse_top(p)
+
+    if p.consume(r"\b(?:alerts?|alarms?)\b"):
+        p.alerts = True
+    # A bare "high"/"low" only means severity in a question about alerts
+    suffix = r"(?: severity| priority)?" if p.alerts else r" (?:severity|priority)"
+    severity = None
+    for m in p.consume(r"\b(critical|high|medium|low)" + suffix + r"\b"):
+        if severity is not None and SEVERITIES[m.group(1)] != severity:
+            # Two severities can only be meant as alternatives
+            return None
+        severity = SEVERITIES[m.group(1)]
+    if severity is not None:
+        p.alerts = True
+
+    threat_intel = bool(p.consume(
+        r"\b(?:known )?(?:malicious|bad)(?: ips?| hosts?| domains?| indicators?)?\b|\bthreat intel(?:ligence)?\b|\biocs?\b"
+    ))
+
+    schemas = _schemas(index_pattern, p.alerts)
+
+    # IPs, with direction when stated; one hit cannot have two sources or two destinations
+    directed = set()
+    for m in p.consume(rf"\b(from|source|src|by|to|destination|dest|dst|involving)?\s*(?:ip\s+|host\s+)?({_IP})\b"):
+        direction, value = m.group(1), m.group(2)
+        if not _valid_ip(value):
+            return None
+        side = "src" if direction in ("from", "source", "src", "by") else "dst" if direction else None
+        if side in directed:
+            return None
+        if side:
+            directed.add(side)
+        if direction in ("from", "source", "src", "by"):
+            p.filters.append(_either(_fields(schemas, "src"), value))
+            p.explain.append(f"from {value}")
+        elif direction in ("to", "destination", "dest", "dst"):
+            p.filters.append(_either(_fields(schemas, "dst"), value))
+            p.explain.append(f"to {value}")
+        else:
+            p.filters.append(_either(_fields(schemas, "src") + _fields(schemas, "dst"), value))
+            p.explain.append(f"involving {value}")
+
+    # Ports
+    for m in p.consume(rf"\b(?:on |to )?(?:destination |dest |dst )?ports? ({_PORTS})\b"):
+        ports = sorted({int(x) for x in re.findall(r"\d+", m.group(1))})
+        if any(port > 65535 for port in ports):
+            return None
+        fields = _fields(schemas, "dport")
+        if len(ports) == 1:
+            p.filters.append(_either(fields, ports[0]))
+        else:
+            p.filters.append({"bool": {"should": [{"terms": {f: ports}} for f in fields], "minimum_should_match": 1}})
+        p.explain.append("destination port " + ", ".join(map(str, ports)))
+
+    # Transport protocols (Suricata logs them upper-case); a hit has only one
+    protocols = p.consume(r"\b(" + "|".join(sorted(PROTOCOLS)) + r")\b")
+    if len({m.group(1) for m in protocols}) > 1:
+        return None
+    for m in protocols[:1]:
+        proto = m.group(1)
+        values = [proto.upper() if schema is SURICATA_FIELDS else proto for schema in schemas]
+        clauses = [{"term": {"proto": v}} for v in dict.fromkeys(values)]
+        p.filters.append(clauses[0] if len(clauses) == 1 else {"bool": {"should": clauses, "minimum_should_match": 1}})
+        p.explain.append(proto.upper())
+
+    # Application protocols (Zeek service field only)
+    services = [SERVICES[m.group(1)] for m in p.consume(r"\b(" + "|".join(SERVICES) + r")(?: queries| requests| traffic| connections| sessions)?\b")]
+    if services:
+        if ZEEK_FIELDS not in schemas:
+            return None
+        schemas = [ZEEK_FIELDS]
+        services = sorted(set(services))
+        p.filters.append({"term": {"service": services[0]}} if len(services) == 1 else {"terms": {"service": services}})
+        p.explain.append(" / ".join(s.upper() for s in services))
+
+    if not p.understood():
+        return None
+    if not (p.filters or p.top or p.alerts or threat_intel):
+        # Nothing but filler and a time range: too vague to be worth guessing
+        return None
+
+    if p.alerts:
+        p.filters.append({"exists": {"field": SURICATA_FIELDS["signature"]}})
+        if severity is not None:
+            p.filters.append({"term": {SURICATA_FIELDS["severity"]: severity}})
+            p.explain.insert(0, f"severity {severity}")
+    if threat_intel:
+        p.filters.append({"term": {"threat_intel.matched": True}})
+        p.explain.insert(0, "matching known IOCs")
+
+    p.filters.append({"range": {"@timestamp": p.time_range}})
+    subject = "alerts" if p.alerts else "events"
+    detail = f" ({', '.join(p.explain)})" if p.explain else ""
+
+    dsl: Dict[str, Any] = {"query": {"bool": {"filter": p.filters}}}
+    if p.top:
+        size, key, label, by_bytes = p.top
+        field = _fields(schemas, key)
+        if not field:
+            return None
+        terms: Dict[str, Any] = {"field": KEYWORD_SUBFIELDS.get(field[0], field[0]), "size": size}
+        aggs: Dict[str, Any] = {"top": {"terms": terms}}
+        if by_bytes:
+            if ZEEK_FIELDS not in schemas:
+                return None
+            terms["order"] = {"bytes": "desc"}
+            aggs["top"]["aggs"] = {"bytes": {"sum": {"field": ZEEK_FIELDS["bytes"]}}}
+        dsl.update({"size": 0, "aggs": aggs})
+        metric = "bytes sent" if by_bytes else "count"
+        dsl["explanation"] = f"Top {size} {label}s by {metric} across {subject}{detail} {p.time_label}"
+    else:
+        dsl.update({
+            "size": settings.DEFAULT_QUERY_SIZE,
+            "sort": [{"@timestamp": {"order": "desc"}}],
+            "explanation": f"{subject.capitalize()}{detail} {p.time_label}",
+        })
+    return dsl
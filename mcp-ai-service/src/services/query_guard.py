@@ -0,0 +1,282 @@
+"""
+Query guardrails for translated DSL
+Inspects a search body before it reaches OpenSearch: clamps result and
+bucket sizes, forces and bounds the @timestamp range, narrows catch-all
+index patterns to the Zeek/Suricata indices the fields belong to, and
+rejects clauses that are expensive no matter the data (scripts, leading
+wildcards, unanchored regexps).
+"""
+
+import copy
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from ..config import settings
+from .query_compiler import SURICATA_FIELDS, ZEEK_FIELDS
+
+logger = structlog.get_logger()
+
+# Body keys passed through; anything else (explanation, runtime_mappings, ...) is dropped
+ALLOWED_BODY_KEYS = {
+    "query", "size", "from", "sort", "aggs", "aggregations", "_source",
+    "track_total_hits", "search_after", "timeout", "terminate_after",
+}
+# Clauses that run a script per document
+FORBIDDEN_KEYS = {"script", "script_score", "script_fields", "runtime_mappings", "scripted_metric"}
+# Leaf queries whose keys are field names
+FIELD_QUERIES = {
+    "term", "terms", "match", "match_phrase", "match_phrase_prefix", "prefix",
+    "wildcard", "regexp", "fuzzy", "range",
+}
+# Bucket aggregations with a "size"
+SIZED_AGGS = {"terms", "significant_terms", "rare_terms", "composite", "multi_terms"}
+CATCH_ALL_INDICES = {"", "*", "_all"}
+# OpenSearch's own default when a body has no size
+DEFAULT_SIZE = 10
+
+ZEEK_ONLY = set(ZEEK_FIELDS.values()) - set(SURICATA_FIELDS.values())
+SURICATA_ONLY = set(SURICATA_FIELDS.values()) - set(ZEEK_FIELDS.values())
+ZEEK_PREFIXES = ("id.", "orig_", "resp_", "conn_state", "uid", "qtype", "server_name", "uri")
+SURICATA_PREFIXES = ("alert.", "src_", "dest_", "event_type", "flow_id")
+
+_DATE_MATH = re.compile(r"^now(?:-(\d+)([smhdwMy]))?(?:/[smhdwMy])?$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000, "y": 31536000}
+
+
+class QueryRejected(ValueError):
+    """A query the guardrails refuse to run"""
+
+
+@dataclass
+class GuardedQuery:
+    """A search body rewritten to run safely, with what was changed and its estimated cost"""
+    index: str
+    body: Dict[str, Any]
+    rewrites: List[str] = field(default_factory=list)
+    cost: Dict[str, Any] = field(default_factory=dict)
+
+
+def _is_count(value: Any) -> bool:
+    """A non-negative int (bool is an int subclass but never a valid size)"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _resolve(value: Any, now: datetime) -> Optional[datetime]:
+    """A range bound as a datetime: "now-Nu" date math, ISO 8601 or epoch millis"""
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if not isinstance(value, str):
+        return None
+    m = _DATE_MATH.match(value)
+    if m:
+        amount, unit = m.groups()
+        return now - timedelta(seconds=int(amount) * _UNIT_SECONDS[unit]) if amount else now
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _conjuncts(query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Clauses every hit must match (top level, and bool must/filter recursively)"""
+    clauses = [query]
+    bool_query = query.get("bool")
+    if isinstance(bool_query, dict):
+        for key in ("filter", "must"):
+            children = bool_query.get(key, [])
+            for child in children if isinstance(children, list) else [children]:
+                if isinstance(child, dict):
+                    clauses.extend(_conjuncts(child))
+    return clauses
+
+
+def _fields(node: Any, found: Set[str]):
+    """Collect the field names a query, aggregation or sort refers to"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in FIELD_QUERIES and isinstance(value, dict):
+                found.update(k for k in value if k not in ("boost", "minimum_should_match"))
+            elif key == "field" and isinstance(value, str):
+                found.add(value)
+            _fields(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            _fields(item, found)
+
+
+def _indices_for(fields: Set[str]) -> str:
+    """The source family the fields belong to, or both when mixed or unknown"""
+    zeek = any(f in ZEEK_ONLY or f.startswith(ZEEK_PREFIXES) for f in fields)
+    suricata = any(f in SURICATA_ONLY or f.startswith(SURICATA_PREFIXES) for f in fields)
+    if zeek and not suricata:
+        return settings.ZEEK_INDEX_PATTERN
+    if suricata and not zeek:
+        return settings.SURICATA_INDEX_PATTERN
+    return f"{settings.ZEEK_INDEX_PATTERN},{settings.SURICATA_INDEX_PATTERN}"
+
+
+def _check_clauses(node: Any, rewrites: List[str]):
+    """Reject scripts and unanchored patterns; disable leading wildcards in query_string"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in FORBIDDEN_KEYS:
+                raise QueryRejected(f"'{key}' is not allowed")
+            if key in ("wildcard", "regexp") and isinstance(value, dict):
+                for name, spec in value.items():
+                    pattern = spec.get("value", spec.get(key)) if isinstance(spec, dict) else spec
+                    if not isinstance(pattern, str):
+                        continue
+                    if key == "wildcard" and pattern[:1] in ("*", "?"):
+                        raise QueryRejected(f"Leading wildcard on {name} is not allowed")
+                    if key == "regexp" and re.match(r"^\.[*+?{]", pattern):
+                        raise QueryRejected(f"Unanchored regexp on {name} is not allowed")
+            if key == "query_string" and isinstance(value, dict) and value.get("allow_leading_wildcard", True):
+                value["allow_leading_wildcard"] = False
+                rewrites.append("disabled leading wildcards in query_string")
+            _check_clauses(value, rewrites)
+    elif isinstance(node, list):
+        for item in node:
+            _check_clauses(item, rewrites)
+
+
+def _bound_aggs(aggs: Dict[str, Any], rewrites: List[str], parent_buckets: int = 1) -> int:
+    """Clamp bucket sizes; returns the largest bucket count along any nesting path"""
+    worst = parent_buckets
+    for name, agg in aggs.items():
+        if not isinstance(agg, dict):
+            continue
+        buckets = parent_buckets
+        for kind, spec in agg.items():
+            if kind in SIZED_AGGS and isinstance(spec, dict):
+                size = spec.get("size", DEFAULT_SIZE)
+                if not _is_count(size):
+                    size = spec["size"] = DEFAULT_SIZE
+                    rewrites.append(f"aggregation {name} invalid size replaced with {DEFAULT_SIZE}")
+                elif size > settings.QUERY_MAX_AGG_BUCKETS:
+                    size = spec["size"] = settings.QUERY_MAX_AGG_BUCKETS
+                    rewrites.append(f"aggregation {name} size clamped to {settings.QUERY_MAX_AGG_BUCKETS}")
+                buckets *= size
+        children = agg.get("aggs") or agg.get("aggregations")
+        if isinstance(children, dict):
+            buckets = _bound_aggs(children, rewrites, buckets)
+        worst = max(worst, buckets)
+    return worst
+
+
+def _bound_time(query: Dict[str, Any], rewrites: List[str]) -> Tuple[Dict[str, Any], Optional[float]]:
+    """Ensure a bounded @timestamp range every hit must satisfy; returns the query and its span"""
+    now = datetime.now(timezone.utc)
+    max_span = timedelta(days=settings.QUERY_MAX_TIME_RANGE_DAYS)
+
+    ranges = [
+        clause["range"]["@timestamp"]
+        for clause in _conjuncts(query)
+        if isinstance(clause.get("range"), dict) and isinstance(clause["range"].get("@timestamp"), dict)
+    ]
+    if not ranges:
+        time_filter = {"range": {"@timestamp": {"gte": settings.QUERY_DEFAULT_TIME_RANGE, "lte": "now"}}}
+        # Always wrap: adding a filter to a should-only bool would drop its implicit minimum_should_match 1
+        query = {"bool": {"must": [query], "filter": [time_filter]}}
+        rewrites.append(f"added time filter @timestamp >= {settings.QUERY_DEFAULT_TIME_RANGE}")
+        start = _resolve(settings.QUERY_DEFAULT_TIME_RANGE, now)
+        return query, (now - start).total_seconds() if start else None
+
+    spans = []
+    for bounds in ranges:
+        lower_key = "gte" if "gte" in bounds else "gt" if "gt" in bounds else None
+        upper = bounds.get("lte", bounds.get("lt", "now"))
+        end = _resolve(upper, now)
+        if lower_key is None:
+            if upper == "now":
+                bounds["gte"] = settings.QUERY_DEFAULT_TIME_RANGE
+            elif end is not None:
+                bounds["gte"] = (end - max_span).isoformat()
+            else:
+                continue
+            lower_key = "gte"
+            rewrites.append(f"added lower bound @timestamp >= {bounds['gte']}")
+        start = _resolve(bounds[lower_key], now)
+        if start is None or end is None:
+            continue
+        if end - start > max_span:
+            if isinstance(upper, str) and _DATE_MATH.match(upper) and "/" not in upper:
+                bounds[lower_key] = f"{upper}-{settings.QUERY_MAX_TIME_RANGE_DAYS}d"
+            else:
+                bounds[lower_key] = (end - max_span).isoformat()
+            start = end - max_span
+            rewrites.append(f"time range narrowed to {settings.QUERY_MAX_TIME_RANGE_DAYS} days")
+        spans.append((end - start).total_seconds())
+    # Conjunctive ranges intersect, so the narrowest bounds the query
+    return query, min(spans) if spans else None
+
+
+def guard_query(body: Dict[str, Any], index_pattern: Optional[str]) -> GuardedQuery:
+    """
+    Rewrite a search body so it is safe to run, or raise QueryRejected
+
+    The input is not modified. Every rewrite is listed on the result so
+    callers can show the user what changed.
+    """
+    body = copy.deepcopy(body)
+    rewrites: List[str] = []
+
+    for key in list(body):
+        if key not in ALLOWED_BODY_KEYS:
+            if key in FORBIDDEN_KEYS:
+                raise QueryRejected(f"'{key}' is not allowed")
+            del body[key]
+            rewrites.append(f"dropped unsupported key '{key}'")
+    _check_clauses(body, rewrites)
+
+    # from + size is bounded by the index max_result_window as well
+    size = body.get("size", DEFAULT_SIZE)
+    if not _is_count(size):
+        size = body["size"] = DEFAULT_SIZE
+        rewrites.append(f"invalid size replaced with {DEFAULT_SIZE}")
+    elif size > settings.MAX_QUERY_RESULTS:
+        size = body["size"] = settings.MAX_QUERY_RESULTS
+        rewrites.append(f"size clamped to {settings.MAX_QUERY_RESULTS}")
+    offset = body.get("from", 0)
+    if not _is_count(offset):
+        offset = body["from"] = 0
+        rewrites.append("invalid from replaced with 0")
+    if offset + size > settings.MAX_QUERY_RESULTS:
+        body["from"] = max(settings.MAX_QUERY_RESULTS - size, 0)
+        rewrites.append(f"from clamped to {body['from']}")
+
+    agg_key = "aggs" if "aggs" in body else "aggregations"
+    agg_buckets = 0
+    if isinstance(body.get(agg_key), dict):
+        agg_buckets = _bound_aggs(body[agg_key], rewrites)
+        if agg_buckets > settings.QUERY_MAX_AGG_BUCKETS:
+            raise QueryRejected(
+                f"Nested aggregations could produce {agg_buckets} buckets (limit {settings.QUERY_MAX_AGG_BUCKETS})"
+            )
+
+    query = body.get("query") or {"match_all": {}}
+    body["query"], span_seconds = _bound_time(query, rewrites)
+
+    index = index_pattern or "*"
+    if index.strip() in CATCH_ALL_INDICES:
+        found: Set[str] = set()
+        _fields(body, found)
+        index = _indices_for(found)
+        rewrites.append(f"index narrowed to {index}")
+
+    cost = {
+        "index": index,
+        "time_span_seconds": span_seconds,
+        "size": size,
+        "agg_buckets": agg_buckets,
+    }
+    if rewrites:
+        logger.info("Query rewritten by guardrails", rewrites=rewrites, **cost)
+    return GuardedQuery(index=index, body=body, rewrites=rewrites, cost=cost)
@@ -3,23 +3,85 @@ Natural language query translator
 Converts natural language queries to OpenSearch DSL
 """
 
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
+import httpx
 import structlog
 from openai import AsyncOpenAI
 
 from ..config import settings
+from ..tracing import tracer
+from .query_compiler import compile_query
+from .translation_cache import TranslationCache, match_time_phrase
 
 logger = structlog.get_logger()
 
+_shared_cache: Optional[TranslationCache] = None
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """Process-wide translation cache, or None when disabled"""
+    global _shared_cache
+    if not settings.TRANSLATION_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        _shared_cache = TranslationCache(
+            max_size=settings.TRANSLATION_CACHE_SIZE,
+            ttl_seconds=settings.TRANSLATION_CACHE_TTL_SECONDS,
+            path=settings.TRANSLATION_CACHE_PATH,
+        )
+    return _shared_cache
+
+
+def create_llm_client() -> Optional[AsyncOpenAI]:
+    """
+    LLM client with a pooled keep-alive connection set and request timeouts
+
+    Created once per process (see the lifespan handler); None when no API
+    key is configured.
+    """
+    if not settings.OPENAI_API_KEY:
+        return None
+    timeout = httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS)
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=timeout,
+        max_retries=settings.LLM_MAX_RETRIES,
+        http_client=httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+            ),
+        ),
+    )
+
 
 class QueryTranslator:
-    """Translates natural language queries to OpenSearch DSL"""
+    """
+    Translates natural language queries to OpenSearch DSL
+
+    One instance is shared per process. At most LLM_MAX_CONCURRENCY
+    translations call the LLM at once; callers that wait longer than
+    LLM_QUEUE_TIMEOUT_SECONDS for a slot get the keyword fallback instead.
+    """
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+    def __init__(self, client: Optional[AsyncOpenAI] = None, cache: Optional[TranslationCache] = None):
+        self.client = client if client is not None else create_llm_client()
+        self.cache = cache or get_translation_cache()
+        self._llm_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        # Cached translations are only valid for the model settings and prompt that produced them
+        self.fingerprint = hashlib.sha256(json.dumps([
+            settings.MCP_AI_MODEL,
+            settings.MCP_AI_TEMPERATURE,
+            settings.MCP_AI_MAX_TOKENS,
+            self._build_system_prompt(),
+        ]).encode()).hexdigest()[:16]
         
     async def translate(self, natural_query: str, index_pattern: str = "*") -> Dict[str, Any]:
         """
@@ -34,34 +96,77 @@ class QueryTranslator:
         """
         logger.info("Translating query", query=natural_query, index=index_pattern)
         
-        if not self.client:
-            # Fallback to simple keyword matching if no AI available
-            return self._fallback_translation(natural_query)
-        
-        # Build prompt for query translation
-        system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(natural_query, index_pattern)
-        
-        try:
-            response = await self.client.chat.completions.create(
-                model=settings.MCP_AI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=settings.MCP_AI_TEMPERATURE,
-                max_tokens=settings.MCP_AI_MAX_TOKENS,
-                response_format={"type": "json_object"}
-            )
+        with tracer.start_as_current_span(
+            "QueryTranslator.translate", attributes={"query.index_pattern": index_pattern}
+        ) as span:
+            # Questions the rule compiler fully understands never reach the LLM
+            if settings.QUERY_COMPILER_ENABLED:
+                compiled = compile_query(natural_query, index_pattern)
+                if compiled is not None:
+                    logger.info("Query compiled locally", query=natural_query)
+                    span.set_attribute("translator.path", "compiler")
+                    return compiled
+            
+            if not self.client:
+                # Fallback to simple keyword matching if no AI available
+                span.set_attribute("translator.path", "fallback")
+                return self._fallback_translation(natural_query)
             
-            result = json.loads(response.choices[0].message.content)
-            logger.info("Query translated successfully", opensearch_query=result)
+            if self.cache is not None:
+                cache_key, time_range = self.cache.make_key(natural_query, index_pattern, self.fingerprint)
+                cached = self.cache.get(cache_key, time_range)
+                if cached is not None:
+                    logger.info("Translation cache hit", query=natural_query)
+                    span.set_attribute("translator.path", "cache")
+                    return cached
             
-            return result
+            # Build prompt for query translation
+            system_prompt = self._build_system_prompt()
+            user_prompt = self._build_user_prompt(natural_query, index_pattern)
             
-        except Exception as e:
-            logger.error("Query translation failed", error=str(e))
-            return self._fallback_translation(natural_query)
+            try:
+                await asyncio.wait_for(self._llm_slots.acquire(), timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning("LLM concurrency limit reached, using fallback translation")
+                span.set_attribute("translator.path", "fallback")
+                return self._fallback_translation(natural_query)
+            
+            try:
+                with tracer.start_as_current_span(
+                    "llm.chat_completion", attributes={"llm.model": settings.MCP_AI_MODEL}
+                ):
+                    response = await self.client.chat.completions.create(
+                        model=settings.MCP_AI_MODEL,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        temperature=settings.MCP_AI_TEMPERATURE,
+                        max_tokens=settings.MCP_AI_MAX_TOKENS,
+                        response_format={"type": "json_object"}
+                    )
+                
+                result = json.loads(response.choices[0].message.content)
+                logger.info("Query translated successfully", opensearch_query=result)
+                span.set_attribute("translator.path", "llm")
+                
+                # Fallback translations are cheap and never cached
+                if self.cache is not None:
+                    await self.cache.set(cache_key, time_range, result)
+                
+                return result
+                
+            except Exception as e:
+                logger.error("Query translation failed", error=str(e))
+                span.set_attribute("translator.path", "fallback")
+                return self._fallback_translation(natural_query)
+            finally:
+                self._llm_slots.release()
+    
+    async def close(self):
+        """Close the LLM client's connection pool"""
+        if self.client is not None:
+            await self.client.close()
     
     def _build_system_prompt(self) -> str:
         """Build system prompt for query translation"""
@@ -73,7 +178,11 @@ Common fields in our data:
 - Zeek logs: @timestamp, id.orig_h (source IP), id.resp_h (dest IP), id.resp_p (dest port), 
   proto (protocol), service, conn_state, duration, orig_bytes, resp_bytes
 - Suricata alerts: @timestamp, src_ip, dest_ip, dest_port, alert.signature, alert.severity, alert.category
+  (alert.signature is full text; aggregate or sort on alert.signature.keyword)
 - General: host.name, host.ip, event.category, event.action, user.name
+- Threat intel enrichment (set at ingest on matching events): threat_intel.matched (true when any
+  IP/domain is a known IOC), threat_intel.indicators, threat_intel.sources, threat_intel.max_confidence
+  Use {"term": {"threat_intel.matched": true}} for "known malicious" questions.
 
 Time ranges:
 - "last hour" = now-1h
@@ -134,18 +243,9 @@ Return the OpenSearch query DSL as JSON."""
     
     def _extract_time_range(self, query: str) -> Dict[str, str]:
         """Extract time range from natural language query"""
-        query_lower = query.lower()
-        
-        if "last hour" in query_lower or "past hour" in query_lower:
-            return {"gte": "now-1h", "lte": "now"}
-        elif "last 24 hours" in query_lower or "last day" in query_lower:
-            return {"gte": "now-24h", "lte": "now"}
-        elif "last 7 days" in query_lower or "last week" in query_lower:
-            return {"gte": "now-7d", "lte": "now"}
-        elif "last 30 days" in query_lower or "last month" in query_lower:
-            return {"gte": "now-30d", "lte": "now"}
-        elif "today" in query_lower:
-            return {"gte": "now/d", "lte": "now"}
-        else:
-            # Default to last 24 hours
-            return {"gte": "now-24h", "lte": "now"}
+        # Shares its phrase table with the translation cache's time templating
+        match = match_time_phrase(query.lower())
+        if match:
+            return dict(match[1])
+        # Default to last 24 hours
+        return {"gte": "now-24h", "lte": "now"}
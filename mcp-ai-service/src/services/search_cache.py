@@ -0,0 +1,152 @@
+"""
+Search result cache for OpenSearchClient
+Byte-bounded LRU + TTL cache keyed on index plus canonicalized body, with
+single-flight so concurrent identical searches share one cluster call.
+Relative date math ("now-24h") is rounded to a fixed unit before keying
+and sending, so repeats seconds apart hit the same entry.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from prometheus_client import Counter
+
+SEARCH_CACHE_REQUESTS = Counter(
+    "search_cache_requests_total",
+    "Search cache lookups by result",
+    ["result"],
+)
+
+# Range bounds of a date math expression: "now", "now-24h", "now+1d"; not already rounded
+_DATE_MATH = re.compile(r"^now(?:[+-]\d+[smhdwMy])*$")
+_RANGE_BOUNDS = ("gte", "gt", "lte", "lt", "from", "to")
+
+
+def round_date_math(node: Any, unit: str) -> Any:
+    """
+    Copy of a DSL tree with relative range bounds rounded to `unit`
+
+    OpenSearch rounds "now-24h/m" down for gte/gt and up for lte/lt, so a
+    rounded query covers the same whole units however many seconds apart
+    it is sent.
+    """
+    if isinstance(node, dict):
+        out = {}
+        for key, value in node.items():
+            if key == "range" and isinstance(value, dict):
+                out[key] = {
+                    field: {
+                        bound: f"{v}/{unit}" if bound in _RANGE_BOUNDS and isinstance(v, str) and _DATE_MATH.match(v) else v
+                        for bound, v in spec.items()
+                    } if isinstance(spec, dict) else spec
+                    for field, spec in value.items()
+                }
+            else:
+                out[key] = round_date_math(value, unit)
+        return out
+    if isinstance(node, list):
+        return [round_date_math(item, unit) for item in node]
+    return node
+
+
+class SearchCache:
+    """LRU + TTL cache of serialized search responses, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (serialized response, expires_at)
+        self._data: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._in_flight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    @staticmethod
+    def make_key(index: str, body: Dict[str, Any], params: Dict[str, Any]) -> str:
+        raw = orjson.dumps([index, body, params], option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return hashlib.sha256(raw).hexdigest()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        payload, expires_at = item
+        if expires_at <= time.monotonic():
+            self._evict(key)
+            return None
+        self._data.move_to_end(key)
+        return payload
+
+    def _evict(self, key: str):
+        payload, _ = self._data.pop(key)
+        self._bytes -= len(payload)
+
+    def _put(self, key: str, payload: bytes):
+        if len(payload) > self.max_entry_bytes:
+            return
+        if key in self._data:
+            self._evict(key)
+        self._data[key] = (payload, time.monotonic() + self.ttl_seconds)
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            self._evict(next(iter(self._data)))
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Cached response for `key`, else the result of `fetch()`
+
+        Callers that arrive while a fetch for the same key is running wait
+        for it instead of issuing their own. Every caller gets a private
+        copy, and failures are never cached.
+        """
+        payload = self._get(key)
+        if payload is not None:
+            SEARCH_CACHE_REQUESTS.labels("hit").inc()
+            return orjson.loads(payload)
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            SEARCH_CACHE_REQUESTS.labels("coalesced").inc()
+            try:
+                # Shielded so one waiter being cancelled does not cancel the shared fetch
+                return orjson.loads(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # The caller running the fetch was cancelled; take over
+            return await self.get_or_fetch(key, fetch)
+
+        SEARCH_CACHE_REQUESTS.labels("miss").inc()
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await fetch()
+            payload = orjson.dumps(response)
+            self._put(key, payload)
+            future.set_result(payload)
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an exception no waiter collects is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+            if not future.done():
+                future.cancel()
+        return response
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
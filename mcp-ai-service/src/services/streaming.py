@@ -0,0 +1,101 @@
+"""
+Server-sent event streams for query results
+The translated DSL is sent as soon as it exists, then result pages as
+they come back from a point-in-time + search_after scan, so the first
+byte does not wait for the whole result.
+"""
+
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import orjson
+import structlog
+
+from ..config import settings
+from .opensearch_client import OpenSearchClient
+
+logger = structlog.get_logger()
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Keeps reverse proxies from buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One SSE frame; data is a single JSON line"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+
+
+def normalize_sort(sort: Union[None, str, Dict[str, Any], List[Any]]) -> List[Any]:
+    """
+    A DSL sort as a list of single-field clauses, newest first if absent
+
+    OpenSearch accepts a bare field name, a dict of fields or a list of
+    either; search_after paging appends a tiebreaker, so it needs a list.
+    """
+    if not sort:
+        return [{"@timestamp": {"order": "desc", "unmapped_type": "date"}}]
+    if not isinstance(sort, list):
+        sort = [sort]
+    clauses: List[Any] = []
+    for clause in sort:
+        if isinstance(clause, dict):
+            clauses.extend({field: order} for field, order in clause.items())
+        else:
+            clauses.append(clause)
+    return clauses
+
+
+async def stream_query_events(
+    os_client: OpenSearchClient,
+    index: str,
+    body: Dict[str, Any],
+    preamble: Dict[str, Any],
+    max_rows: int,
+    page_size: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield the events for one query: dsl, then page... or aggregations, then done
+
+    `preamble` is sent as the dsl event. Hit queries are scanned with the
+    DSL's own sort; aggregation queries need one search and produce a
+    single aggregations event. Failures after the response has started
+    are reported as an error event, since the status code is already sent.
+    """
+    started = time.perf_counter()
+    yield sse_event("dsl", preamble)
+
+    rows = 0
+    pages = 0
+    try:
+        if "aggs" in body or "aggregations" in body:
+            results = await os_client.search(index=index, body=body)
+            yield sse_event("aggregations", results.get("aggregations", {}))
+        else:
+            sort = normalize_sort(body.get("sort"))
+            page_size = min(page_size or settings.STREAM_PAGE_SIZE, max_rows)
+            scan = os_client.iter_pit_pages(
+                index,
+                body.get("query", {"match_all": {}}),
+                sort=sort,
+                page_size=page_size,
+                source=body.get("_source"),
+            )
+            # aclosing() releases the PIT as soon as we stop, including on client disconnect
+            async with aclosing(scan) as scan_pages:
+                async for hits in scan_pages:
+                    hits = hits[:max_rows - rows]
+                    rows += len(hits)
+                    pages += 1
+                    yield sse_event("page", {"page": pages, "results": [hit.get("_source", {}) for hit in hits]})
+                    if rows >= max_rows:
+                        break
+    except Exception as e:
+        logger.error("Query stream failed", error=str(e), index=index, rows=rows)
+        yield sse_event("error", {"detail": str(e)})
+        return
+
+    took_ms = int((time.perf_counter() - started) * 1000)
+    yield sse_event("done", {"rows": rows, "pages": pages, "limit_reached": rows >= max_rows, "took_ms": took_ms})
+    logger.info("Query stream complete", index=index, rows=rows, pages=pages, took_ms=took_ms)
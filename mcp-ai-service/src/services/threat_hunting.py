@@ -3,69 +3,200 @@ Threat Hunting Service
 Provides advanced investigation capabilities for security analysis
 """
 
-from typing import Dict, Any, List
+import asyncio
+import heapq
+import math
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 import structlog
+
+from ..config import settings
+from .beaconing import score_series
+from .host_graph import HostGraph
 from .opensearch_client import OpenSearchClient
 
 logger = structlog.get_logger()
 
+
+def _either_side(ip_address: str, src_field: str, dst_field: str) -> Dict[str, Any]:
+    return {
+        "bool": {
+            "should": [{"term": {src_field: ip_address}}, {"term": {dst_field: ip_address}}],
+            "minimum_should_match": 1
+        }
+    }
+
+
+def _total(response: Dict[str, Any]) -> int:
+    total = response.get("hits", {}).get("total", 0)
+    return total.get("value", 0) if isinstance(total, dict) else total
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _buckets(agg: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Terms aggregation buckets as [{"key", "count"}]"""
+    if not agg:
+        return []
+    return [{"key": b.get("key_as_string", b["key"]), "count": b["doc_count"]} for b in agg.get("buckets", [])]
+
+
 class ThreatHuntingService:
     def __init__(self, opensearch_client: OpenSearchClient):
         self.os_client = opensearch_client
 
-    async def investigate_ip(self, ip_address: str, time_range: str = "now-24h") -> Dict[str, Any]:
+    async def investigate_ip(
+        self,
+        ip_address: str,
+        time_range: str = "now-24h",
+        include_hits: bool = False,
+        hits_size: int = 20
+    ) -> Dict[str, Any]:
         """
         Investigate an IP address across all data sources
+        
+        Connection, alert, DNS, HTTP and TLS lookups go out as one _msearch,
+        each filtered to the time range and summarized by server-side
+        aggregations. Raw hits are only returned when `include_hits` is set.
         """
-        logger.info("Starting IP investigation", ip=ip_address)
+        logger.info("Starting IP investigation", ip=ip_address, time_range=time_range)
         
-        # 1. Search for Zeek connections involving this IP
-        zeek_query = {
-            "query": {
-                "bool": {
-                    "should": [
-                        {"term": {"id.orig_h": ip_address}},
-                        {"term": {"id.resp_h": ip_address}}
-                    ],
-                    "minimum_should_match": 1
-                }
-            },
-            "size": 50,
-            "sort": [{"@timestamp": "desc"}]
+        time_filter = {"range": {"@timestamp": {"gte": time_range, "lte": "now"}}}
+        zeek_either = _either_side(ip_address, "id.orig_h", "id.resp_h")
+        size = hits_size if include_hits else 0
+        
+        searches = {
+            "connections": (settings.ZEEK_INDEX_PATTERN, {
+                "query": {"bool": {"filter": [time_filter, zeek_either, {"exists": {"field": "conn_state"}}]}},
+                "size": size,
+                "sort": [{"@timestamp": "desc"}],
+                "track_total_hits": True,
+                "aggs": {
+                    "first_seen": {"min": {"field": "@timestamp"}},
+                    "last_seen": {"max": {"field": "@timestamp"}},
+                    "services": {"terms": {"field": "service", "size": 10}},
+                    "outbound": {
+                        "filter": {"term": {"id.orig_h": ip_address}},
+                        "aggs": {
+                            "peers": {"terms": {"field": "id.resp_h", "size": 10}},
+                            "ports": {"terms": {"field": "id.resp_p", "size": 10}},
+                            "bytes_sent": {"sum": {"field": "orig_bytes"}},
+                            "bytes_received": {"sum": {"field": "resp_bytes"}},
+                        },
+                    },
+                    "inbound": {
+                        "filter": {"term": {"id.resp_h": ip_address}},
+                        "aggs": {
+                            "peers": {"terms": {"field": "id.orig_h", "size": 10}},
+                            "ports": {"terms": {"field": "id.resp_p", "size": 10}},
+                            "bytes_sent": {"sum": {"field": "resp_bytes"}},
+                            "bytes_received": {"sum": {"field": "orig_bytes"}},
+                        },
+                    },
+                },
+            }),
+            "alerts": (settings.SURICATA_INDEX_PATTERN, {
+                "query": {"bool": {"filter": [
+                    time_filter,
+                    {"term": {"event_type": "alert"}},
+                    _either_side(ip_address, "src_ip", "dest_ip"),
+                ]}},
+                "size": size,
+                "sort": [{"@timestamp": "desc"}],
+                "track_total_hits": True,
+                "aggs": {
+                    "signatures": {"terms": {"field": "alert.signature.keyword", "size": 10}},
+                    "severities": {"terms": {"field": "alert.severity", "size": 5}},
+                    "categories": {"terms": {"field": "alert.category", "size": 10}},
+                },
+            }),
+            "dns": (settings.ZEEK_INDEX_PATTERN, {
+                "query": {"bool": {"filter": [
+                    time_filter, {"term": {"id.orig_h": ip_address}}, {"exists": {"field": "query"}}
+                ]}},
+                "size": 0,
+                "track_total_hits": True,
+                "aggs": {
+                    "queries": {"terms": {"field": "query", "size": 10}},
+                    "rcodes": {"terms": {"field": "rcode_name", "size": 5}},
+                },
+            }),
+            "http": (settings.ZEEK_INDEX_PATTERN, {
+                "query": {"bool": {"filter": [time_filter, zeek_either, {"exists": {"field": "uri"}}]}},
+                "size": 0,
+                "track_total_hits": True,
+                "aggs": {
+                    "hosts": {"terms": {"field": "host", "size": 10}},
+                    "user_agents": {"terms": {"field": "user_agent", "size": 5}},
+                },
+            }),
+            "ssl": (settings.ZEEK_INDEX_PATTERN, {
+                "query": {"bool": {"filter": [time_filter, zeek_either, {"exists": {"field": "server_name"}}]}},
+                "size": 0,
+                "track_total_hits": True,
+                "aggs": {
+                    "server_names": {"terms": {"field": "server_name", "size": 10}},
+                    "versions": {"terms": {"field": "version", "size": 5}},
+                },
+            }),
         }
         
-        zeek_results = await self.os_client.search("zeek-*", zeek_query)
+        names = list(searches)
+        responses = dict(zip(names, await self.os_client.msearch([searches[n] for n in names])))
         
-        # 2. Search for Suricata alerts
-        suricata_query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {"term": {"event_type": "alert"}},
-                        {"bool": {
-                            "should": [
-                                {"term": {"src_ip": ip_address}},
-                                {"term": {"dest_ip": ip_address}}
-                            ]
-                        }}
-                    ]
-                }
-            },
-            "size": 20,
-            "sort": [{"timestamp": "desc"}]
-        }
+        errors = {}
+        for name, response in responses.items():
+            if "error" in response:
+                errors[name] = response["error"].get("reason") if isinstance(response["error"], dict) else str(response["error"])
+                logger.warning("Investigation search failed", search=name, error=errors[name])
         
-        suricata_results = await self.os_client.search("suricata-*", suricata_query)
+        conn = responses["connections"]
+        conn_aggs = conn.get("aggregations", {})
+        outbound = conn_aggs.get("outbound", {})
+        inbound = conn_aggs.get("inbound", {})
+        alerts_aggs = responses["alerts"].get("aggregations", {})
+        dns_aggs = responses["dns"].get("aggregations", {})
+        http_aggs = responses["http"].get("aggregations", {})
+        ssl_aggs = responses["ssl"].get("aggregations", {})
         
-        return {
+        result: Dict[str, Any] = {
             "ip": ip_address,
+            "time_range": time_range,
+            "took_ms": max((r.get("took", 0) for r in responses.values()), default=0),
             "summary": {
-                "connection_count": zeek_results['hits']['total']['value'],
-                "alert_count": suricata_results['hits']['total']['value']
+                "connection_count": _total(conn),
+                "alert_count": _total(responses["alerts"]),
+                "dns_query_count": _total(responses["dns"]),
+                "http_request_count": _total(responses["http"]),
+                "tls_session_count": _total(responses["ssl"]),
+                "first_seen": conn_aggs.get("first_seen", {}).get("value_as_string"),
+                "last_seen": conn_aggs.get("last_seen", {}).get("value_as_string"),
+                "bytes_sent": int(outbound.get("bytes_sent", {}).get("value", 0) + inbound.get("bytes_sent", {}).get("value", 0)),
+                "bytes_received": int(outbound.get("bytes_received", {}).get("value", 0) + inbound.get("bytes_received", {}).get("value", 0)),
+                "outbound_peers": _buckets(outbound.get("peers")),
+                "inbound_peers": _buckets(inbound.get("peers")),
+                "outbound_ports": _buckets(outbound.get("ports")),
+                "inbound_ports": _buckets(inbound.get("ports")),
+                "services": _buckets(conn_aggs.get("services")),
+                "alert_signatures": _buckets(alerts_aggs.get("signatures")),
+                "alert_severities": _buckets(alerts_aggs.get("severities")),
+                "alert_categories": _buckets(alerts_aggs.get("categories")),
+                "dns_queries": _buckets(dns_aggs.get("queries")),
+                "dns_rcodes": _buckets(dns_aggs.get("rcodes")),
+                "http_hosts": _buckets(http_aggs.get("hosts")),
+                "http_user_agents": _buckets(http_aggs.get("user_agents")),
+                "tls_server_names": _buckets(ssl_aggs.get("server_names")),
+                "tls_versions": _buckets(ssl_aggs.get("versions")),
             },
-            "recent_connections": [h['_source'] for h in zeek_results['hits']['hits']],
-            "recent_alerts": [h['_source'] for h in suricata_results['hits']['hits']]
         }
+        if include_hits:
+            result["recent_connections"] = [h["_source"] for h in conn.get("hits", {}).get("hits", [])]
+            result["recent_alerts"] = [h["_source"] for h in responses["alerts"].get("hits", {}).get("hits", [])]
+        if errors:
+            result["errors"] = errors
+        return result
 
     async def find_lateral_movement(self, source_ip: str) -> List[Dict[str, Any]]:
         """
@@ -83,5 +214,264 @@ class ThreatHuntingService:
             "size": 100
         }
         
-        results = await self.os_client.search("zeek-*", query)
+        results = await self.os_client.search(settings.ZEEK_INDEX_PATTERN, query)
         return [h['_source'] for h in results['hits']['hits']]
+
+    async def analyze_lateral_movement(
+        self,
+        seed_ip: str,
+        time_range: str = "now-24h",
+        baseline_range: str = "now-7d",
+        max_hops: Optional[int] = None,
+        services: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Graph analysis of internal admin-protocol traffic reachable from a host
+        
+        The graph is expanded hop by hop with composite aggregations over
+        (id.orig_h, id.resp_h, service), so cost scales with distinct edges
+        rather than connections. Edges absent from the baseline window
+        (baseline_range up to time_range) are marked new, and sources with
+        an outsized number of distinct peers are reported as fan-out anomalies.
+        """
+        max_hops = min(max_hops or settings.LATERAL_MAX_HOPS, settings.LATERAL_MAX_HOPS)
+        logger.info("Starting lateral movement analysis", seed=seed_ip, time_range=time_range, max_hops=max_hops)
+        
+        lateral_filter = {
+            "bool": {
+                "should": [
+                    {"terms": {"service": services or settings.LATERAL_SERVICES}},
+                    {"terms": {"id.resp_p": settings.LATERAL_PORTS}},
+                ],
+                "minimum_should_match": 1
+            }
+        }
+        internal_filter = {
+            "bool": {
+                "should": [{"term": {"id.resp_h": net}} for net in settings.INTERNAL_NETWORKS],
+                "minimum_should_match": 1
+            }
+        }
+        
+        graph = HostGraph(max_edges=settings.LATERAL_MAX_EDGES)
+        expanded = set()
+        frontier = [seed_ip]
+        queries = 0
+        
+        for _ in range(max_hops):
+            if not frontier or graph.truncated:
+                break
+            expanded.update(frontier)
+            discovered = set()
+            for batch in _chunks(frontier, settings.LATERAL_FRONTIER_BATCH):
+                if graph.truncated:
+                    break
+                query = {"bool": {"filter": [
+                    {"range": {"@timestamp": {"gte": time_range, "lte": "now"}}},
+                    {"terms": {"id.orig_h": batch}},
+                    lateral_filter,
+                    internal_filter,
+                ]}}
+                queries += 1
+                async for bucket in self.os_client.iter_composite(
+                    settings.ZEEK_INDEX_PATTERN,
+                    query,
+                    sources=[
+                        {"src": {"terms": {"field": "id.orig_h"}}},
+                        {"dst": {"terms": {"field": "id.resp_h"}}},
+                        {"service": {"terms": {"field": "service", "missing_bucket": True}}},
+                    ],
+                    aggs={
+                        "first_seen": {"min": {"field": "@timestamp"}},
+                        "last_seen": {"max": {"field": "@timestamp"}},
+                    },
+                ):
+                    key = bucket["key"]
+                    if not graph.add_edge(
+                        key["src"], key["dst"], key.get("service"), bucket["doc_count"],
+                        bucket.get("first_seen", {}).get("value_as_string"),
+                        bucket.get("last_seen", {}).get("value_as_string"),
+                    ):
+                        break
+                    discovered.add(key["dst"])
+            frontier = sorted(discovered - expanded)
+        
+        # Edges seen before the window are known; everything else is new
+        known = set()
+        sources = sorted(graph.adjacency)
+        for batch in _chunks(sources, settings.LATERAL_FRONTIER_BATCH):
+            query = {"bool": {"filter": [
+                {"range": {"@timestamp": {"gte": baseline_range, "lt": time_range}}},
+                {"terms": {"id.orig_h": batch}},
+                lateral_filter,
+                internal_filter,
+            ]}}
+            queries += 1
+            async for bucket in self.os_client.iter_composite(
+                settings.ZEEK_INDEX_PATTERN,
+                query,
+                sources=[
+                    {"src": {"terms": {"field": "id.orig_h"}}},
+                    {"dst": {"terms": {"field": "id.resp_h"}}},
+                ],
+            ):
+                known.add((bucket["key"]["src"], bucket["key"]["dst"]))
+        
+        new_edges = 0
+        for src, peers in graph.adjacency.items():
+            for dst, edge in peers.items():
+                edge.new = (src, dst) not in known
+                new_edges += edge.new
+        
+        reachable = graph.reachable(seed_ip, max_hops)
+        edges = graph.edges()
+        return {
+            "seed": seed_ip,
+            "time_range": time_range,
+            "baseline_range": baseline_range,
+            "max_hops": max_hops,
+            "reachable_hosts": [
+                {"ip": host, "hop": hop, "via": via}
+                for host, (hop, via) in sorted(reachable.items(), key=lambda item: item[1][0])
+                if host != seed_ip
+            ],
+            "edges": edges,
+            "new_edge_count": new_edges,
+            "fan_out_anomalies": graph.fan_out_anomalies(
+                settings.LATERAL_FANOUT_MIN, settings.LATERAL_FANOUT_FACTOR
+            ),
+            "stats": {
+                "connections": sum(e["count"] for e in edges),
+                "edges": graph.edge_count,
+                "hosts": len(reachable),
+                "queries": queries,
+                "truncated": graph.truncated,
+            },
+        }
+
+    async def find_beacons(
+        self,
+        time_range: str = "now-24h",
+        external_only: bool = True,
+        min_connections: Optional[int] = None,
+        min_score: Optional[float] = None,
+        max_results: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Screen every (src, dst, port) pair in the window for periodic traffic
+        
+        A first composite pass counts connections per pair and keeps the
+        busiest BEACON_MAX_PAIRS with at least `min_connections`. A second
+        pass buckets those pairs with a date_histogram source into a
+        pairs x bins matrix, which score_series scores in one vectorized
+        batch off the event loop.
+        """
+        min_connections = min_connections or settings.BEACON_MIN_CONNECTIONS
+        min_score = settings.BEACON_MIN_SCORE if min_score is None else min_score
+        max_results = min(max_results or settings.BEACON_MAX_RESULTS, settings.BEACON_MAX_RESULTS)
+        logger.info("Starting beaconing analysis", time_range=time_range, external_only=external_only)
+        
+        window = {"range": {"@timestamp": {"gte": time_range, "lte": "now"}}}
+        must_not = []
+        if external_only:
+            must_not = [{"term": {"id.resp_h": net}} for net in settings.INTERNAL_NETWORKS]
+        pair_sources = [
+            {"src": {"terms": {"field": "id.orig_h"}}},
+            {"dst": {"terms": {"field": "id.resp_h"}}},
+            {"port": {"terms": {"field": "id.resp_p"}}},
+        ]
+        
+        # Pass 1: connection counts and time extent per pair
+        pairs: List[Tuple[int, Tuple[str, str, int]]] = []
+        screened = 0
+        first_ms = last_ms = None
+        queries = 1
+        async for bucket in self.os_client.iter_composite(
+            settings.ZEEK_INDEX_PATTERN,
+            {"bool": {"filter": [window], "must_not": must_not}},
+            sources=pair_sources,
+            aggs={
+                "first_seen": {"min": {"field": "@timestamp"}},
+                "last_seen": {"max": {"field": "@timestamp"}},
+            },
+        ):
+            screened += 1
+            if bucket["doc_count"] < min_connections:
+                continue
+            key = bucket["key"]
+            pairs.append((bucket["doc_count"], (key["src"], key["dst"], key["port"])))
+            first, last = bucket["first_seen"]["value"], bucket["last_seen"]["value"]
+            first_ms = first if first_ms is None else min(first_ms, first)
+            last_ms = last if last_ms is None else max(last_ms, last)
+        
+        candidates = heapq.nlargest(settings.BEACON_MAX_PAIRS, pairs, key=lambda p: p[0])
+        stats: Dict[str, Any] = {"pairs_screened": screened, "candidates": len(candidates)}
+        if not candidates:
+            return {"time_range": time_range, "beacons": [], "stats": {**stats, "queries": queries}}
+        
+        # Fixed-interval buckets are aligned to the epoch, so align the origin too
+        span_seconds = (last_ms - first_ms) / 1000
+        bin_seconds = max(settings.BEACON_BIN_SECONDS, math.ceil(span_seconds / settings.BEACON_MAX_BINS))
+        bin_ms = bin_seconds * 1000
+        origin = int(first_ms // bin_ms) * bin_ms
+        bins = int(last_ms // bin_ms - first_ms // bin_ms) + 1
+        
+        rows = {pair: row for row, (_, pair) in enumerate(candidates)}
+        counts = np.zeros((len(candidates), bins), dtype=np.float32)
+        
+        # Pass 2: per-bin counts for the candidate pairs
+        for batch in _chunks([pair for _, pair in candidates], settings.BEACON_PAIR_BATCH):
+            query = {"bool": {"filter": [
+                window,
+                {"terms": {"id.orig_h": sorted({src for src, _, _ in batch})}},
+                {"terms": {"id.resp_h": sorted({dst for _, dst, _ in batch})}},
+                {"terms": {"id.resp_p": sorted({port for _, _, port in batch})}},
+            ]}}
+            queries += 1
+            async for bucket in self.os_client.iter_composite(
+                settings.ZEEK_INDEX_PATTERN,
+                query,
+                sources=pair_sources + [
+                    {"ts": {"date_histogram": {"field": "@timestamp", "fixed_interval": f"{bin_seconds}s"}}},
+                ],
+            ):
+                key = bucket["key"]
+                # The terms filters admit cross-product pairs that were never candidates
+                row = rows.get((key["src"], key["dst"], key["port"]))
+                if row is None:
+                    continue
+                column = int((key["ts"] - origin) // bin_ms)
+                if 0 <= column < bins:
+                    counts[row, column] += bucket["doc_count"]
+        
+        scores = await asyncio.get_running_loop().run_in_executor(None, score_series, counts, bin_seconds)
+        
+        ranked = [row for row in np.argsort(-scores["score"]) if scores["score"][row] >= min_score]
+        beacons = []
+        for row in ranked[:max_results]:
+            connections, (src, dst, port) = candidates[row]
+            beacons.append({
+                "src": src,
+                "dst": dst,
+                "port": port,
+                "connections": connections,
+                "score": round(float(scores["score"][row]), 3),
+                "jitter": round(float(scores["jitter"][row]), 3),
+                "period_seconds": float(scores["period_seconds"][row]),
+                "fft_period_seconds": round(float(scores["fft_period_seconds"][row]), 1),
+                "fft_prominence": round(float(scores["fft_prominence"][row]), 1),
+                "fill": round(float(scores["fill"][row]), 3),
+                "active_bins": int(scores["active_bins"][row]),
+            })
+        
+        return {
+            "time_range": time_range,
+            "beacons": beacons,
+            "stats": {
+                **stats,
+                "bin_seconds": bin_seconds,
+                "bins": bins,
+                "above_threshold": len(ranked),
+                "queries": queries,
+            },
+        }
@@ -0,0 +1,188 @@
+"""
+Translation cache for natural language queries
+Maps a normalized query, index pattern and model settings to the DSL the
+LLM produced, with LRU + TTL eviction and optional JSON persistence.
+Relative time phrases are templated out of the key, so "DNS queries in
+the last hour" and "DNS queries in the last week" share one entry.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter
+
+logger = structlog.get_logger()
+
+# Relative time phrases and the range each maps to, checked in order
+TIME_PHRASES: List[Tuple[Tuple[str, ...], Dict[str, str]]] = [
+    (("last hour", "past hour"), {"gte": "now-1h", "lte": "now"}),
+    (("last 24 hours", "last day"), {"gte": "now-24h", "lte": "now"}),
+    (("last 7 days", "last week"), {"gte": "now-7d", "lte": "now"}),
+    (("last 30 days", "last month"), {"gte": "now-30d", "lte": "now"}),
+    (("today",), {"gte": "now/d", "lte": "now"}),
+]
+
+TIME_PLACEHOLDER = "{time_range}"
+_GTE_PLACEHOLDER = "{time_range.gte}"
+
+CACHE_REQUESTS = Counter(
+    "translation_cache_requests_total",
+    "Translation cache lookups by result",
+    ["result"],
+)
+
+
+def match_time_phrase(query: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """First relative time phrase in a (lowercased) query and its range"""
+    for phrases, time_range in TIME_PHRASES:
+        for phrase in phrases:
+            if phrase in query:
+                return phrase, time_range
+    return None
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", query.lower()).strip().rstrip("?.! ")
+
+
+def _substitute(node: Any, old: str, new: str) -> Tuple[Any, int]:
+    """Copy of a DSL tree with range "gte" values equal to `old` replaced by `new`"""
+    if isinstance(node, dict):
+        replaced = 0
+        out = {}
+        for key, value in node.items():
+            if key == "gte" and value == old:
+                out[key] = new
+                replaced += 1
+            else:
+                out[key], count = _substitute(value, old, new)
+                replaced += count
+        return out, replaced
+    if isinstance(node, list):
+        replaced = 0
+        out = []
+        for item in node:
+            item, count = _substitute(item, old, new)
+            out.append(item)
+            replaced += count
+        return out, replaced
+    return node, 0
+
+
+class TranslationCache:
+    """LRU + TTL cache of translated DSL, optionally persisted to a JSON file"""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 86400, path: str = ""):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        # key -> (entry, expires_at); wall-clock expiry so persisted entries survive restarts
+        self._data: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._save_lock = asyncio.Lock()
+        if path:
+            self._load()
+
+    @staticmethod
+    def make_key(query: str, index_pattern: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, str]]]:
+        """
+        Cache key for a query, plus the time range templated out of it
+
+        `fingerprint` identifies the model settings and prompt, so changing
+        either never serves a stale translation.
+        """
+        normalized = normalize_query(query)
+        time_range = None
+        match = match_time_phrase(normalized)
+        if match:
+            phrase, time_range = match
+            normalized = normalized.replace(phrase, TIME_PLACEHOLDER, 1)
+        raw = json.dumps([normalized, index_pattern, fingerprint])
+        return hashlib.sha256(raw.encode()).hexdigest(), time_range
+
+    def get(self, key: str, time_range: Optional[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """Cached DSL with the query's own time range filled in, or None"""
+        item = self._data.get(key)
+        if item is None:
+            CACHE_REQUESTS.labels("miss").inc()
+            return None
+        entry, expires_at = item
+        if expires_at <= time.time():
+            del self._data[key]
+            CACHE_REQUESTS.labels("expired").inc()
+            return None
+
+        if entry["templated"]:
+            dsl, _ = _substitute(entry["dsl"], _GTE_PLACEHOLDER, time_range["gte"])
+        elif time_range and entry["time_gte"] != time_range["gte"]:
+            # The LLM did not emit a range we could template; only an exact phrase match is usable
+            CACHE_REQUESTS.labels("miss").inc()
+            return None
+        else:
+            dsl = copy.deepcopy(entry["dsl"])
+
+        self._data.move_to_end(key)
+        CACHE_REQUESTS.labels("hit").inc()
+        return dsl
+
+    async def set(self, key: str, time_range: Optional[Dict[str, str]], dsl: Dict[str, Any]):
+        """Store a translation, templating its time range when the DSL contains it"""
+        templated = False
+        if time_range:
+            stored, replaced = _substitute(dsl, time_range["gte"], _GTE_PLACEHOLDER)
+            templated = replaced > 0
+        if not templated:
+            # Callers mutate the DSL they get back, so keep a private copy
+            stored = copy.deepcopy(dsl)
+        entry = {
+            "dsl": stored,
+            "templated": templated,
+            "time_gte": time_range["gte"] if time_range else None,
+        }
+
+        if key in self._data:
+            del self._data[key]
+        self._data[key] = (entry, time.time() + self.ttl_seconds)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+        if self.path:
+            snapshot = list(self._data.items())
+            async with self._save_lock:
+                await asyncio.get_running_loop().run_in_executor(None, self._save, snapshot)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load translation cache", path=self.path, error=str(e))
+            return
+        now = time.time()
+        for key, entry, expires_at in items[-self.max_size:]:
+            if expires_at > now:
+                self._data[key] = (entry, expires_at)
+        logger.info("Loaded translation cache", entries=len(self._data))
+
+    def _save(self, snapshot: List[Tuple[str, Tuple[Dict[str, Any], float]]]):
+        # Write-then-rename so a crash never leaves a truncated file
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump([[key, entry, expires_at] for key, (entry, expires_at) in snapshot], f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not persist translation cache", path=self.path, error=str(e))
+
+    def __len__(self) -> int:
+        return len(self._data)
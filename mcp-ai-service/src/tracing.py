@@ -0,0 +1,113 @@
+"""
+Distributed tracing shared by the ThunderX FastAPI services
+W3C traceparent is extracted from incoming requests and injected into
+outgoing calls, so one trace follows a query from the gateway through the
+MCP AI service to OpenSearch. Spans go to a JSON-lines file or an OTLP
+collector, selected by TRACE_EXPORTER.
+"""
+
+from typing import Dict, Optional
+
+import structlog
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import route_template
+
+logger = structlog.get_logger()
+
+tracer = trace.get_tracer("thunderx")
+
+
+def _create_exporter():
+    if settings.TRACE_EXPORTER == "file":
+        out = open(settings.TRACE_FILE_PATH, "a", buffering=1)
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    if settings.TRACE_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp-proto-http not installed, spans are not exported")
+            return None
+        return OTLPSpanExporter(endpoint=settings.TRACE_OTLP_ENDPOINT)
+    return None
+
+
+def setup_tracing(service_name: str):
+    """Install the tracer provider; context is propagated even when nothing is exported"""
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACE_SAMPLE_RATIO)),
+    )
+    exporter = _create_exporter()
+    if exporter is not None:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def shutdown_tracing():
+    """Flush buffered spans (called from the lifespan handler)"""
+    provider = trace.get_tracer_provider()
+    if isinstance(provider, TracerProvider):
+        provider.shutdown()
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add traceparent (and tracestate) for the current span to outgoing headers"""
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
+
+
+def current_trace_id() -> Optional[str]:
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per request
+
+    The span continues the caller's trace when a traceparent header is
+    present, and the trace id is echoed in X-Trace-Id.
+    """
+
+    def __init__(self, app: ASGIApp, root_app: ASGIApp):
+        self.app = app
+        self.root_app = root_app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        route = route_template(self.root_app, scope)
+        method = scope["method"]
+
+        with tracer.start_as_current_span(
+            f"{method} {route}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": method, "http.route": route, "http.target": scope["path"]},
+        ) as span:
+            trace_id = current_trace_id()
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                    if trace_id:
+                        message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
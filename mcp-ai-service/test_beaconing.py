@@ -0,0 +1,51 @@
+"""
+Beaconing scores on synthetic connection series
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from src.services.beaconing import score_series
+
+BINS = 1440
+
+
+def _series(times):
+    row = np.zeros(BINS)
+    np.add.at(row, np.asarray(times, dtype=int), 1)
+    return row
+
+
+def test_periodic_beats_random_and_saturated_noise():
+    rng = np.random.default_rng(0)
+    jittered = np.cumsum(rng.normal(10, 1, 200)).astype(int)
+    counts = np.array([
+        _series(np.arange(0, BINS, 5)),              # 5-minute beacon
+        _series(jittered[jittered < BINS]),          # 10-minute beacon with jitter
+        _series(rng.integers(0, BINS, 200)),         # random sparse
+        rng.poisson(10, BINS).astype(float),         # busy random pair, active in every bin
+        np.full(BINS, 2.0),                          # 30-second beacon, also every bin
+    ])
+    scores = score_series(counts, 60)
+
+    assert scores["score"][0] > 0.95
+    assert scores["score"][1] > 0.8
+    assert scores["score"][2] < 0.6
+    assert scores["score"][3] < 0.1
+    assert scores["score"][4] > 0.95
+    assert list(scores["fill"][3:]) == [1.0, 1.0]
+    assert scores["period_seconds"][0] == 300
+    assert scores["fft_period_seconds"][0] == 300
+    assert scores["fft_prominence"][0] > scores["fft_prominence"][2]
+    # A flat series has no spectral peak to report
+    assert scores["fft_prominence"][4] == 0 and scores["fft_period_seconds"][4] == 0
+
+
+def test_sparse_rows_score_zero():
+    counts = np.array([_series([10, 500]), np.zeros(BINS)])
+    assert list(score_series(counts, 60)["score"]) == [0.0, 0.0]
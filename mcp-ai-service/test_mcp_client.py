@@ -0,0 +1,176 @@
+"""
+MCPClient against the stub MCP server in mcp_stub_server.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+import mcp_stub_server
+from src.config import settings
+from src.services.mcp_client import MCPClient, SessionLost
+
+STUB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_stub_server.py")
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnects(monkeypatch):
+    monkeypatch.setattr(settings, "MCP_RECONNECT_BASE_DELAY", 0.01)
+    monkeypatch.setattr(settings, "MCP_REQUEST_TIMEOUT_SECONDS", 10.0)
+
+
+@pytest.fixture
+def stdio(monkeypatch):
+    monkeypatch.setattr(settings, "MCP_TRANSPORT", "stdio")
+    monkeypatch.setattr(settings, "MCP_STDIO_COMMAND", [sys.executable, STUB])
+
+
+@pytest.fixture
+def http_server(monkeypatch):
+    server = mcp_stub_server.serve_http()
+    monkeypatch.setattr(settings, "MCP_TRANSPORT", "http")
+    monkeypatch.setattr(settings, "MCP_SERVER_URL", server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(scenario):
+    """Run `scenario(client)` on a fresh client, disconnecting afterwards"""
+    async def main():
+        client = MCPClient()
+        try:
+            return await scenario(client)
+        finally:
+            await client.disconnect()
+    return asyncio.run(main())
+
+
+def test_concurrent_calls_are_matched_by_id(stdio):
+    async def scenario(client):
+        await client.connect()
+        delays = [0.5, 0.4, 0.3, 0.2, 0.1]
+        started = time.monotonic()
+        # Later calls finish first, so responses arrive in reverse order
+        results = await asyncio.gather(*(
+            client.execute_tool("echo", {"i": i, "delay": delay}) for i, delay in enumerate(delays)
+        ))
+        return results, time.monotonic() - started
+
+    results, elapsed = run(scenario)
+    assert [r["result"]["content"][0]["text"] for r in results] == [
+        f'{{"i": {i}, "delay": {delay}}}' for i, delay in enumerate([0.5, 0.4, 0.3, 0.2, 0.1])
+    ]
+    # Pipelined on one session, not one after another
+    assert elapsed < 1.0
+
+
+def test_execute_tools_reports_failures_per_call(stdio):
+    results = run(lambda client: client.execute_tools([
+        ("echo", {"i": 1}), ("fail", {}), ("echo", {"i": 2}),
+    ]))
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert "fail always fails" in results[1]["error"]
+    assert results[2]["result"]["content"][0]["text"] == '{"i": 2}'
+
+
+def test_reconnects_after_the_server_process_exits(stdio):
+    async def scenario(client):
+        first = await client.execute_tool("echo", {})
+        with pytest.raises(ConnectionError):
+            await client.execute_tool("exit", {})
+        assert not client.is_connected()
+        second = await client.execute_tool("echo", {})
+        return first["result"]["pid"], second["result"]["pid"], client.is_connected()
+
+    first_pid, second_pid, connected = run(scenario)
+    assert first_pid != second_pid
+    assert connected
+
+
+def test_tool_cache_is_dropped_on_list_changed(stdio):
+    async def scenario(client):
+        tools = await client.list_tools()
+        assert await client.list_tools() is tools
+        # The notification is written before the call's response, so it is handled first
+        await client.execute_tool("add_tool", {"name": "new_tool"})
+        return [t["name"] for t in tools], [t["name"] for t in await client.list_tools()]
+
+    before, after = run(scenario)
+    assert before == ["echo", "fail", "exit", "add_tool"]
+    assert after == before + ["new_tool"]
+
+
+def test_list_changed_during_listing_is_not_cached(stdio):
+    async def scenario(client):
+        await client.connect()
+        listing = asyncio.create_task(client.list_tools())
+        await asyncio.sleep(0)
+        client._dispatch({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+        await listing
+        return client._tools
+
+    assert run(scenario) is None
+
+
+def test_http_batch_is_one_post_and_sse_notifications_are_read(http_server):
+    async def scenario(client):
+        await client.connect()
+        tools = await client.list_tools()
+        posts = http_server.posts
+        results = await client.execute_tools([("echo", {"i": 1}), ("fail", {}), ("echo", {"i": 2})])
+        assert http_server.posts == posts + 1
+        await client.execute_tool("add_tool", {"name": "new_tool"})
+        return results, tools, await client.list_tools()
+
+    results, before, after = run(scenario)
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert len(after) == len(before) + 1
+
+
+def test_http_session_expiry_is_retried_on_a_new_session(http_server):
+    async def scenario(client):
+        await client.execute_tool("echo", {})
+        expired = client._transport.session_id
+        http_server.sessions.clear()
+        result = await client.execute_tool("echo", {"i": 1})
+        return expired, client._transport.session_id, result
+
+    expired, current, result = run(scenario)
+    assert result["status"] == "success"
+    assert current != expired
+
+
+class _FlakyTransport:
+    """Pipelining transport whose second send fails after the first was accepted"""
+
+    supports_batching = False
+
+    def __init__(self, client):
+        self.client = client
+        self.sent = []
+
+    async def send(self, payload):
+        self.sent.append(payload["id"])
+        if len(self.sent) == 2:
+            raise SessionLost("gone")
+        self.client._dispatch({"jsonrpc": "2.0", "id": payload["id"], "result": {"content": []}})
+
+
+def test_partially_sent_batch_is_not_retried():
+    async def scenario(client):
+        transport = _FlakyTransport(client)
+        results = await client._call_batch(transport, [("tools/call", {}), ("tools/call", {})])
+        return transport.sent, results, client._pending
+
+    sent, results, pending = run(scenario)
+    assert len(sent) == 2
+    assert results[0] == {"content": []}
+    assert isinstance(results[1], SessionLost)
+    assert pending == {}
@@ -0,0 +1,74 @@
+"""
+Rule-based query compiler: disjunctions must fall through to the LLM
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from opensearch_templates import AGGREGATABLE_TYPES, field_type
+from src.services.query_compiler import compile_query
+from src.services.query_guard import guard_query
+
+
+def _filters(dsl):
+    return dsl["query"]["bool"]["filter"]
+
+
+@pytest.mark.parametrize("question", [
+    "show tcp or udp traffic",
+    "either tcp or udp traffic",
+    "connections from 10.0.0.1 or 10.0.0.2",
+    "medium or low severity alerts",
+    "dns or http traffic",
+    # Alternatives joined by "and" cannot hold for a single hit either
+    "show tcp and udp traffic",
+    "medium and low severity alerts",
+    "connections from 10.0.0.1 from 10.0.0.2",
+])
+def test_disjunctions_are_not_compiled(question):
+    assert compile_query(question) is None
+
+
+def test_port_list_compiles_to_terms():
+    dsl = compile_query("traffic to port 80 or 443")
+    port_filter = _filters(dsl)[0]["bool"]["should"]
+    assert {"terms": {"id.resp_p": [80, 443]}} in port_filter
+    assert {"terms": {"dest_port": [80, 443]}} in port_filter
+
+
+def test_conjunction_of_different_fields_compiles():
+    dsl = compile_query("show tcp traffic from 10.0.0.1 to 10.0.0.2", "zeek-*")
+    assert _filters(dsl)[:3] == [
+        {"term": {"id.orig_h": "10.0.0.1"}},
+        {"term": {"id.resp_h": "10.0.0.2"}},
+        {"term": {"proto": "tcp"}},
+    ]
+
+
+def test_single_severity_compiles():
+    dsl = compile_query("high severity alerts in the last 24 hours")
+    assert {"term": {"alert.severity": 1}} in _filters(dsl)
+
+
+@pytest.mark.parametrize("question", [
+    "What are the most frequent alert signatures?",
+    "top 5 alert categories",
+    "top 10 source ips",
+    "top 10 destination ips by bytes",
+    "most common destination ports",
+    "top protocols",
+    "top services",
+])
+def test_aggregated_fields_are_aggregatable(question):
+    dsl = compile_query(question)
+    assert dsl is not None
+    guarded = guard_query({k: v for k, v in dsl.items() if k != "explanation"}, "*")
+    fields = [guarded.body["aggs"]["top"]["terms"]["field"]]
+    fields += [agg["sum"]["field"] for agg in guarded.body["aggs"]["top"].get("aggs", {}).values()]
+    for field in fields:
+        assert field_type(guarded.index, field) in AGGREGATABLE_TYPES, (guarded.index, field)
@@ -0,0 +1,60 @@
+"""
+Query guardrails: time bounding and size validation
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from src.config import settings
+from src.services.query_guard import QueryRejected, guard_query
+
+
+def test_should_only_query_keeps_its_semantics():
+    should = {"bool": {"should": [{"term": {"proto": "tcp"}}, {"term": {"proto": "udp"}}]}}
+    guarded = guard_query({"query": should}, "zeek-*")
+    query = guarded.body["query"]["bool"]
+    # The original query stays a scoring clause, so its should still has to match
+    assert query["must"] == [should]
+    assert query["filter"][0]["range"]["@timestamp"]["gte"] == settings.QUERY_DEFAULT_TIME_RANGE
+
+
+def test_existing_time_range_is_not_wrapped():
+    body = {"query": {"bool": {"filter": [{"range": {"@timestamp": {"gte": "now-1h", "lte": "now"}}}]}}}
+    guarded = guard_query(body, "zeek-*")
+    assert guarded.body["query"] == body["query"]
+    assert guarded.cost["time_span_seconds"] == 3600
+
+
+@pytest.mark.parametrize("size", [None, "100", -5, True, 2.5])
+def test_invalid_size_falls_back_to_default(size):
+    assert guard_query({"size": size}, "zeek-*").body["size"] == 10
+
+
+def test_missing_size_is_left_to_the_default():
+    guarded = guard_query({}, "zeek-*")
+    assert "size" not in guarded.body
+    assert guarded.cost["size"] == 10
+
+
+def test_large_size_and_offset_are_clamped():
+    guarded = guard_query({"size": settings.MAX_QUERY_RESULTS + 1, "from": 5}, "zeek-*")
+    assert guarded.body["size"] == settings.MAX_QUERY_RESULTS
+    assert guarded.body["from"] == 0
+    assert guard_query({"size": 10, "from": "x"}, "zeek-*").body["from"] == 0
+
+
+def test_invalid_agg_size_falls_back_to_default():
+    body = {"size": 0, "aggs": {"top": {"terms": {"field": "id.orig_h", "size": "many"}}}}
+    guarded = guard_query(body, "zeek-*")
+    assert guarded.body["aggs"]["top"]["terms"]["size"] == 10
+    assert guarded.cost["agg_buckets"] == 10
+
+
+def test_scripts_are_rejected():
+    with pytest.raises(QueryRejected):
+        guard_query({"query": {"script": {"script": "true"}}}, "zeek-*")
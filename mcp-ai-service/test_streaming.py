@@ -0,0 +1,55 @@
+"""
+Query result streaming with the sort forms the DSL allows
+"""
+
+import asyncio
+import os
+import sys
+
+import orjson
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from src.services.streaming import normalize_sort, stream_query_events
+
+
+class PagingClient:
+    """Stands in for OpenSearchClient; records the sort and serves one page"""
+
+    def __init__(self):
+        self.sort = None
+
+    async def iter_pit_pages(self, index, query, sort=None, page_size=None, source=None):
+        # As the real client does before the first search
+        self.sort = sort + [{"_shard_doc": "asc"}]
+        yield [{"_source": {"n": 1}}, {"_source": {"n": 2}}]
+
+
+def events(body):
+    client = PagingClient()
+
+    async def collect():
+        return [frame async for frame in stream_query_events(client, "zeek-*", body, {}, max_rows=10)]
+
+    frames = asyncio.run(collect())
+    names = [frame.split(b"\n")[0].decode()[len("event: "):] for frame in frames]
+    return names, client.sort, frames
+
+
+def test_dict_sort_is_streamed():
+    names, sort, frames = events({"query": {"match_all": {}}, "sort": {"@timestamp": "desc", "uid": "asc"}})
+    assert names == ["dsl", "page", "done"]
+    assert sort == [{"@timestamp": "desc"}, {"uid": "asc"}, {"_shard_doc": "asc"}]
+    page = orjson.loads(frames[1].split(b"data: ")[1])
+    assert page["results"] == [{"n": 1}, {"n": 2}]
+
+
+@pytest.mark.parametrize("sort, expected", [
+    ("@timestamp", ["@timestamp"]),
+    ([{"id.orig_h": "asc"}, "_score"], [{"id.orig_h": "asc"}, "_score"]),
+    (None, [{"@timestamp": {"order": "desc", "unmapped_type": "date"}}]),
+])
+def test_sort_forms_are_normalized_to_clause_lists(sort, expected):
+    assert normalize_sort(sort) == expected
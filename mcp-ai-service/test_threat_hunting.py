@@ -0,0 +1,54 @@
+"""
+ThreatHuntingService searches against the index template mappings
+"""
+
+import asyncio
+import os
+import sys
+from typing import Any, List, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from opensearch_templates import AGGREGATABLE_TYPES, field_type
+from src.services.threat_hunting import ThreatHuntingService
+
+
+class RecordingClient:
+    """Stands in for OpenSearchClient; records searches and returns empty responses"""
+
+    def __init__(self):
+        self.searches: List[Tuple[str, dict]] = []
+
+    async def msearch(self, searches):
+        self.searches.extend(searches)
+        return [{} for _ in searches]
+
+
+def aggregated_fields(node: Any, found: set):
+    """Every "field" referenced inside an aggregation tree"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "field" and isinstance(value, str):
+                found.add(value)
+            else:
+                aggregated_fields(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            aggregated_fields(item, found)
+
+
+def test_investigate_ip_aggregates_only_aggregatable_fields():
+    client = RecordingClient()
+    asyncio.run(ThreatHuntingService(client).investigate_ip("10.0.0.1"))
+    assert len(client.searches) == 5
+
+    checked = []
+    for index, body in client.searches:
+        fields: set = set()
+        aggregated_fields(body.get("aggs", {}), fields)
+        for field in sorted(fields):
+            checked.append((index, field, field_type(index, field)))
+    not_aggregatable = [c for c in checked if c[2] not in AGGREGATABLE_TYPES]
+    assert not not_aggregatable
+    assert ("suricata-*", "alert.signature.keyword", "keyword") in checked
@@ -58,12 +58,23 @@ curl -k -X PUT "${OPENSEARCH_URL}/_index_template/zeek-logs" \
         "missed_bytes": { "type": "long" },
         "history": { "type": "keyword" },
         "orig_pkts": { "type": "long" },
-        "resp_pkts": { "type": "long" }
+        "resp_pkts": { "type": "long" },
+        "uid": { "type": "keyword" },
+        "query": { "type": "keyword" },
+        "qtype_name": { "type": "keyword" },
+        "rcode_name": { "type": "keyword" },
+        "host": { "type": "keyword" },
+        "method": { "type": "keyword" },
+        "uri": { "type": "keyword", "ignore_above": 2048 },
+        "user_agent": { "type": "keyword", "ignore_above": 1024 },
+        "status_code": { "type": "integer" },
+        "server_name": { "type": "keyword" },
+        "version": { "type": "keyword" }
       }
     }
   },
   "priority": 100,
-  "version": 1
+  "version": 2
 }'
 
 echo ""
@@ -92,7 +103,10 @@ curl -k -X PUT "${OPENSEARCH_URL}/_index_template/suricata-logs" \
         "proto": { "type": "keyword" },
         "alert": {
           "properties": {
-            "signature": { "type": "text" },
+            "signature": {
+              "type": "text",
+              "fields": { "keyword": { "type": "keyword", "ignore_above": 1024 } }
+            },
             "signature_id": { "type": "integer" },
             "category": { "type": "keyword" },
             "severity": { "type": "integer" },
@@ -111,7 +125,7 @@ curl -k -X PUT "${OPENSEARCH_URL}/_index_template/suricata-logs" \
     }
   },
   "priority": 100,
-  "version": 1
+  "version": 2
 }'
 
 echo ""
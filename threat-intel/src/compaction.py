@@ -0,0 +1,108 @@
+"""
+IOC Compaction
+Decays confidence of indicators that stop being reported, deactivates
+expired ones and deletes long-inactive rows, all in bounded batches
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict
+
+import structlog
+from sqlalchemy import select, update, delete, exists
+from sqlalchemy.orm import sessionmaker
+
+from .config import settings
+from .database import SessionLocal
+from .models import IOC, CompactionState, FeedState
+
+logger = structlog.get_logger()
+
+STATE_NAME = "ioc_compaction"
+
+
+def decay_factor(elapsed: timedelta) -> float:
+    """Multiplier applying exponential confidence decay over `elapsed`"""
+    half_life = timedelta(days=settings.IOC_CONFIDENCE_HALF_LIFE_DAYS)
+    return 0.5 ** (elapsed / half_life)
+
+
+def _batched_update(session_factory: sessionmaker, where, values: Dict) -> int:
+    """Apply an UPDATE in keyset-paginated id batches; returns rows touched"""
+    total, last_id = 0, 0
+    while True:
+        with session_factory() as db:
+            ids = db.scalars(
+                select(IOC.id).where(where, IOC.id > last_id)
+                .order_by(IOC.id).limit(settings.COMPACTION_BATCH_SIZE)
+            ).all()
+            if not ids:
+                return total
+            db.execute(update(IOC).where(IOC.id.in_(ids)).values(**values))
+            db.commit()
+        total += len(ids)
+        last_id = ids[-1]
+
+
+def _batched_delete(session_factory: sessionmaker, where) -> int:
+    total = 0
+    while True:
+        with session_factory() as db:
+            ids = db.scalars(select(IOC.id).where(where).limit(settings.COMPACTION_BATCH_SIZE)).all()
+            if not ids:
+                return total
+            db.execute(delete(IOC).where(IOC.id.in_(ids)))
+            db.commit()
+        total += len(ids)
+
+
+def compact_iocs(session_factory: sessionmaker = SessionLocal) -> Dict[str, int]:
+    """
+    Run one compaction pass (blocking; call from an executor)
+
+    Indicators not re-reported since the previous pass have their confidence
+    decayed by the time elapsed since then. That time is read from the
+    database, so restarts neither repeat nor skip decay; the first pass ever
+    assumes one UPDATE_INTERVAL_HOURS. Active indicators past
+    IOC_EXPIRY_DAYS or below IOC_MIN_CONFIDENCE are deactivated, and inactive
+    ones untouched for IOC_DELETE_AFTER_DAYS are deleted.
+
+    Decay and expiry only apply where the indicator's source has completed a
+    full fetch since the indicator was last seen, i.e. the source had the
+    chance to re-report it and did not. A feed that is failing or answering
+    304 leaves its indicators as they are.
+    """
+    now = datetime.utcnow()
+    with session_factory() as db:
+        state = db.get(CompactionState, STATE_NAME)
+        previous_run = state.last_run if state else now - timedelta(hours=settings.UPDATE_INTERVAL_HOURS)
+
+    refetched_since_seen = exists().where(FeedState.name == IOC.source, FeedState.last_fetched > IOC.last_seen)
+
+    decayed = _batched_update(
+        session_factory,
+        (IOC.active == True) & (IOC.last_seen < previous_run) & refetched_since_seen,
+        {"confidence": IOC.confidence * decay_factor(now - previous_run)}
+    )
+
+    expiry_cutoff = now - timedelta(days=settings.IOC_EXPIRY_DAYS)
+    deactivated = _batched_update(
+        session_factory,
+        (IOC.active == True) & (
+            ((IOC.last_seen < expiry_cutoff) & refetched_since_seen) | (IOC.confidence < settings.IOC_MIN_CONFIDENCE)
+        ),
+        {"active": False}
+    )
+
+    delete_cutoff = now - timedelta(days=settings.IOC_DELETE_AFTER_DAYS)
+    deleted = _batched_delete(
+        session_factory,
+        (IOC.active == False) & (IOC.last_seen < delete_cutoff)
+    )
+
+    with session_factory() as db:
+        db.merge(CompactionState(name=STATE_NAME, last_run=now))
+        db.commit()
+
+    result = {"decayed": decayed, "deactivated": deactivated, "deleted": deleted}
+    logger.info("IOC compaction complete", **result)
+    return result
@@ -25,6 +25,38 @@ class Settings(BaseSettings):
     # Feeds (default enabled feeds)
     ENABLED_FEEDS: List[str] = ["threatfox"]
     UPDATE_INTERVAL_HOURS: int = 24
+    FEED_HTTP_TIMEOUT: float = 30.0
+    FEED_MAX_CONNECTIONS: int = 10
+    FEED_BATCH_SIZE: int = 1000
+
+    # IOC lifecycle
+    IOC_EXPIRY_DAYS: int = 30
+    IOC_DELETE_AFTER_DAYS: int = 90
+    IOC_CONFIDENCE_HALF_LIFE_DAYS: float = 14.0
+    IOC_MIN_CONFIDENCE: float = 0.1
+    COMPACTION_BATCH_SIZE: int = 5000
+
+    # Ingest-time enrichment of Zeek/Suricata events
+    ENRICHMENT_ENABLED: bool = True
+    # Must match the indices filebeat writes (%{[event.dataset]}-%{+yyyy.MM.dd})
+    ENRICHMENT_INDEX_PATTERNS: List[str] = ["zeek-*", "suricata-*"]
+    ENRICHMENT_INTERVAL_SECONDS: int = 60
+    ENRICHMENT_LAG_SECONDS: int = 30
+    ENRICHMENT_BATCH_SIZE: int = 1000
+
+    # Feed sources (overridable, e.g. to point at a local stub server)
+    THREATFOX_FEED_URL: str = "https://threatfox.abuse.ch/export/csv/recent/"
+    ET_COMPROMISED_FEED_URL: str = "https://rules.emergingthreats.net/blockrules/compromised-ips.txt"
+    FEODOTRACKER_FEED_URL: str = "https://feodotracker.abuse.ch/downloads/ipblocklist.txt"
+    
+    # Response compression (bodies smaller than this are sent as-is)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
+    # Tracing: "none", "file" (JSON lines at TRACE_FILE_PATH) or "otlp"
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "/tmp/thunderx-traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACE_SAMPLE_RATIO: float = 1.0
     
     class Config:
         env_file = ".env"
@@ -1,17 +1,28 @@
 """
 Enrichment Service API Routes
 """
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from .database import get_db
+from .ingest_enrichment import match_event
 from .models import IOC
 
 router = APIRouter()
 
+class EventBatch(BaseModel):
+    events: List[Dict[str, Any]]
+
 @router.get("/enrich/ip/{ip}")
-def enrich_ip(ip: str, db: Session = Depends(get_db)):
+def enrich_ip(ip: str, request: Request, db: Session = Depends(get_db)):
     """Check if an IP is in the Threat Intel DB"""
-    ioc = db.query(IOC).filter(IOC.value == ip, IOC.type == "ip").first()
+    index = request.app.state.ioc_index
+    if index.loaded:
+        ioc = index.lookup("ip", ip)
+    else:
+        ioc = db.query(IOC).filter(IOC.value == ip, IOC.type == "ip", IOC.active == True).first()
     if ioc:
         return {
             "is_malicious": True,
@@ -22,8 +33,52 @@ def enrich_ip(ip: str, db: Session = Depends(get_db)):
         }
     return {"is_malicious": False}
 
+@router.post("/enrich/events")
+def enrich_events(batch: EventBatch, request: Request):
+    """
+    Push-mode enrichment: match a batch of Zeek/Suricata events against the
+    active IOC set. Returns matches keyed by position in the batch.
+    """
+    index = request.app.state.ioc_index
+    if not index.loaded:
+        raise HTTPException(status_code=503, detail="IOC index not loaded yet")
+
+    results = {}
+    for position, event in enumerate(batch.events):
+        matches = match_event(index, event)
+        if matches:
+            results[position] = matches
+    return {"checked": len(batch.events), "matched": len(results), "matches": results}
+
 @router.get("/stats")
-def get_stats(db: Session = Depends(get_db)):
-    """Get IOC statistics"""
-    total = db.query(IOC).count()
-    return {"total_iocs": total}
+def get_stats(request: Request, db: Session = Depends(get_db)):
+    """
+    Get IOC statistics
+
+    Active counts come from the IOC index, which tallies them while it is
+    rebuilt after each feed update. The table total is the planner's row
+    estimate, so the call never scans the table.
+    """
+    estimated_total = db.execute(
+        text("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": IOC.__tablename__}
+    ).scalar() or 0
+
+    index = request.app.state.ioc_index
+    if not index.loaded:
+        return {"total_iocs": estimated_total, "estimated": True, "index_loaded": False}
+
+    stats = index.stats()
+    return {
+        "total_iocs": max(estimated_total, stats["active"]),
+        "estimated": True,
+        "index_loaded": True,
+        "as_of": index.built_at,
+        "by_active": {
+            "true": stats["active"],
+            "false": max(estimated_total - stats["active"], 0)
+        },
+        "by_type": stats["by_type"],
+        "by_source": stats["by_source"],
+        "by_severity": stats["by_severity"],
+    }
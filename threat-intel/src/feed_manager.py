@@ -6,85 +6,182 @@ Handles fetching and parsing of threat intelligence feeds
 import logging
 import asyncio
 from datetime import datetime
+from typing import Dict, List, Optional
 import httpx
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy.dialects.postgresql import insert
 
-from .models import IOC
+from .models import IOC, FeedState
 from .config import settings
+from .database import SessionLocal
+from .feeds import BaseFeed, FeedCursor, get_enabled_feeds
 
 logger = logging.getLogger(__name__)
 
+
+def create_http_client() -> httpx.AsyncClient:
+    """Pooled client shared by every feed fetch"""
+    return httpx.AsyncClient(
+        timeout=settings.FEED_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.FEED_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.FEED_MAX_CONNECTIONS,
+        ),
+        follow_redirects=True,
+    )
+
+
 class FeedManager:
-    def __init__(self, db_session: Session):
-        self.db = db_session
-        self.http_client = httpx.AsyncClient(timeout=30.0)
-
-    async def update_all_feeds(self):
-        """Update all configured feeds"""
-        logger.info("Starting feed update...")
-        await self.fetch_threatfox()
-        # await self.fetch_abuseipdb() # Requires API Key
-        logger.info("Feed update complete.")
-
-    async def fetch_threatfox(self):
-        """Fetch recent IOCs from ThreatFox (Abuse.ch)"""
-        url = "https://threatfox-api.abuse.ch/api/v1/"
-        payload = {
-            "query": "get_iocs",
-            "days": 1
-        }
-        
+    """
+    Fetches feeds on the calling event loop. Database work is blocking, so it
+    runs in the default executor with a short-lived session per call.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        http_client: Optional[httpx.AsyncClient] = None,
+        feeds: Optional[List[BaseFeed]] = None,
+    ):
+        self.session_factory = session_factory
+        self._owns_client = http_client is None
+        self.http_client = http_client or create_http_client()
+        self.feeds = feeds if feeds is not None else get_enabled_feeds()
+        # Feeds that failed during the last update_all_feeds(), keyed by name
+        self.errors: Dict[str, Dict] = {}
+
+    async def update_all_feeds(self) -> Dict[str, int]:
+        """
+        Update all enabled feeds concurrently; returns rows imported per feed
+
+        A failing feed does not stop the others; its error is recorded in
+        `self.errors`.
+        """
+        self.errors = {}
+        logger.info(f"Starting feed update for {[f.name for f in self.feeds]}")
+        counts = await asyncio.gather(*(self.update_feed(feed) for feed in self.feeds))
+        results = dict(zip((f.name for f in self.feeds), counts))
+        logger.info(f"Feed update complete: {results}")
+        return results
+
+    async def update_feed(self, feed: BaseFeed) -> int:
+        """
+        Fetch one feed, sending the stored ETag/Last-Modified validators so
+        unchanged sources answer 304, and stream new rows into the database.
+        """
+        count = 0
+        refreshed = 0
+        # Stored as last_fetched: every row this fetch reports ends up with last_seen >= started
+        started = datetime.utcnow()
+
         try:
-            logger.info("Fetching ThreatFox feed...")
-            response = await self.http_client.post(url, json=payload)
-            data = response.json()
-            
-            if data.get("query_status") != "ok":
-                logger.warning(f"ThreatFox error: {data.get('query_status')}")
-                return
-
-            iocs = data.get("data", [])
-            count = 0
-            
-            for item in iocs:
-                ioc_value = item.get("ioc")
-                ioc_type = item.get("ioc_type")
-                
-                # Normalize type
-                if "ip" in ioc_type:
-                    ioc_type = "ip"
-                elif "domain" in ioc_type:
-                    ioc_type = "domain"
-                
-                confidence = float(item.get("confidence_level", 0)) / 100.0
-                
-                # Upsert IOC
-                stmt = insert(IOC).values(
-                    value=ioc_value,
-                    type=ioc_type,
-                    source="threatfox",
-                    confidence=confidence,
-                    severity="high", # Default for ThreatFox
-                    tags=item.get("tags"),
-                    last_seen=datetime.utcnow()
-                )
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=['value'],
-                    set_=dict(
-                        last_seen=datetime.utcnow(),
-                        confidence=stmt.excluded.confidence
-                    )
-                )
-                self.db.execute(stmt)
-                count += 1
-            
-            self.db.commit()
-            logger.info(f"Imported {count} IOCs from ThreatFox")
-            
+            cursor = await self._run_db(self._load_cursor, feed.name)
+            logger.info(f"Fetching {feed.name} feed...")
+            async with self.http_client.stream(**feed.build_request(cursor)) as response:
+                if response.status_code == 304:
+                    logger.info(f"{feed.name} not modified since last fetch")
+                    if feed.snapshot:
+                        await self._run_db(self._touch_source, feed.source)
+                    return 0
+                response.raise_for_status()
+
+                batch, refresh = [], []
+                async for row in feed.parse(response.aiter_lines(), cursor):
+                    if row.get("refresh"):
+                        refresh.append(row["value"])
+                        if len(refresh) >= settings.FEED_BATCH_SIZE:
+                            refreshed += await self._run_db(self._refresh_batch, refresh)
+                            refresh = []
+                        continue
+                    batch.append(row)
+                    if len(batch) >= settings.FEED_BATCH_SIZE:
+                        count += await self._run_db(self._upsert_batch, batch)
+                        batch = []
+                if batch:
+                    count += await self._run_db(self._upsert_batch, batch)
+                if refresh:
+                    refreshed += await self._run_db(self._refresh_batch, refresh)
+
+                cursor.etag = response.headers.get("etag")
+                cursor.last_modified = response.headers.get("last-modified")
+
+            await self._run_db(self._save_cursor, feed.name, cursor, started)
+            logger.info(f"Imported {count} IOCs from {feed.name}, refreshed {refreshed}")
+
         except Exception as e:
-            logger.error(f"Failed to fetch ThreatFox: {e}")
-            self.db.rollback()
+            logger.error(f"Failed to fetch {feed.name}: {e}")
+            self.errors[feed.name] = {
+                "feed": feed.name,
+                "error": str(e) or type(e).__name__,
+                "rows_imported": count,
+                "at": datetime.utcnow(),
+            }
+
+        return count
+
+    async def _run_db(self, fn, *args):
+        """Run a blocking database helper off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _upsert_batch(self, rows: List[Dict]) -> int:
+        """Upsert a batch of IOC rows in a single statement"""
+        # Postgres rejects ON CONFLICT updating the same row twice in one statement
+        unique_rows = list({row["value"]: row for row in rows}.values())
+
+        stmt = insert(IOC).values(unique_rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['value'],
+            set_=dict(
+                last_seen=stmt.excluded.last_seen,
+                confidence=stmt.excluded.confidence,
+                active=True
+            )
+        )
+        with self.session_factory() as db:
+            db.execute(stmt)
+            db.commit()
+        return len(unique_rows)
+
+    def _refresh_batch(self, values: List[str]) -> int:
+        """Mark rows the source still reports as seen now"""
+        with self.session_factory() as db:
+            result = db.execute(
+                update(IOC)
+                .where(IOC.value.in_(values))
+                .values(last_seen=datetime.utcnow(), active=True)
+            )
+            db.commit()
+        return result.rowcount
+
+    def _touch_source(self, source: str):
+        """Mark every active row of an unchanged snapshot feed as seen now"""
+        with self.session_factory() as db:
+            db.execute(
+                update(IOC)
+                .where(IOC.source == source, IOC.active == True)
+                .values(last_seen=datetime.utcnow())
+            )
+            db.commit()
+
+    def _load_cursor(self, name: str) -> FeedCursor:
+        with self.session_factory() as db:
+            state = db.get(FeedState, name)
+            if state is None:
+                return FeedCursor()
+            return FeedCursor(etag=state.etag, last_modified=state.last_modified, cursor=state.cursor)
+
+    def _save_cursor(self, name: str, cursor: FeedCursor, fetched: datetime):
+        """Store validators and cursor after a full fetch that started at `fetched`"""
+        with self.session_factory() as db:
+            state = db.get(FeedState, name) or FeedState(name=name)
+            state.etag = cursor.etag
+            state.last_modified = cursor.last_modified
+            state.cursor = cursor.cursor
+            state.last_fetched = fetched
+            db.merge(state)
+            db.commit()
 
     async def close(self):
-        await self.http_client.aclose()
+        if self._owns_client:
+            await self.http_client.aclose()
@@ -0,0 +1,177 @@
+"""
+Ingest-time Enrichment
+Matches IPs and domains in new Zeek/Suricata events against the active IOC
+set and tags hits in place, so IOC matches become a plain term filter
+(`threat_intel.matched: true`) instead of a per-IP lookup at query time
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from opensearchpy import AsyncOpenSearch
+from opensearchpy.helpers import async_bulk, async_scan
+
+from .config import settings
+from .matcher import IOCIndex
+from .metrics import track_dependency, track_loop
+
+logger = structlog.get_logger()
+
+# Dotted paths of fields holding IPs / domains in Zeek and Suricata (EVE) events
+IP_FIELDS = ("id.orig_h", "id.resp_h", "src_ip", "dest_ip")
+DOMAIN_FIELDS = ("query", "host", "server_name", "dns.rrname", "http.hostname", "tls.sni")
+
+
+def _get_field(source: Dict[str, Any], path: str) -> Optional[Any]:
+    """Read a field stored either flat ("id.orig_h") or nested"""
+    if path in source:
+        return source[path]
+    value: Any = source
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _observables(source: Dict[str, Any]) -> Iterable[Tuple[str, str, str]]:
+    for field in IP_FIELDS:
+        value = _get_field(source, field)
+        if isinstance(value, str) and value:
+            yield "ip", field, value
+    for field in DOMAIN_FIELDS:
+        value = _get_field(source, field)
+        if isinstance(value, str) and value:
+            yield "domain", field, value.lower().rstrip(".")
+
+
+def match_event(index: IOCIndex, source: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return one entry per observable in the event that is a known IOC"""
+    matches = []
+    for ioc_type, field, value in _observables(source):
+        hit = index.lookup(ioc_type, value)
+        if hit:
+            matches.append({
+                "field": field,
+                "value": value,
+                "type": ioc_type,
+                "source": hit.source,
+                "confidence": hit.confidence,
+                "severity": hit.severity,
+            })
+    return matches
+
+
+def enrichment_doc(matches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fields written back onto a matching event"""
+    return {
+        "threat_intel": {
+            "matched": True,
+            "indicators": [m["value"] for m in matches],
+            "sources": sorted({m["source"] for m in matches}),
+            "max_confidence": max(m["confidence"] for m in matches),
+            "matches": matches,
+            "enriched_at": datetime.utcnow().isoformat(),
+        }
+    }
+
+
+class EventEnricher:
+    """
+    Polls new events in fixed, non-overlapping time windows
+
+    Each cycle scans (previous upper bound, now - lag] across the enrichment
+    index patterns, so late-arriving documents within the lag are still seen
+    and no event is scanned twice. Matches are written back with bulk
+    partial updates.
+    """
+
+    def __init__(self, ioc_index: IOCIndex, os_client: Optional[AsyncOpenSearch] = None):
+        self.ioc_index = ioc_index
+        self.os_client = os_client or AsyncOpenSearch(
+            hosts=[{'host': settings.OPENSEARCH_HOST, 'port': settings.OPENSEARCH_PORT}],
+            http_auth=(settings.OPENSEARCH_USER, settings.OPENSEARCH_PASSWORD),
+            use_ssl=True,
+            verify_certs=False,
+            ssl_show_warn=False
+        )
+        self.window_end = datetime.utcnow() - timedelta(seconds=settings.ENRICHMENT_INTERVAL_SECONDS)
+        self.last_scanned = 0
+        self.last_matched = 0
+
+    async def run(self):
+        """Background loop"""
+        while True:
+            try:
+                async with track_loop("event_enrichment"):
+                    await self.run_cycle()
+            except Exception as e:
+                logger.error("Error in enrichment cycle", error=str(e))
+            await asyncio.sleep(settings.ENRICHMENT_INTERVAL_SECONDS)
+
+    async def run_cycle(self) -> int:
+        """Scan one time window; returns the number of events tagged"""
+        if not self.ioc_index.loaded:
+            logger.info("IOC index not loaded yet, skipping enrichment cycle")
+            return 0
+
+        window_start = self.window_end
+        window_end = datetime.utcnow() - timedelta(seconds=settings.ENRICHMENT_LAG_SECONDS)
+        if window_end <= window_start:
+            return 0
+
+        query = {
+            "query": {
+                "range": {
+                    "@timestamp": {"gt": window_start.isoformat(), "lte": window_end.isoformat()}
+                }
+            }
+        }
+
+        scanned, matched, actions = 0, 0, []
+        async for hit in async_scan(
+            self.os_client,
+            index=",".join(settings.ENRICHMENT_INDEX_PATTERNS),
+            query=query,
+            size=settings.ENRICHMENT_BATCH_SIZE,
+            ignore_unavailable=True,
+        ):
+            scanned += 1
+            matches = match_event(self.ioc_index, hit["_source"])
+            if matches:
+                actions.append({
+                    "_op_type": "update",
+                    "_index": hit["_index"],
+                    "_id": hit["_id"],
+                    "doc": enrichment_doc(matches),
+                })
+                if len(actions) >= settings.ENRICHMENT_BATCH_SIZE:
+                    matched += await self._write_back(actions)
+                    actions = []
+        matched += await self._write_back(actions)
+
+        self.window_end = window_end
+        self.last_scanned, self.last_matched = scanned, matched
+        logger.info("Enrichment cycle complete", scanned=scanned, matched=matched)
+        return matched
+
+    async def _write_back(self, actions: List[Dict[str, Any]]) -> int:
+        if not actions:
+            return 0
+        async with track_dependency("opensearch", "bulk"):
+            succeeded, errors = await async_bulk(self.os_client, actions, raise_on_error=False)
+        if errors:
+            logger.warning("Some enrichment updates failed", failed=len(errors))
+        return succeeded
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "window_end": self.window_end,
+            "last_scanned": self.last_scanned,
+            "last_matched": self.last_matched,
+        }
+
+    async def close(self):
+        await self.os_client.close()
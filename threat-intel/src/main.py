@@ -4,14 +4,18 @@ Threat Intel Service Main Application
 import asyncio
 import structlog
 import uvicorn
-from fastapi import FastAPI, BackgroundTasks, Depends
+from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import Session
 
 from .config import settings
-from .database import engine, get_db
+from .metrics import setup_metrics
+from .responses import CompressionMiddleware, ORJSONResponse
+from .tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from .database import engine
 from .models import Base
-from .feed_manager import FeedManager
+from .ingest_enrichment import EventEnricher
+from .matcher import IOCIndex
+from .scheduler import FeedScheduler
 from .enrichment import router as enrichment_router
 
 # Configure logging
@@ -25,6 +29,8 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+setup_tracing("threat-intel")
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
@@ -32,21 +38,42 @@ Base.metadata.create_all(bind=engine)
 async def lifespan(app: FastAPI):
     logger.info("Starting ThunderX Threat Intel Service")
     
-    # Initial feed update in background
-    # We can't pass DB session easily to background task here without handling scope
-    # For now, we'll just start the server. 
-    # Real implementations would use a task queue like Celery.
+    # Feed updates run on this loop; the first one starts immediately
+    # and ends by loading the active IOC set into the index
+    app.state.ioc_index = IOCIndex()
+    app.state.feed_scheduler = FeedScheduler(app.state.ioc_index)
+    app.state.feed_scheduler.start()
+    
+    # Tag new Zeek/Suricata events that match an active IOC
+    enrichment_task = None
+    if settings.ENRICHMENT_ENABLED:
+        app.state.event_enricher = EventEnricher(app.state.ioc_index)
+        enrichment_task = asyncio.create_task(app.state.event_enricher.run())
     
     yield
     logger.info("Shutting down ThunderX Threat Intel Service")
+    if enrichment_task:
+        enrichment_task.cancel()
+        await app.state.event_enricher.close()
+    await app.state.feed_scheduler.stop()
+    shutdown_tracing()
 
 app = FastAPI(
     title="ThunderX Threat Intel Service",
     description="Threat intelligence aggregation and management",
     version=settings.VERSION,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# W3C trace context in, spans out
+app.add_middleware(TracingMiddleware, root_app=app)
+
+# Prometheus metrics on /metrics (added last so request timings include every middleware)
+setup_metrics(app)
+
 app.include_router(enrichment_router)
 
 @app.get("/health")
@@ -54,26 +81,23 @@ async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
 
 @app.get("/feeds/update")
-async def trigger_update(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def trigger_update(request: Request):
     """Manually trigger feed update"""
-    # Note: This is simplified. Passing db session to background task can be tricky if session closes.
-    # Ideally, the background task creates its own session.
-    background_tasks.add_task(run_feed_update)
+    if not request.app.state.feed_scheduler.trigger():
+        return {"status": "already_running"}
     return {"status": "update_started"}
 
-def run_feed_update():
-    """Helper to run update with its own session"""
-    from .database import SessionLocal
-    db = SessionLocal()
-    try:
-        manager = FeedManager(db)
-        # Run async method in sync wrapper if needed, or better:
-        # Since FeedManager uses httpx (async), we need an event loop.
-        # But this function is run in a thread pool by FastAPI background tasks (def).
-        # We need asyncio.run()
-        asyncio.run(manager.update_all_feeds())
-    finally:
-        db.close()
+@app.get("/feeds/status")
+async def feed_status(request: Request):
+    """Last feed update run: timing, rows imported per feed, errors"""
+    return request.app.state.feed_scheduler.status()
+
+@app.get("/enrich/status")
+async def enrichment_status(request: Request):
+    """Progress of ingest-time event enrichment"""
+    if not settings.ENRICHMENT_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **request.app.state.event_enricher.status()}
 
 def main():
     logger.info("Starting Threat Intel Service", port=settings.PORT)
@@ -0,0 +1,77 @@
+"""
+IOC Matcher
+In-memory lookup table built from the active IOC set
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from .database import SessionLocal
+from .models import IOC
+
+logger = structlog.get_logger()
+
+
+class IOCMatch(NamedTuple):
+    confidence: float
+    source: str
+    severity: str
+    tags: Optional[str]
+    last_seen: datetime
+
+
+class IOCIndex:
+    """
+    Hash index of active indicators keyed by type then value
+
+    Rebuilt wholesale after each compaction so memory follows the live
+    threat picture; readers keep using the previous table until the new
+    one is swapped in. Counts per (type, source, severity) are collected
+    on the same pass so statistics never need their own table scan.
+    """
+
+    def __init__(self):
+        self._by_type: Dict[str, Dict[str, IOCMatch]] = {}
+        self._counts: Counter = Counter()
+        self.loaded = False
+        self.size = 0
+        self.built_at: Optional[datetime] = None
+
+    def rebuild(self, session_factory: sessionmaker = SessionLocal) -> int:
+        """Reload from active IOCs (blocking; call from an executor)"""
+        by_type: Dict[str, Dict[str, IOCMatch]] = {}
+        counts: Counter = Counter()
+        stmt = select(
+            IOC.type, IOC.value, IOC.confidence, IOC.source, IOC.severity, IOC.tags, IOC.last_seen
+        ).where(IOC.active == True).execution_options(yield_per=10000)
+
+        with session_factory() as db:
+            for ioc_type, value, *rest in db.execute(stmt):
+                match = IOCMatch(*rest)
+                by_type.setdefault(ioc_type, {})[value] = match
+                counts[(ioc_type, match.source, match.severity)] += 1
+
+        self._by_type = by_type
+        self._counts = counts
+        self.size = sum(len(values) for values in by_type.values())
+        self.built_at = datetime.utcnow()
+        self.loaded = True
+        logger.info("IOC index rebuilt", size=self.size)
+        return self.size
+
+    def lookup(self, ioc_type: str, value: str) -> Optional[IOCMatch]:
+        return self._by_type.get(ioc_type, {}).get(value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Active IOC counts grouped by type, source and severity"""
+        groups: Dict[str, Counter] = {"by_type": Counter(), "by_source": Counter(), "by_severity": Counter()}
+        for (ioc_type, source, severity), count in self._counts.items():
+            groups["by_type"][ioc_type] += count
+            groups["by_source"][source] += count
+            groups["by_severity"][severity] += count
+        return {"active": self.size, **{name: dict(c) for name, c in groups.items()}}
@@ -29,3 +29,24 @@ class IOC(Base):
     
     def __repr__(self):
         return f"<IOC(value={self.value}, type={self.type}, source={self.source})>"
+
+class FeedState(Base):
+    """
+    Per-feed conditional request validators and delta cursor
+    """
+    __tablename__ = "feed_state"
+
+    name = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    cursor = Column(String, nullable=True) # feed-specific, e.g. last imported id
+    last_fetched = Column(DateTime, nullable=True)
+
+class CompactionState(Base):
+    """
+    When a periodic maintenance job last ran, so intervals survive restarts
+    """
+    __tablename__ = "compaction_state"
+
+    name = Column(String, primary_key=True) # e.g. ioc_compaction
+    last_run = Column(DateTime, nullable=False)
@@ -0,0 +1,137 @@
+"""
+Feed Scheduler
+Runs feed updates and IOC compaction periodically on the application's event loop
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from .config import settings
+from .compaction import compact_iocs
+from .feed_manager import FeedManager, create_http_client
+from .matcher import IOCIndex
+from .metrics import LOOP_ERRORS, track_loop
+
+logger = structlog.get_logger()
+
+
+class FeedScheduler:
+    """
+    In-process scheduler for feed updates
+
+    Started from the app lifespan so updates run as a task on the server's
+    own loop. A lock ensures scheduled and manually triggered runs never
+    overlap, and the outcome of the last run is kept for the status endpoint.
+    Each run ends with a compaction pass and a rebuild of the IOC index.
+    """
+
+    def __init__(self, ioc_index: IOCIndex, interval_seconds: Optional[float] = None):
+        self.ioc_index = ioc_index
+        self.interval_seconds = interval_seconds or settings.UPDATE_INTERVAL_HOURS * 3600
+        self.http_client = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._current_run: Optional[asyncio.Task] = None
+
+        self.last_started: Optional[datetime] = None
+        self.last_finished: Optional[datetime] = None
+        self.last_duration_seconds: Optional[float] = None
+        self.last_rows: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self.last_feed_errors: List[Dict[str, Any]] = []
+        self.last_compaction: Dict[str, int] = {}
+        self.next_run: Optional[datetime] = None
+
+    def start(self):
+        """Start the periodic loop on the running event loop"""
+        self.http_client = create_http_client()
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Feed scheduler started", interval_seconds=self.interval_seconds)
+
+    async def stop(self):
+        """Cancel the loop and any in-flight run, then release the HTTP pool"""
+        for task in (self._task, self._current_run):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self.http_client:
+            await self.http_client.aclose()
+        logger.info("Feed scheduler stopped")
+
+    def is_running(self) -> bool:
+        return self._lock.locked()
+
+    def trigger(self) -> bool:
+        """Start an immediate run in the background; False if one is in progress"""
+        # A triggered task may not have taken the lock yet, so check it as well
+        if self.is_running() or (self._current_run and not self._current_run.done()):
+            return False
+        self._current_run = asyncio.create_task(self.run_once())
+        return True
+
+    async def run_once(self) -> Dict[str, int]:
+        """Run a single update across all enabled feeds"""
+        if self.is_running():
+            logger.info("Feed update already in progress, skipping")
+            return {}
+
+        async with self._lock:
+            self.last_started = datetime.utcnow()
+            started = time.monotonic()
+            manager = FeedManager(http_client=self.http_client)
+            loop = asyncio.get_running_loop()
+            async with track_loop("feed_update"):
+                try:
+                    self.last_rows = await manager.update_all_feeds()
+                    self.last_feed_errors = list(manager.errors.values())
+                    self.last_compaction = await loop.run_in_executor(None, compact_iocs)
+                    await loop.run_in_executor(None, self.ioc_index.rebuild)
+                    self.last_error = (
+                        f"{len(self.last_feed_errors)} feed(s) failed: {', '.join(manager.errors)}"
+                        if self.last_feed_errors else None
+                    )
+                except Exception as e:
+                    logger.error("Feed update failed", error=str(e))
+                    LOOP_ERRORS.labels("feed_update").inc()
+                    self.last_error = str(e)
+                finally:
+                    await manager.close()
+                    self.last_duration_seconds = round(time.monotonic() - started, 3)
+                    self.last_finished = datetime.utcnow()
+
+            logger.info(
+                "Feed update finished",
+                duration_seconds=self.last_duration_seconds,
+                rows=self.last_rows,
+                failed_feeds=list(manager.errors)
+            )
+            return self.last_rows
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            self.next_run = datetime.utcnow() + timedelta(seconds=self.interval_seconds)
+            await asyncio.sleep(self.interval_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running(),
+            "interval_seconds": self.interval_seconds,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_rows": self.last_rows,
+            "last_total_rows": sum(self.last_rows.values()),
+            "last_error": self.last_error,
+            "last_feed_errors": self.last_feed_errors,
+            "last_compaction": self.last_compaction,
+            "ioc_index_size": self.ioc_index.size,
+            "next_run": self.next_run,
+        }
@@ -0,0 +1,89 @@
+"""
+IOC compaction against an in-memory SQLite database
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from src.compaction import STATE_NAME, compact_iocs
+from src.config import settings
+from src.models import Base, CompactionState, FeedState, IOC
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def test_decay_uses_persisted_last_run():
+    session_factory = make_session_factory()
+    now = datetime.utcnow()
+    half_life = timedelta(days=settings.IOC_CONFIDENCE_HALF_LIFE_DAYS)
+    with session_factory() as db:
+        db.add(IOC(value="198.51.100.1", type="ip", source="test", confidence=0.8,
+                   last_seen=now - 2 * half_life, active=True))
+        # Previous pass one half-life ago, e.g. before a restart
+        db.add(CompactionState(name=STATE_NAME, last_run=now - half_life))
+        db.add(FeedState(name="test", last_fetched=now))
+        db.commit()
+
+    assert compact_iocs(session_factory)["decayed"] == 1
+    with session_factory() as db:
+        assert abs(db.query(IOC).one().confidence - 0.4) < 1e-3
+        last_run = db.get(CompactionState, STATE_NAME).last_run
+        assert last_run >= now
+
+    # A pass straight after (another restart) decays by the few ms elapsed, not a whole interval
+    compact_iocs(session_factory)
+    with session_factory() as db:
+        assert abs(db.query(IOC).one().confidence - 0.4) < 1e-3
+        assert db.get(CompactionState, STATE_NAME).last_run >= last_run
+
+
+def test_first_pass_assumes_one_update_interval():
+    session_factory = make_session_factory()
+    with session_factory() as db:
+        db.add(IOC(value="bad.example.com", type="domain", source="test", confidence=0.8,
+                   last_seen=datetime.utcnow() - timedelta(days=2), active=True))
+        db.add(FeedState(name="test", last_fetched=datetime.utcnow()))
+        db.commit()
+
+    compact_iocs(session_factory)
+    interval = timedelta(hours=settings.UPDATE_INTERVAL_HOURS)
+    expected = 0.8 * 0.5 ** (interval / timedelta(days=settings.IOC_CONFIDENCE_HALF_LIFE_DAYS))
+    with session_factory() as db:
+        assert abs(db.query(IOC).one().confidence - expected) < 1e-3
+        assert db.get(CompactionState, STATE_NAME) is not None
+
+
+def test_sources_not_refetched_since_last_seen_are_left_alone():
+    session_factory = make_session_factory()
+    now = datetime.utcnow()
+    long_ago = now - timedelta(days=settings.IOC_EXPIRY_DAYS + 5)
+    with session_factory() as db:
+        # Fetched since: decays and expires
+        db.add(FeedState(name="fresh", last_fetched=now - timedelta(hours=1)))
+        db.add(IOC(value="198.51.100.1", type="ip", source="fresh", confidence=0.8, last_seen=long_ago, active=True))
+        # Failing (or answering 304) since the row was seen: untouched
+        db.add(FeedState(name="stuck", last_fetched=long_ago - timedelta(minutes=1)))
+        db.add(IOC(value="198.51.100.2", type="ip", source="stuck", confidence=0.8, last_seen=long_ago, active=True))
+        # No feed state at all (not a feed source): untouched
+        db.add(IOC(value="198.51.100.3", type="ip", source="manual", confidence=0.8, last_seen=long_ago, active=True))
+        db.commit()
+
+    assert compact_iocs(session_factory) == {"decayed": 1, "deactivated": 1, "deleted": 0}
+    with session_factory() as db:
+        rows = {ioc.source: ioc for ioc in db.query(IOC)}
+    assert rows["fresh"].confidence < 0.8 and not rows["fresh"].active
+    for source in ("stuck", "manual"):
+        assert rows[source].confidence == 0.8 and rows[source].active
@@ -0,0 +1,267 @@
+"""
+FeedManager against a local stub ThreatFox server
+Covers the conditional request round trip (200 + ETag, then 304) and the
+id cursor that limits the next changed export to rows not yet imported,
+while rows it still lists have last_seen refreshed.
+"""
+
+import asyncio
+import dataclasses
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(__file__))
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("OPENSEARCH_PASSWORD", "test")
+
+from src.compaction import compact_iocs
+from src.config import settings
+from src.feed_manager import FeedManager
+from src.feeds import FeedCursor, ThreatFoxFeed
+from src.models import Base, IOC
+
+HEADER = (
+    '# "first_seen_utc","ioc_id","ioc_value","ioc_type","threat_type","fk_malware","malware_alias",'
+    '"malware_printable","last_seen_utc","confidence_level","reference","tags","anonymous","reporter"'
+)
+
+
+def threatfox_row(ioc_id: int, value: str, ioc_type: str) -> str:
+    return (
+        f'"2024-01-01 00:00:00", "{ioc_id}", "{value}", "{ioc_type}", "botnet_cc", "win.test", "None",'
+        f' "Test", "", "75", "None", "test", "0", "tester"'
+    )
+
+
+EXPORT_V1 = [
+    threatfox_row(100, "198.51.100.1:443", "ip:port"),
+    threatfox_row(101, "bad.example.com", "domain"),
+]
+EXPORT_V2 = EXPORT_V1 + [
+    threatfox_row(102, "203.0.113.7:8080", "ip:port"),
+    threatfox_row(103, "d41d8cd98f00b204e9800998ecf8427e", "md5_hash"),
+]
+
+
+class StubThreatFox(BaseHTTPRequestHandler):
+    """Serves the current export with an ETag and answers matching If-None-Match with 304"""
+
+    export = EXPORT_V1
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        if self.path.startswith("/broken"):
+            self.send_error(500)
+            return
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        body = "\n".join([HEADER, *self.export]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SQLiteFeedManager(FeedManager):
+    """FeedManager on SQLite; only the Postgres-specific upsert is swapped"""
+
+    def _upsert_batch(self, rows):
+        unique_rows = list({row["value"]: row for row in rows}.values())
+        stmt = insert(IOC).values(unique_rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["value"],
+            set_=dict(last_seen=stmt.excluded.last_seen, confidence=stmt.excluded.confidence, active=True),
+        )
+        with self.session_factory() as db:
+            db.execute(stmt)
+            db.commit()
+        return len(unique_rows)
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+class InMemoryFeedManager(FeedManager):
+    """FeedManager with the Postgres helpers replaced by in-memory state"""
+
+    def __init__(self, **kwargs):
+        super().__init__(session_factory=None, **kwargs)
+        self.cursors = {}
+        self.upserts = []
+        self.refreshes = []
+
+    def _load_cursor(self, name):
+        cursor = self.cursors.get(name)
+        return dataclasses.replace(cursor) if cursor else FeedCursor()
+
+    def _save_cursor(self, name, cursor, fetched):
+        self.cursors[name] = dataclasses.replace(cursor)
+
+    def _upsert_batch(self, rows):
+        self.upserts.append([row["value"] for row in rows])
+        return len(rows)
+
+    def _refresh_batch(self, values):
+        self.refreshes.append(list(values))
+        return len(values)
+
+    def _touch_source(self, source):
+        raise AssertionError("ThreatFox is a delta feed and is never touched on 304")
+
+
+def test_threatfox_conditional_and_incremental_fetch(monkeypatch):
+    monkeypatch.setattr(settings, "FEED_BATCH_SIZE", 1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubThreatFox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubThreatFox.requests = []
+    feed = ThreatFoxFeed(url=f"http://127.0.0.1:{server.server_port}/export/csv/recent/")
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            manager = InMemoryFeedManager(http_client=client, feeds=[feed])
+
+            # First fetch: no validators, every row imported, cursor at the highest id
+            assert await manager.update_feed(feed) == 2
+            assert manager.upserts == [["198.51.100.1"], ["bad.example.com"]]
+            assert manager.cursors["threatfox"] == FeedCursor(
+                etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT", cursor="101"
+            )
+
+            # Unchanged: validators are sent back and the 304 imports nothing
+            assert await manager.update_feed(feed) == 0
+            assert StubThreatFox.requests[1]["If-None-Match"] == '"v1"'
+            assert StubThreatFox.requests[1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+            assert len(manager.upserts) == 2
+
+            # Changed export: only rows past the cursor are upserted, the rest refreshed
+            StubThreatFox.export, StubThreatFox.etag = EXPORT_V2, '"v2"'
+            assert await manager.update_feed(feed) == 2
+            assert manager.upserts[2:] == [["203.0.113.7"], ["d41d8cd98f00b204e9800998ecf8427e"]]
+            assert manager.refreshes == [["198.51.100.1"], ["bad.example.com"]]
+            assert manager.cursors["threatfox"].cursor == "103"
+            assert manager.cursors["threatfox"].etag == '"v2"'
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+        StubThreatFox.export, StubThreatFox.etag = EXPORT_V1, '"v1"'
+
+    assert "If-None-Match" not in StubThreatFox.requests[0]
+    assert len(StubThreatFox.requests) == 3
+
+
+def test_failing_feed_is_recorded():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubThreatFox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    good = ThreatFoxFeed(url=f"{base}/export/csv/recent/")
+    broken = ThreatFoxFeed(url=f"{base}/broken/")
+    broken.name = "threatfox_mirror"
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            manager = InMemoryFeedManager(http_client=client, feeds=[good, broken])
+            assert await manager.update_all_feeds() == {"threatfox": 2, "threatfox_mirror": 0}
+            return manager.errors
+
+    try:
+        errors = asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert list(errors) == ["threatfox_mirror"]
+    assert "500" in errors["threatfox_mirror"]["error"]
+    assert errors["threatfox_mirror"]["rows_imported"] == 0
+
+
+def test_rows_still_listed_below_the_cursor_stay_fresh():
+    session_factory = make_session_factory()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubThreatFox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    feed = ThreatFoxFeed(url=f"http://127.0.0.1:{server.server_port}/export/csv/recent/")
+    stale = datetime.utcnow() - timedelta(days=10)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            manager = SQLiteFeedManager(session_factory=session_factory, http_client=client, feeds=[feed])
+            assert await manager.update_feed(feed) == 2
+            with session_factory() as db:
+                db.query(IOC).update({"last_seen": stale, "active": False})
+                db.commit()
+
+            # Ids 100 and 101 are at or below the cursor but reappear in the export
+            StubThreatFox.export, StubThreatFox.etag = EXPORT_V2, '"v2"'
+            assert await manager.update_feed(feed) == 2
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+        StubThreatFox.export, StubThreatFox.etag = EXPORT_V1, '"v1"'
+
+    with session_factory() as db:
+        rows = {ioc.value: ioc for ioc in db.query(IOC)}
+    assert len(rows) == 4
+    for value in ("198.51.100.1", "bad.example.com"):
+        assert rows[value].last_seen > stale + timedelta(days=9)
+        assert rows[value].active
+
+
+def test_compaction_only_decays_rows_the_feed_stopped_reporting():
+    session_factory = make_session_factory()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubThreatFox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    feed = ThreatFoxFeed(url=f"http://127.0.0.1:{server.server_port}/export/csv/recent/")
+    stale = datetime.utcnow() - timedelta(days=3)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            manager = SQLiteFeedManager(session_factory=session_factory, http_client=client, feeds=[feed])
+            StubThreatFox.export = EXPORT_V2
+            await manager.update_feed(feed)
+            with session_factory() as db:
+                db.query(IOC).update({"last_seen": stale})
+                db.commit()
+            # Next export drops ids 100 and 101 but still lists 102 and 103
+            StubThreatFox.export, StubThreatFox.etag = EXPORT_V2[2:], '"v2"'
+            await manager.update_feed(feed)
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+        StubThreatFox.export, StubThreatFox.etag = EXPORT_V1, '"v1"'
+
+    assert compact_iocs(session_factory)["decayed"] == 2
+    with session_factory() as db:
+        confidence = {ioc.value: ioc.confidence for ioc in db.query(IOC)}
+    assert confidence["198.51.100.1"] < 0.75 and confidence["bad.example.com"] < 0.75
+    assert confidence["203.0.113.7"] == 0.75 and confidence["d41d8cd98f00b204e9800998ecf8427e"] == 0.75